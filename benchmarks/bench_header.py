@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""Per-file latency and peak memory of NDimMeta.from_file versus from_xarray.
+
+Writes CMIP-like NetCDF-4 files (noleap daily time, time bounds, one
+compressed data variable) to a temporary directory, then extracts their
+metadata through xarray and through each header engine. Peak memory is the
+tracemalloc peak of Python allocations during one extraction. Each reader
+runs in a fresh process so import and heap state don't leak between them.
+
+    python -m benchmarks.bench_header --files 20
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import xarray as xr
+
+from ndmeta import NDimMeta
+from ndmeta.util import format_mem_size
+
+
+def write_files(directory, n_files, time_size, lat_size, lon_size):
+    paths = []
+    for i in range(n_files):
+        times = xr.date_range(f'{1850 + i}-01-01', periods=time_size, freq='D', calendar='noleap', use_cftime=True)
+        ds = xr.Dataset(
+            {'tas': (('time', 'lat', 'lon'), np.zeros((time_size, lat_size, lon_size), dtype='float32'), {'units': 'K'})},
+            coords={'time': times, 'lat': np.linspace(-90, 90, lat_size), 'lon': np.linspace(0, 360, lon_size, endpoint=False)},
+        )
+        ds['time_bnds'] = (('time', 'bnds'), np.stack([times, times], 1))
+        ds.time.attrs['bounds'] = 'time_bnds'
+        path = os.path.join(directory, f'tas_{i:04d}.nc')
+        ds.to_netcdf(path, engine='netcdf4', encoding={
+            'time': {'units': 'days since 1850-01-01'},
+            'tas': {'zlib': True, 'chunksizes': (1, lat_size, lon_size)},
+        })
+        paths.append(path)
+    return paths
+
+
+def from_xarray(path):
+    with xr.open_dataset(path) as ds:
+        return NDimMeta.from_xarray(ds)
+
+
+def header_reader(engine):
+    return lambda path: NDimMeta.from_file(path, engine=engine)
+
+
+READERS = {
+    'xarray': lambda: from_xarray,
+    'header/netcdf4': lambda: header_reader('netcdf4'),
+    'header/h5py': lambda: header_reader('h5py'),
+}
+
+
+def measure(label, paths):
+    extract = READERS[label]()
+    extract(paths[0])  # warm up imports and caches
+    start = time.perf_counter()
+    for path in paths:
+        extract(path)
+    latency = (time.perf_counter() - start) / len(paths)
+
+    tracemalloc.start()
+    extract(paths[-1])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return latency, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=20)
+    parser.add_argument('--time-size', type=int, default=365)
+    parser.add_argument('--lat-size', type=int, default=96)
+    parser.add_argument('--lon-size', type=int, default=144)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_files(directory, args.files, args.time_size, args.lat_size, args.lon_size)
+        print(f"{args.files} files of tas{(args.time_size, args.lat_size, args.lon_size)}")
+        context = multiprocessing.get_context('spawn')
+        for label in READERS:
+            try:
+                with context.Pool(1) as pool:
+                    latency, peak = pool.apply(measure, (label, paths))
+            except ImportError as e:
+                print(f"  {label:<15} skipped ({e})")
+                continue
+            print(f"  {label:<15} {latency * 1e3:7.2f} ms/file, peak {format_mem_size(peak):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""Import time of ndmeta entry points, measured with ``python -X importtime``.
+
+Each entry point is imported in a fresh interpreter; the reported time is the
+best cumulative self+children time of the top-level import over the repeats.
+Heavy third-party modules pulled in along the way are listed, and --check
+exits non-zero if a light entry point loads any of them.
+
+    python -m benchmarks.bench_imports --repeat 5 --check
+"""
+import argparse
+import subprocess
+import sys
+
+
+HEAVY_MODULES = ('xarray', 'pandas', 'cftime', 'objsize', 'netCDF4', 'h5py')
+
+# Entry point -> whether it may load heavy modules at import time
+ENTRY_POINTS = {
+    'ndmeta': False,
+    'ndmeta.chunk_grid': False,
+    'ndmeta.serialize': False,
+    'ndmeta.cache': False,
+    'ndmeta.catalog': False,
+    'ndmeta.schedule': False,
+    'ndmeta.scan': False,
+    'xarray': True,
+}
+
+
+def import_times(module):
+    """Cumulative import time in microseconds of every module ``module`` loaded."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--check', action='store_true', help="fail if a light entry point loads a heavy module")
+    args = parser.parse_args()
+
+    failures = []
+    for module, heavy_allowed in ENTRY_POINTS.items():
+        runs = [import_times(module) for _ in range(args.repeat)]
+        best = min(run[module] for run in runs)
+        heavy = [name for name in HEAVY_MODULES if name in runs[0]]
+        print(f"  {module:<20} {best / 1e3:8.1f} ms  heavy: {', '.join(heavy) or '-'}")
+        if heavy and not heavy_allowed:
+            failures.append(module)
+
+    if args.check and failures:
+        sys.exit(f"Heavy dependencies loaded on import of {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
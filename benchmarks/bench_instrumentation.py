@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""Overhead of ndmeta's instrumentation hooks with no-op and recording sinks.
+
+Times chunk coverage over many files of a synthetic catalog (no files are
+opened) plus the bare cost of a timer/count pair, under each sink.
+
+    python -m benchmarks.bench_instrumentation --files 1000
+"""
+import argparse
+import time
+
+from ndmeta import Catalog, NDimMeta, instrument
+from ndmeta.instrument import NullSink, SpanSink, StatsSink
+
+from .bench_memory import synthetic_file_metas
+
+
+def build_catalog(n_files):
+    metas = [NDimMeta(synthetic_file_metas(i), None) for i in range(n_files)]
+    return Catalog.from_metas(metas, 'time')
+
+
+def time_coverage(catalog, chunk_sizes, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for position in range(len(catalog)):
+            catalog.chunk_coverage(position, chunk_sizes, compact=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_hooks(calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        with instrument.timer('bench'):
+            instrument.count('bench')
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--calls', type=int, default=200_000)
+    args = parser.parse_args()
+
+    catalog = build_catalog(args.files)
+    chunk_sizes = {'time': 365, 'lat': 48, 'lon': 72}
+
+    baseline = None
+    print(f"{args.files} files, chunk sizes {chunk_sizes}")
+    for label, sink in [('disabled', NullSink()), ('stats', StatsSink()), ('spans', SpanSink())]:
+        with instrument.use_sink(sink):
+            elapsed = time_coverage(catalog, chunk_sizes, args.repeat)
+            per_hook = time_hooks(args.calls)
+        baseline = baseline or elapsed
+        print(f"  {label:<9} coverage {elapsed * 1e3:8.1f} ms ({(elapsed / baseline - 1) * 100:+5.1f}%), "
+              f"timer+count {per_hook * 1e9:7.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""Compare modelled and measured read cost of chunk layouts.
+
+Builds an in-memory dataset, stores it under each layout as compressed
+chunks, then times a set of query patterns and prints them next to the
+cost model's prediction.
+
+    python -m benchmarks.bench_layouts --time 2920 --lat 96 --lon 144
+"""
+import argparse
+import time
+
+from ndmeta import NDimMeta
+from ndmeta.cost import QueryPattern, estimate_query_cost
+from ndmeta.util import format_mem_size
+
+from .synthetic import ChunkStore, make_synthetic_dataset
+
+
+DEFAULT_LAYOUTS = {
+    'time-series': {'time': 2920, 'lat': 8, 'lon': 8},
+    'balanced': {'time': 365, 'lat': 48, 'lon': 72},
+    'spatial-map': {'time': 8, 'lat': 96, 'lon': 144},
+}
+
+
+def default_queries(time_size, lat_size, lon_size):
+    season = max(time_size // 4, 1)
+    return [
+        QueryPattern('point time series', {'lat': lat_size // 2, 'lon': lon_size // 3}),
+        QueryPattern('map at one step', {'time': time_size // 2}),
+        QueryPattern('regional box over a season', {
+            'time': slice(0, season),
+            'lat': slice(lat_size // 4, lat_size // 2),
+            'lon': slice(lon_size // 4, lon_size // 2),
+        }),
+    ]
+
+
+def time_read(store, selection, repeat):
+    timings = []
+    for _ in range(repeat):
+        store.reset_counters()
+        start = time.perf_counter()
+        store.read(selection)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(time_size, lat_size, lon_size, repeat, layouts=None):
+    ds = make_synthetic_dataset(time_size, lat_size, lon_size)
+    meta = NDimMeta.from_xarray(ds)
+    queries = default_queries(time_size, lat_size, lon_size)
+    rows = []
+    for layout_name, chunk_sizes in (layouts or DEFAULT_LAYOUTS).items():
+        chunk_sizes = {dim: min(size, ds.sizes[dim]) for dim, size in chunk_sizes.items()}
+        store = ChunkStore(ds['pr'], chunk_sizes)
+        for query in queries:
+            predicted = estimate_query_cost(meta, chunk_sizes, query, 'pr')
+            latency = time_read(store, query.selection, repeat)
+            rows.append((layout_name, query.name, predicted, store.chunks_read, store.bytes_decompressed, latency))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--time', type=int, default=2920)
+    parser.add_argument('--lat', type=int, default=96)
+    parser.add_argument('--lon', type=int, default=144)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    header = f"{'layout':<12} {'query':<28} {'chunks':>7} {'measured':>8} {'model bytes':>12} {'measured':>12} {'amplif.':>8} {'latency':>10}"
+    print(header)
+    print('-' * len(header))
+    for layout, query, predicted, chunks_read, bytes_read, latency in run(args.time, args.lat, args.lon, args.repeat):
+        print(
+            f"{layout:<12} {query:<28} {predicted.chunks_touched:>7} {chunks_read:>8} "
+            f"{format_mem_size(predicted.bytes_read):>12} {format_mem_size(bytes_read):>12} "
+            f"{predicted.read_amplification:>8.1f} {latency * 1000:>8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
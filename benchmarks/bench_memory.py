@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""Memory footprint of ArrayMeta versus CompactArrayMeta on a synthetic catalog.
+
+Builds per-file metadata for a CMIP-like archive directly (no files are
+opened) and measures the allocations each representation keeps alive.
+
+    python -m benchmarks.bench_memory --files 100000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+import numpy as np
+
+from ndmeta import ArrayMeta, AttributePool, CompactArrayMeta
+from ndmeta.util import format_mem_size
+
+
+VARIABLE_ATTRIBUTES = {
+    'pr': {'standard_name': 'precipitation_flux', 'long_name': 'Precipitation', 'units': 'kg m-2 s-1',
+           'comment': 'includes both liquid and solid phases', 'cell_methods': 'area: time: mean',
+           'cell_measures': 'area: areacella', 'history': '2019-11-28T12:00:00Z altered by CMOR'},
+    'time': {'bounds': 'time_bnds', 'axis': 'T', 'long_name': 'time', 'standard_name': 'time'},
+    'time_bnds': {},
+    'lat': {'bounds': 'lat_bnds', 'units': 'degrees_north', 'axis': 'Y', 'long_name': 'Latitude', 'standard_name': 'latitude'},
+    'lat_bnds': {},
+    'lon': {'bounds': 'lon_bnds', 'units': 'degrees_east', 'axis': 'X', 'long_name': 'Longitude', 'standard_name': 'longitude'},
+    'lon_bnds': {},
+}
+
+VARIABLE_DIMS = {
+    'pr': ('time', 'lat', 'lon'),
+    'time': ('time',),
+    'time_bnds': ('time', 'bnds'),
+    'lat': ('lat',),
+    'lat_bnds': ('lat', 'bnds'),
+    'lon': ('lon',),
+    'lon_bnds': ('lon', 'bnds'),
+}
+
+SIZES = {'time': 2920, 'lat': 192, 'lon': 288, 'bnds': 2}
+RANGES = {'lat': (-89.28, 89.28), 'lon': (0.0, 358.75), 'bnds': (0, 1)}
+
+
+def synthetic_file_metas(file_index):
+    time_range = (file_index * SIZES['time'], (file_index + 1) * SIZES['time'] - 1)
+    metas = {}
+    for var_name, dims in VARIABLE_DIMS.items():
+        attributes = dict(VARIABLE_ATTRIBUTES[var_name])
+        attributes['dimension_names'] = dims
+        shape = tuple(SIZES[dim] for dim in dims)
+        metas[var_name] = ArrayMeta(
+            shape=shape,
+            fill_value=np.float32(1e20) if var_name == 'pr' else None,
+            dtype=np.dtype('float32' if var_name == 'pr' else 'float64'),
+            chunk_grid=shape,
+            attributes=attributes,
+            dimension_ranges={dim: time_range if dim == 'time' else RANGES[dim] for dim in dims},
+            estimated_obj_size=4 if var_name == 'pr' else 8,
+            is_data_var=var_name == 'pr',
+        )
+    return metas
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=100_000)
+    args = parser.parse_args()
+
+    plain, plain_bytes, plain_time = measure(lambda: [synthetic_file_metas(i) for i in range(args.files)])
+    del plain
+
+    def build_compact():
+        pool = AttributePool()
+        return pool, [
+            {var_name: CompactArrayMeta.from_array_meta(meta, pool) for var_name, meta in synthetic_file_metas(i).items()}
+            for i in range(args.files)
+        ]
+
+    (pool, compact), compact_bytes, compact_time = measure(build_compact)
+    n_metas = args.files * len(VARIABLE_DIMS)
+
+    print(f"{args.files} files, {n_metas} variable metadata objects")
+    print(f"  ArrayMeta:        {format_mem_size(plain_bytes):>10} ({plain_bytes / n_metas:.0f} B/variable), built in {plain_time:.2f}s")
+    print(f"  CompactArrayMeta: {format_mem_size(compact_bytes):>10} ({compact_bytes / n_metas:.0f} B/variable), built in {compact_time:.2f}s")
+    print(f"  Interned values:  {len(pool)}")
+    print(f"  Reduction:        {plain_bytes / compact_bytes:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""Throughput of scan_files on local NetCDF-4 files by executor and worker count.
+
+Writes small NetCDF-4 files to a temporary directory and scans them with a
+thread pool and a process pool at each worker count. xarray opens
+netCDF4/HDF5 files behind one global lock, so threads stay near the
+single-worker rate while processes scale with the cores available.
+
+    python -m benchmarks.bench_scan --files 200 --workers 1 2 4 8
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import xarray as xr
+
+from ndmeta.scan import scan_files
+
+
+def write_files(directory, n_files, time_size):
+    paths = []
+    for i in range(n_files):
+        ds = xr.Dataset(
+            {'tas': (('time', 'lat', 'lon'), np.zeros((time_size, 18, 36), dtype='float32'), {'units': 'K'})},
+            coords={'time': np.arange(i * time_size, (i + 1) * time_size), 'lat': np.linspace(-90, 90, 18), 'lon': np.linspace(0, 360, 36, endpoint=False)},
+        )
+        path = os.path.join(directory, f'tas_{i:04d}.nc')
+        ds.to_netcdf(path, engine='netcdf4')
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--time-size', type=int, default=100)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_files(directory, args.files, args.time_size)
+        print(f"{args.files} NetCDF-4 files, {os.cpu_count()} cores")
+        for executor in ('thread', 'process'):
+            for workers in args.workers:
+                start = time.perf_counter()
+                result = scan_files(paths, concat_dim='time', max_workers=workers, executor=executor)
+                elapsed = time.perf_counter() - start
+                assert result.ok, result.errors or result.catalog_error
+                print(f"  {executor:<7} {workers:3d} workers: {elapsed:6.2f}s, {args.files / elapsed:7.1f} files/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""Simulated makespan of naive chunk splitting versus plan_tasks.
+
+Builds a synthetic catalog (no files are opened) with data variables of
+different item sizes, splits its chunks into tasks both ways and replays
+them on simulated workers that pull tasks from a shared queue. A task costs
+``bytes / bandwidth`` plus ``open_latency`` per distinct file it reads.
+
+    python -m benchmarks.bench_schedule --files 50 --workers 16
+"""
+import argparse
+import dataclasses
+import heapq
+
+import numpy as np
+
+from ndmeta import Catalog, NDimMeta
+from ndmeta.schedule import WorkTask, plan_tasks
+
+from .bench_memory import synthetic_file_metas
+
+
+def file_meta(i):
+    metas = synthetic_file_metas(i)
+    pr = metas['pr']
+    # Data variables whose items differ in size by 16x
+    metas['tas'] = dataclasses.replace(pr, dtype=np.dtype('float64'), estimated_obj_size=8)
+    metas['flags'] = dataclasses.replace(pr, dtype=np.dtype('uint8'), estimated_obj_size=1, fill_value=None)
+    metas['hus'] = dataclasses.replace(pr, dtype=np.dtype('float64'), estimated_obj_size=16)
+    return NDimMeta(metas, None)
+
+
+def naive_tasks(catalog, chunk_sizes, num_tasks):
+    # Every chunk of one variable after another, split into equal chunk counts
+    work = [
+        chunk
+        for var_name in catalog.meta.array_meta
+        for task in plan_tasks(catalog, chunk_sizes, num_tasks=1, var_names=[var_name])
+        for chunk in task.chunks
+    ]
+    tasks = []
+    for task_id, group in enumerate(np.array_split(np.arange(len(work)), num_tasks)):
+        chunks = [work[i] for i in group]
+        tasks.append(WorkTask(task_id, chunks, sum(chunk.estimated_bytes for chunk in chunks)))
+    return tasks
+
+
+def simulate(tasks, workers, bandwidth, open_latency):
+    busy = [0.0] * workers
+    free = [(0.0, worker) for worker in range(workers)]
+    for task in tasks:
+        now, worker = heapq.heappop(free)
+        cost = task.estimated_bytes / bandwidth + open_latency * len(task.sources)
+        busy[worker] += cost
+        heapq.heappush(free, (now + cost, worker))
+    makespan = max(t for t, _ in free)
+    return makespan, max(busy) / np.mean(busy) - 1, sum(len(task.sources) for task in tasks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--tasks-per-worker', type=int, default=4)
+    parser.add_argument('--bandwidth', type=float, default=200e6, help='bytes per second per worker')
+    parser.add_argument('--open-latency', type=float, default=0.05, help='seconds per file opened')
+    args = parser.parse_args()
+
+    catalog = Catalog.from_metas([file_meta(i) for i in range(args.files)], 'time')
+    chunk_sizes = {'time': 1000, 'lat': 96, 'lon': 144, 'bnds': 2}
+    num_tasks = args.workers * args.tasks_per_worker
+
+    print(f"{args.files} files, {args.workers} workers, {num_tasks} tasks, chunks {chunk_sizes}")
+    for label, tasks in [
+        ('naive split', naive_tasks(catalog, chunk_sizes, num_tasks)),
+        # plan_tasks output is submitted largest first, as submit_tasks does
+        ('plan_tasks', sorted(plan_tasks(catalog, chunk_sizes, num_tasks=num_tasks), key=lambda t: -t.estimated_bytes)),
+    ]:
+        makespan, imbalance, opens = simulate(tasks, args.workers, args.bandwidth, args.open_latency)
+        print(f"  {label:<12} {len(tasks):4d} tasks, makespan {makespan:7.2f}s, imbalance {imbalance * 100:5.1f}%, files opened {opens}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""Build time of TiledCatalog as the number of lat/lon tiles grows.
+
+Tile metadata is constructed directly (no files are opened). Time per tile
+should stay flat if placement and merging are linear in the number of tiles.
+
+    python -m benchmarks.bench_tiling --sides 8 16 32 64
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ndmeta import ArrayMeta, NDimMeta, TiledCatalog
+
+
+TILE = {'time': 365, 'lat': 30, 'lon': 30}
+
+
+def tile_meta(lat_index, lon_index):
+    ranges = {
+        'time': (0, TILE['time'] - 1),
+        'lat': (lat_index * TILE['lat'], (lat_index + 1) * TILE['lat'] - 1),
+        'lon': (lon_index * TILE['lon'], (lon_index + 1) * TILE['lon'] - 1),
+    }
+
+    def array_meta(dims, dtype, is_data_var=False):
+        shape = tuple(TILE[dim] for dim in dims)
+        return ArrayMeta(
+            shape=shape,
+            fill_value=None,
+            dtype=np.dtype(dtype),
+            chunk_grid=shape,
+            attributes={'dimension_names': dims},
+            dimension_ranges={dim: ranges[dim] for dim in dims},
+            estimated_obj_size=np.dtype(dtype).itemsize,
+            is_data_var=is_data_var,
+        )
+
+    return NDimMeta({
+        'tas': array_meta(('time', 'lat', 'lon'), 'float32', is_data_var=True),
+        'time': array_meta(('time',), 'float64'),
+        'lat': array_meta(('lat',), 'float64'),
+        'lon': array_meta(('lon',), 'float64'),
+    }, None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sides', type=int, nargs='+', default=[8, 16, 32, 64])
+    args = parser.parse_args()
+
+    for side in args.sides:
+        metas = [tile_meta(i, j) for i in range(side) for j in range(side)]
+        # Shuffle so placement cannot rely on input order
+        order = np.random.default_rng(0).permutation(len(metas))
+        metas = [metas[i] for i in order]
+
+        start = time.perf_counter()
+        catalog = TiledCatalog.from_metas(metas, ('lat', 'lon'))
+        elapsed = time.perf_counter() - start
+        print(f"{len(metas):6d} tiles {catalog.grid_shape}: {elapsed * 1e3:8.1f} ms, {elapsed / len(metas) * 1e6:6.1f} us/tile")
+
+
+if __name__ == "__main__":
+    main()
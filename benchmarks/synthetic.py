@@ -0,0 +1,76 @@
+import zlib
+
+import numpy as np
+import xarray as xr
+
+from ndmeta import ChunkGrid
+from ndmeta.cost import normalize_indices
+
+
+def make_synthetic_dataset(time_size=2920, lat_size=96, lon_size=144, n_vars=1, dtype='float32', seed=0, time_start=0):
+    """In-memory dataset shaped like a gridded climate-model output file."""
+    rng = np.random.default_rng(seed)
+    shape = (time_size, lat_size, lon_size)
+    data_vars = {
+        f"var{i}" if n_vars > 1 else 'pr': (('time', 'lat', 'lon'), rng.random(shape, dtype='float64').astype(dtype), {'units': 'kg m-2 s-1'})
+        for i in range(n_vars)
+    }
+    return xr.Dataset(
+        data_vars,
+        coords={
+            'time': np.arange(time_start, time_start + time_size, dtype='int64'),
+            'lat': np.linspace(-90, 90, lat_size),
+            'lon': np.linspace(0, 360, lon_size, endpoint=False),
+        },
+    )
+
+
+class ChunkStore:
+    """Compressed chunks of one array held in memory, read back chunk by chunk.
+
+    Reads decompress every chunk a selection touches, which is what a chunked
+    on-disk format would do, so latency reflects the chunk layout.
+    """
+
+    def __init__(self, data: xr.DataArray, chunk_sizes: dict, level: int = 1):
+        self.grid = ChunkGrid.from_shape(data.dims, data.shape, chunk_sizes)
+        self.dtype = data.dtype
+        values = data.values
+        self.chunks = {}
+        for index in range(len(self.grid)):
+            slices = self.grid[index]
+            block = np.ascontiguousarray(values[tuple(slices[dim] for dim in self.grid.dims)])
+            self.chunks[index] = (block.shape, zlib.compress(block.tobytes(), level))
+        self.bytes_decompressed = 0
+        self.chunks_read = 0
+
+    @property
+    def stored_bytes(self) -> int:
+        return sum(len(blob) for _, blob in self.chunks.values())
+
+    def read(self, selection: dict) -> np.ndarray:
+        per_dim = [
+            normalize_indices(selection.get(dim, slice(None)), size, dim)
+            for dim, size in zip(self.grid.dims, self.grid.shape)
+        ]
+        out = np.empty(tuple(map(len, per_dim)), dtype=self.dtype)
+
+        for chunk_id in self.grid.chunk_ids(dict(zip(self.grid.dims, per_dim))):
+            slices = self.grid[int(chunk_id)]
+            shape, blob = self.chunks[int(chunk_id)]
+            block = np.frombuffer(zlib.decompress(blob), dtype=self.dtype).reshape(shape)
+            self.bytes_decompressed += block.nbytes
+            self.chunks_read += 1
+
+            src, dst = [], []
+            for indices, dim in zip(per_dim, self.grid.dims):
+                chunk = slices[dim]
+                mask = (indices >= chunk.start) & (indices < chunk.stop)
+                src.append(indices[mask] - chunk.start)
+                dst.append(np.flatnonzero(mask))
+            out[np.ix_(*dst)] = block[np.ix_(*src)]
+        return out
+
+    def reset_counters(self):
+        self.bytes_decompressed = 0
+        self.chunks_read = 0
@@ -1,18 +1,19 @@
 from pprint import pprint
 
-import xarray as xr
-
-from ndmeta import NDimMeta
+from ndmeta import scan_files
 
 
 if __name__ == "__main__":
     netcdf_path1 = "/Users/nzimmerman/Downloads/pr_3hr_CMCC-ESM2_historical_r1i1p1f1_gn_185001010130-185412312230.nc"
     netcdf_path2 = "/Users/nzimmerman/Downloads/pr_3hr_CMCC-ESM2_historical_r1i1p1f1_gn_185501010130-185912312230.nc"
-    with xr.open_dataset(netcdf_path1) as ds:
-        meta1 = NDimMeta.from_xarray(ds)
-    with xr.open_dataset(netcdf_path2) as ds:
-        meta2 = NDimMeta.from_xarray(ds)
+    scan = scan_files([netcdf_path1, netcdf_path2], concat_dim='time')
+    if scan.errors:
+        pprint(scan.errors)
 
-    merged_meta = meta1.merge_with(meta2, concat_dim='time')
+    merged_meta = scan.catalog.meta
     chunk_sizes = {'time': 1000, 'lat': 90, 'lon': 180}
-    merged_meta.analyze_chunking_strategy(chunk_sizes)
\ No newline at end of file
+    merged_meta.analyze_chunking_strategy(chunk_sizes)
+
+    print("Ranked chunk shapes for time-series reads:")
+    for candidate in merged_meta.optimize_chunks(8 * 1024 ** 2, access_weights={'time': 1.0}, top=5):
+        print(f"  - {candidate.describe()}")
\ No newline at end of file
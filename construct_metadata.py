@@ -16,7 +16,7 @@ if __name__ == "__main__":
     merged_meta = meta1.merge_with(meta2, concat_dim='time')
 
     chunk_sizes = {'time': 1000, 'lat': 90, 'lon': 180}
-    all_chunks = list(merged_meta.to_chunks(chunk_sizes))
+    chunk_grids = merged_meta.chunk_grids(chunk_sizes)
     with xr.open_dataset(netcdf_path1) as ds:
         covered_chunks1 = merged_meta.chunk_coverage(ds, chunk_sizes, 0)
         cc1_full = covered_chunks1["full_coverage"]
@@ -37,7 +37,7 @@ if __name__ == "__main__":
     print("CHUNKS PARTIAL 1 LENGTH")
     print(len(cc1_partial))
     # print("ALL CHUNKS")
-    # print(all_chunks)
+    # print({var_name: len(grid) for var_name, grid in chunk_grids.items()})
 
     def extract_chunk_data(chunk_definition, dataset):
         var_name, chunk_slices = chunk_definition
@@ -1,4 +1,34 @@
-from .array_meta import ArrayMeta
-from .ndim_meta import NDimMeta
+import importlib
 
-__all__ = ['ArrayMeta', 'NDimMeta']
\ No newline at end of file
+# Public names and the submodule defining each. Submodules are imported on
+# first attribute access (PEP 562), so ``import ndmeta`` stays cheap and a
+# code path only loads the dependencies it uses.
+_EXPORTS = {
+    'ArrayMeta': 'array_meta',
+    'AttributePool': 'compact',
+    'Catalog': 'catalog',
+    'ChunkGrid': 'chunk_grid',
+    'CompactArrayMeta': 'compact',
+    'MetadataCache': 'cache',
+    'NDimMeta': 'ndim_meta',
+    'RegularIndex': 'coord_index',
+    'ScanResult': 'scan',
+    'SortedIndex': 'coord_index',
+    'TiledCatalog': 'tiled',
+    'scan_files': 'scan',
+    'stream_chunks': 'executor',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
\ No newline at end of file
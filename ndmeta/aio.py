@@ -0,0 +1,175 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import importlib.util
+import io
+import logging
+import time
+from typing import Callable, Optional, Sequence
+
+from . import instrument
+from .cache import MetadataCache
+from .scan import HDF5_SIGNATURE, ScanResult, check_unique, collect_results, extract_metadata
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SIZE = 1024 ** 2
+
+# fs.info() fields that change when an object is rewritten, in order of preference
+VERSION_FIELDS = ('ETag', 'etag', 'md5', 'LastModified', 'last_modified', 'mtime', 'updated')
+
+
+def _open_filesystem(url: str, storage_options: Optional[dict]):
+    try:
+        import fsspec
+    except ImportError as e:
+        raise ImportError("scan_files_async needs fsspec (and e.g. aiohttp or s3fs) unless a filesystem is passed as fs=") from e
+    protocol = fsspec.core.split_protocol(url)[0] or 'file'
+    # One instance, and so one connection pool, shared by every request
+    return fsspec.filesystem(protocol, skip_instance_cache=True, **(storage_options or {}))
+
+
+class _DeadlineFile(io.RawIOBase):
+    """Seekable view of an open remote file that fails reads past a deadline.
+
+    Parsers only read the byte ranges they need, and every read counts
+    towards ``aio.bytes_fetched``.
+    """
+
+    def __init__(self, f, deadline: Optional[float]):
+        self._f = f
+        self._deadline = deadline
+
+    def _check_deadline(self):
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            raise asyncio.TimeoutError()
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer) -> int:
+        self._check_deadline()
+        data = self._f.read(len(buffer))
+        buffer[:len(data)] = data
+        instrument.count('aio.bytes_fetched', len(data))
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._f.seek(offset, whence)
+
+    def tell(self):
+        return self._f.tell()
+
+    def close(self):
+        if not self.closed:
+            self._f.close()
+        super().close()
+
+
+def _check_engine(f, open_dataset):
+    # xarray reads HDF5/NetCDF4 file objects only through h5netcdf
+    if open_dataset is not None or importlib.util.find_spec('h5netcdf') is not None:
+        return
+    signature = f.read(len(HDF5_SIGNATURE))
+    f.seek(0)
+    if signature == HDF5_SIGNATURE:
+        raise ImportError("Reading NetCDF4/HDF5 objects from remote file handles needs h5netcdf (pip install h5netcdf), or pass open_dataset=")
+
+
+def _object_identity(fs, url) -> Optional[list]:
+    # Size plus a version marker; without one a rewritten object could hit a stale entry
+    info = fs.info(url)
+    versions = [str(info[field]) for field in VERSION_FIELDS if info.get(field) is not None]
+    if not versions:
+        logger.debug("Not caching %s: the filesystem reports no version for it", url)
+        return None
+    return [info.get('size')] + versions[:1]
+
+
+def _extract_remote(url, fs, deadline, open_dataset, open_kwargs, block_size, index_coords):
+    f = _DeadlineFile(fs.open(url, mode='rb', block_size=block_size, cache_type='blockcache'), deadline)
+    with f:
+        f._check_deadline()
+        _check_engine(f, open_dataset)
+        return extract_metadata(f, open_dataset, open_kwargs, index_coords)
+
+
+def _scan_one_blocking(fs, url, deadline, open_dataset, open_kwargs, block_size, cache, index_coords):
+    extract = functools.partial(
+        _extract_remote, fs=fs, deadline=deadline, open_dataset=open_dataset,
+        open_kwargs=open_kwargs, block_size=block_size, index_coords=index_coords
+    )
+    identity = None if cache is None else _object_identity(fs, url)
+    if identity is None:
+        return extract(url)
+    return cache.get_or_extract(url, extract, index_coords, identity)
+
+
+async def _scan_one_async(fs, url, semaphore, executor, timeout, *args):
+    try:
+        # The slot is held until the file is parsed and closed or its deadline
+        # passes, so at most ``concurrency`` files are being read at once
+        async with semaphore:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(executor, _scan_one_blocking, fs, url, deadline, *args)
+            meta = await asyncio.wait_for(future, timeout)
+        return meta, None
+    except Exception as e:
+        return None, e
+
+
+async def scan_files_async(
+    urls: Sequence[str],
+    concat_dim: Optional[str] = None,
+    concurrency: int = 32,
+    timeout: Optional[float] = 60.0,
+    fs=None,
+    storage_options: Optional[dict] = None,
+    open_dataset: Optional[Callable] = None,
+    open_kwargs: Optional[dict] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    cache: Optional[MetadataCache] = None,
+    index_coords: bool = False,
+) -> ScanResult:
+    """Asynchronous counterpart of ``scan_files`` for object-store URLs.
+
+    This is a thread pool behind an async interface: the parsers need a
+    blocking file object, so each object is opened through fsspec's
+    synchronous API (``fs``, or a filesystem created for the URLs'
+    protocol) on a worker thread, as a seekable file with a block cache.
+    The parser fetches only the ``block_size`` ranges holding the header and
+    coordinates. At most ``concurrency`` files are read at a time, and each
+    must be opened and parsed within ``timeout`` seconds; a file past its
+    deadline frees its slot at once and is recorded as a timeout, while its
+    thread stops at its next read. Failures are recorded in ``errors``.
+
+    ``cache`` and ``index_coords`` work as in ``scan_files``. Objects are
+    cached under their URL, size and the version (ETag or modification
+    time) reported by ``fs.info``; objects without one are not cached.
+
+    NetCDF4/HDF5 objects need h5netcdf when read with the default
+    ``open_dataset``; NetCDF3 objects are read by scipy.
+    """
+    urls = list(urls)
+    check_unique(urls)
+    if fs is None and urls:
+        fs = _open_filesystem(urls[0], storage_options)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    # Spare threads let new files start while timed-out ones wind down
+    executor = ThreadPoolExecutor(max_workers=2 * concurrency)
+    try:
+        outcomes = await asyncio.gather(*[
+            _scan_one_async(fs, url, semaphore, executor, timeout, open_dataset, open_kwargs, block_size, cache, index_coords)
+            for url in urls
+        ])
+    finally:
+        # Do not block the event loop on threads still finishing timed-out files
+        executor.shutdown(wait=False)
+
+    return collect_results(urls, outcomes, concat_dim)
@@ -1,10 +1,7 @@
-from dataclasses import dataclass, field
-from itertools import product
-from pprint import pprint
-from typing import Any, Dict, Tuple
+from dataclasses import dataclass
+import math
+from typing import Any, Dict, Sequence, Tuple
 
-import cftime
-import xarray as xr
 import numpy as np
 
 @dataclass
@@ -21,6 +18,23 @@ class ArrayMeta:
     def __post_init__(self):
         self.ndim = len(self.shape)
 
+    def __eq__(self, other):
+        # Field-wise like the dataclass default, but NaN fill values and attributes equal themselves
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            self.shape == other.shape
+            and _fill_values_equal(self.fill_value, other.fill_value)
+            and self.dtype == other.dtype
+            and self.chunk_grid == other.chunk_grid
+            and values_equal(self.attributes, other.attributes)
+            and values_equal(self.dimension_ranges, other.dimension_ranges)
+            and self.estimated_obj_size == other.estimated_obj_size
+            and self.is_data_var == other.is_data_var
+        )
+
+    __hash__ = None
+
     def to_dict(self):
         return {
             "shape": self.shape,
@@ -29,53 +43,105 @@ class ArrayMeta:
             "chunk_grid": self.chunk_grid,
             "attributes": self.attributes,
             "dimension_ranges": self.dimension_ranges,
-            "estimated_obj_size": int,
+            "estimated_obj_size": self.estimated_obj_size,
             "is_data_var": self.is_data_var
         }
 
     def merge_with(self, other: 'ArrayMeta', concat_dim: str):
-        if self.dtype != other.dtype:
-            raise ValueError("Data types do not match")
-        if self.fill_value != other.fill_value:
-            raise ValueError("Fill values do not match")
+        return ArrayMeta.concat([self, other], concat_dim)
 
-        try:
-            concat_index = self.attributes['dimension_names'].index(concat_dim)
-        except ValueError:
-            raise ValueError(f"Concatenation dimension {concat_dim} not found in metadata for '{self.attributes.get('standard_name', 'unknown variable')}'.")
-
-        new_shape = list(self.shape)
-        new_shape[concat_index] += other.shape[concat_index]
-
-        new_chunk_grid = self.chunk_grid  # Assuming chunk grids remain the same for simplicity
-        new_attributes = {**self.attributes, **other.attributes}
-
-        # Dimension range merging logic
-        new_dimension_ranges = {}
-        for dim in set(self.dimension_ranges.keys()).union(other.dimension_ranges.keys()):
-            if dim in self.dimension_ranges and dim in other.dimension_ranges:
-                if dim == concat_dim:
-                    # For the concatenation dimension, extend the range
-                    new_dimension_ranges[dim] = (self.dimension_ranges[dim][0], other.dimension_ranges[dim][1])
-                else:
-                    # For non-concatenation dimensions, find the min and max of the ranges
-                    start = min(self.dimension_ranges[dim][0], other.dimension_ranges[dim][0])
-                    end = max(self.dimension_ranges[dim][1], other.dimension_ranges[dim][1])
-                    new_dimension_ranges[dim] = (start, end)
-            elif dim in self.dimension_ranges:
-                new_dimension_ranges[dim] = self.dimension_ranges[dim]
-            else:
-                new_dimension_ranges[dim] = other.dimension_ranges[dim]
+    @classmethod
+    def concat(cls, metas: Sequence['ArrayMeta'], concat_dim: str) -> 'ArrayMeta':
+        """Concatenate ordered metadata along ``concat_dim`` in a single pass."""
+        first = metas[0]
+        concat_index = concat_axis(first, concat_dim)
+        check_mergeable(metas)
 
-        average_obj_size = (self.estimated_obj_size + other.estimated_obj_size) / 2
+        new_attributes = {}
+        for meta in metas:
+            new_attributes.update(meta.attributes)
 
-        return ArrayMeta(
+        new_shape = list(first.shape)
+        new_shape[concat_index] = sum(meta.shape[concat_index] for meta in metas)
+
+        return cls(
             shape=tuple(new_shape),
-            fill_value=self.fill_value,
-            dtype=self.dtype,
-            chunk_grid=new_chunk_grid,
+            fill_value=first.fill_value,
+            dtype=first.dtype,
+            chunk_grid=first.chunk_grid,  # Assuming chunk grids remain the same for simplicity
             attributes=new_attributes,
-            dimension_ranges=new_dimension_ranges,
-            estimated_obj_size=average_obj_size,
-            is_data_var=self.is_data_var
+            dimension_ranges=merge_dimension_ranges(metas, concat_dim),
+            estimated_obj_size=merge_obj_sizes(metas),
+            is_data_var=first.is_data_var
         )
+
+
+def concat_axis(meta, concat_dim: str) -> int:
+    try:
+        return meta.attributes['dimension_names'].index(concat_dim)
+    except ValueError:
+        raise ValueError(f"Concatenation dimension {concat_dim} not found in metadata for '{meta.attributes.get('standard_name', 'unknown variable')}'.")
+
+
+def check_mergeable(metas):
+    first = metas[0]
+    for meta in metas[1:]:
+        if meta.dtype != first.dtype:
+            raise ValueError("Data types do not match")
+        if not _fill_values_equal(meta.fill_value, first.fill_value):
+            raise ValueError("Fill values do not match")
+
+
+def merge_dimension_ranges(metas, concat_dim: str) -> Dict[str, Tuple[Any, Any]]:
+    first, last = metas[0], metas[-1]
+    new_dimension_ranges = {}
+    # For non-concatenation dimensions, find the min and max of the ranges
+    for meta in metas:
+        for dim, (start, end) in meta.dimension_ranges.items():
+            if dim == concat_dim:
+                continue
+            if dim in new_dimension_ranges:
+                current_start, current_end = new_dimension_ranges[dim]
+                new_dimension_ranges[dim] = (min(current_start, start), max(current_end, end))
+            else:
+                new_dimension_ranges[dim] = (start, end)
+
+    # For the concatenation dimension, extend the range
+    if concat_dim in first.dimension_ranges and concat_dim in last.dimension_ranges:
+        new_dimension_ranges[concat_dim] = (first.dimension_ranges[concat_dim][0], last.dimension_ranges[concat_dim][1])
+    return new_dimension_ranges
+
+
+def merge_obj_sizes(metas) -> float:
+    """Mean element size over ``metas``, weighted by each one's element count."""
+    counts = [math.prod(meta.shape) for meta in metas]
+    total = sum(counts)
+    if total == 0:
+        return sum(meta.estimated_obj_size for meta in metas) / len(metas)
+    return sum(meta.estimated_obj_size * count for meta, count in zip(metas, counts)) / total
+
+
+def values_equal(a, b) -> bool:
+    """Structural equality of metadata values in which NaN equals NaN."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(values_equal(a[key], b[key]) for key in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return type(a) is type(b) and len(a) == len(b) and all(values_equal(x, y) for x, y in zip(a, b))
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        a, b = np.asarray(a), np.asarray(b)
+        if a.shape != b.shape or a.dtype != b.dtype:
+            return False
+        return all(values_equal(x, y) for x, y in zip(a.ravel().tolist(), b.ravel().tolist()))
+    try:
+        return bool(a == b) or bool(a != a and b != b)
+    except (TypeError, ValueError):
+        return False
+
+
+def _fill_values_equal(a, b) -> bool:
+    if a is None or b is None:
+        return a is b
+    try:
+        return bool(a == b) or bool(np.isnan(a) and np.isnan(b))
+    except (TypeError, ValueError):
+        return False
@@ -0,0 +1,207 @@
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Callable, Optional, Sequence
+
+from .ndim_meta import NDimMeta
+from . import serialize
+
+
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_digest(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class MetadataCache:
+    """On-disk cache of per-file NDimMeta with an in-memory LRU in front.
+
+    Entries are keyed by the file's real path, size and mtime, plus a SHA-256
+    of its contents when ``hash_content`` is set, so a changed file never
+    hits a stale entry. Objects that are not local files (such as URLs) are
+    keyed by the ``identity`` passed for them instead, e.g. their size and
+    ETag. Metadata extracted with ``index_coords`` is keyed
+    separately from metadata without coordinate indexes. Disk entries are evicted least recently used first
+    once ``max_entries`` or ``max_bytes`` is exceeded. Disk usage is tracked
+    incrementally between scans, and eviction trims to 90% of the limits, so
+    the directory is rescanned about once per tenth of the cache rather than
+    on every write.
+    """
+
+    def __init__(
+        self,
+        directory,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        hash_content: bool = False,
+        memory_entries: int = 1024,
+    ):
+        self.directory = os.fspath(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hash_content = hash_content
+        self.memory_entries = memory_entries
+        os.makedirs(self.directory, exist_ok=True)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        # (entries, bytes) on disk as of the last scan plus writes since; None until scanned
+        self._usage = None
+
+    def __getstate__(self):
+        # Locks and the in-memory layer are per process
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_memory'] = OrderedDict()
+        state['_usage'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def key(self, path, index_coords: bool = False, identity: Optional[Sequence] = None) -> str:
+        if identity is not None:
+            identity = [str(path)] + list(identity)
+        else:
+            real_path = os.path.realpath(path)
+            stat = os.stat(real_path)
+            identity = [real_path, stat.st_size, stat.st_mtime_ns]
+            if self.hash_content:
+                identity.append(file_digest(real_path))
+        if index_coords:
+            identity.append('index_coords')
+        return hashlib.sha256(json.dumps(identity).encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _remember(self, key: str, meta: NDimMeta):
+        with self._lock:
+            self._memory[key] = meta
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, path, index_coords: bool = False, identity: Optional[Sequence] = None) -> Optional[NDimMeta]:
+        key = self.key(path, index_coords, identity)
+        entry_path = self._entry_path(key)
+        with self._lock:
+            meta = self._memory.get(key)
+            if meta is not None:
+                self._memory.move_to_end(key)
+        if meta is not None:
+            self._touch(entry_path)
+            return meta
+
+        try:
+            with open(entry_path) as f:
+                meta = serialize.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning("Discarding unreadable cache entry %s: %r", entry_path, e)
+            self._remove(entry_path)
+            return None
+
+        self._touch(entry_path)
+        self._remember(key, meta)
+        return meta
+
+    def _touch(self, entry_path: str):
+        # Bump the mtime on every hit, memory ones included, so disk eviction is least recently used
+        try:
+            os.utime(entry_path)
+        except FileNotFoundError:
+            pass
+
+    def put(self, path, meta: NDimMeta, index_coords: bool = False, identity: Optional[Sequence] = None):
+        key = self.key(path, index_coords, identity)
+        data = serialize.dumps(meta).encode()
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._entry_path(key))
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+        self._remember(key, meta)
+
+        with self._lock:
+            if self._usage is not None:
+                # Overwrites are counted as new entries; the next scan corrects that
+                self._usage = (self._usage[0] + 1, self._usage[1] + len(data))
+            over_limit = self._usage is None or self._over_limit(*self._usage)
+        if over_limit:
+            self.evict()
+
+    def get_or_extract(
+        self, path, extract: Callable[..., NDimMeta], index_coords: bool = False, identity: Optional[Sequence] = None
+    ) -> NDimMeta:
+        meta = self.get(path, index_coords, identity)
+        if meta is None:
+            meta = extract(path)
+            self.put(path, meta, index_coords, identity)
+        return meta
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _over_limit(self, entries: int, nbytes: int) -> bool:
+        return (
+            (self.max_entries is not None and entries > self.max_entries)
+            or (self.max_bytes is not None and nbytes > self.max_bytes)
+        )
+
+    def evict(self):
+        """Scan the directory and, once over a limit, remove LRU entries down to 90% of it."""
+        if self.max_entries is None and self.max_bytes is None:
+            return
+        entries = sorted(self._entries())
+        total_bytes = sum(size for _, size, _ in entries)
+        # Trimming below the limits leaves room for writes before the next scan
+        over_limit = self._over_limit(len(entries), total_bytes)
+        max_entries = None if self.max_entries is None else self.max_entries - self.max_entries // 10
+        max_bytes = None if self.max_bytes is None else self.max_bytes - self.max_bytes // 10
+        while over_limit and entries and (
+            (max_entries is not None and len(entries) > max_entries)
+            or (max_bytes is not None and total_bytes > max_bytes)
+        ):
+            _, size, path = entries.pop(0)
+            self._remove(path)
+            total_bytes -= size
+            key = os.path.basename(path)[:-len('.json')]
+            with self._lock:
+                self._memory.pop(key, None)
+        with self._lock:
+            self._usage = (len(entries), total_bytes)
+
+    def clear(self):
+        for _, _, path in self._entries():
+            self._remove(path)
+        with self._lock:
+            self._memory.clear()
+            self._usage = (0, 0)
@@ -0,0 +1,240 @@
+from dataclasses import dataclass
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .chunk_grid import ChunkGrid
+from .ndim_meta import NDimMeta
+from . import coverage
+
+
+logger = logging.getLogger(__name__)
+
+
+def concat_range(meta: NDimMeta, concat_dim: str):
+    """First and last coordinate values a file holds along ``concat_dim``."""
+    if concat_dim in meta.array_meta and concat_dim in meta.array_meta[concat_dim].dimension_ranges:
+        return meta.array_meta[concat_dim].dimension_ranges[concat_dim]
+    for array_meta in meta.array_meta.values():
+        if concat_dim in array_meta.dimension_ranges:
+            return array_meta.dimension_ranges[concat_dim]
+    raise ValueError(f"Concatenation dimension {concat_dim} not found in any variable's dimension ranges.")
+
+
+def concat_length(meta: NDimMeta, concat_dim: str) -> int:
+    for array_meta in meta.array_meta.values():
+        dims = array_meta.attributes['dimension_names']
+        if concat_dim in dims:
+            return array_meta.shape[dims.index(concat_dim)]
+    raise ValueError(f"Concatenation dimension {concat_dim} not found in any variable.")
+
+
+def is_descending(ranges, lengths) -> bool:
+    for (first, last), length in zip(ranges, lengths):
+        if length > 1:
+            return first > last
+    return False
+
+
+def check_contiguous(ranges, lengths, sources, descending=False):
+    """Raise if consecutive coordinate ranges overlap or leave a gap.
+
+    Gaps are detected against the step implied by each file's own endpoints,
+    so single-element files and coordinates without arithmetic are only
+    checked for ordering.
+    """
+    for position in range(1, len(ranges)):
+        (prev_first, prev_last), (first, last) = ranges[position - 1], ranges[position]
+        ordered = first < prev_last if descending else first > prev_last
+        if not ordered:
+            raise ValueError(f"Sources {sources[position - 1]!r} and {sources[position]!r} overlap along the concatenation dimension.")
+
+        prev_length = lengths[position - 1]
+        if prev_length < 2:
+            continue
+        try:
+            step = (prev_last - prev_first) / (prev_length - 1)
+            gap = first - prev_last
+            if abs(gap - step) > abs(step) / 2:
+                raise ValueError(f"Gap between sources {sources[position - 1]!r} and {sources[position]!r} along the concatenation dimension.")
+        except TypeError:
+            continue
+
+
+@dataclass
+class Catalog:
+    """Merged metadata of many files plus a prefix-sum index of file offsets.
+
+    ``offsets[i]`` is the global index along ``concat_dim`` at which
+    ``sources[i]`` starts; ``offsets[-1]`` is the merged length.
+    ``last_range`` is the coordinate range of the last source, which
+    ``append`` checks the next file's spacing against.
+    """
+    meta: NDimMeta
+    sources: List[Any]
+    offsets: np.ndarray
+    last_range: Optional[Tuple[Any, Any]] = None
+
+    @classmethod
+    def from_metas(cls, metas: Sequence[NDimMeta], concat_dim: str, sources: Optional[Sequence[Any]] = None) -> 'Catalog':
+        if not metas:
+            raise ValueError("At least one metadata set is required to build a catalog.")
+        sources = list(range(len(metas))) if sources is None else list(sources)
+        if len(sources) != len(metas):
+            raise ValueError(f"Got {len(sources)} sources for {len(metas)} metadata sets.")
+
+        ranges = [concat_range(meta, concat_dim) for meta in metas]
+        lengths = [concat_length(meta, concat_dim) for meta in metas]
+        descending = is_descending(ranges, lengths)
+        order = sorted(range(len(metas)), key=lambda i: ranges[i][0], reverse=descending)
+
+        ranges = [ranges[i] for i in order]
+        lengths = [lengths[i] for i in order]
+        sources = [sources[i] for i in order]
+        check_contiguous(ranges, lengths, sources, descending)
+
+        offsets = np.zeros(len(metas) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        merged = NDimMeta.concat([metas[i] for i in order], concat_dim)
+        logger.debug("Catalogued %d sources, %d steps along %s", len(sources), offsets[-1], concat_dim)
+        return cls(meta=merged, sources=sources, offsets=offsets, last_range=ranges[-1])
+
+    def append(self, metas: Sequence[NDimMeta], sources: Optional[Sequence[Any]] = None) -> 'Catalog':
+        """New catalog extended by files that continue the concat dim.
+
+        Only the new files are sorted and checked, and the merged metadata is
+        extended by one more concatenation: regular coordinate indexes grow
+        in O(1) and irregular ones in amortized O(appended values). The
+        per-file ``sources`` and ``offsets`` are still copied, so an append
+        is O(number of files) but no longer O(archive length) in coordinate
+        values. Use ``appended_chunks`` to find what changed.
+        """
+        if not metas:
+            return self
+        concat_dim = self.concat_dim
+        sources = list(range(len(self), len(self) + len(metas))) if sources is None else list(sources)
+        if len(sources) != len(metas):
+            raise ValueError(f"Got {len(sources)} sources for {len(metas)} metadata sets.")
+
+        ranges = [concat_range(meta, concat_dim) for meta in metas]
+        lengths = [concat_length(meta, concat_dim) for meta in metas]
+        # Gaps are judged by the last file's own step, not the archive's average
+        if self.last_range is not None:
+            last_range, last_length = self.last_range, int(self.offsets[-1] - self.offsets[-2])
+        else:
+            last_range, last_length = concat_range(self.meta, concat_dim), int(self.offsets[-1])
+        descending = is_descending([concat_range(self.meta, concat_dim)] + ranges, [int(self.offsets[-1])] + lengths)
+        order = sorted(range(len(metas)), key=lambda i: ranges[i][0], reverse=descending)
+
+        check_contiguous(
+            [last_range] + [ranges[i] for i in order],
+            [last_length] + [lengths[i] for i in order],
+            [self.sources[-1]] + [sources[i] for i in order],
+            descending
+        )
+
+        new_offsets = self.offsets[-1] + np.cumsum([lengths[i] for i in order], dtype=np.int64)
+        merged = NDimMeta.concat([self.meta] + [metas[i] for i in order], concat_dim)
+        return Catalog(
+            meta=merged,
+            sources=self.sources + [sources[i] for i in order],
+            offsets=np.concatenate([self.offsets, new_offsets]),
+            last_range=ranges[order[-1]]
+        )
+
+    def appended_chunks(self, chunk_sizes: dict, since: int) -> Dict[str, ChunkGrid]:
+        """Chunks holding any data at or after global index ``since`` on the concat dim.
+
+        This is the formerly partial boundary chunk (if ``since`` was not on a
+        chunk boundary) plus every chunk created after it. Variables without
+        the concat dim are unchanged by an append and are omitted.
+        """
+        changed = {}
+        for var_name, array_meta in self.meta.array_meta.items():
+            dims = tuple(array_meta.attributes['dimension_names'])
+            if self.concat_dim not in dims:
+                continue
+            grid = self.meta.chunk_grid(var_name, chunk_sizes)
+            axis = dims.index(self.concat_dim)
+            key = [slice(None)] * grid.ndim
+            key[axis] = slice(since // grid.chunk_shape[axis], None)
+            changed[var_name] = grid.subgrid(tuple(key))
+        return changed
+
+    @property
+    def concat_dim(self) -> str:
+        return self.meta.concat_dim
+
+    def __len__(self):
+        return len(self.sources)
+
+    def file_extent(self, position: int):
+        return int(self.offsets[position]), int(self.offsets[position + 1])
+
+    def locate(self, index):
+        """Position of the source holding each global index along the concat dim."""
+        return np.searchsorted(self.offsets, index, side='right') - 1
+
+    def chunk_coverage(self, position: int, chunk_sizes: dict, compact: bool = False, var_names: Optional[Sequence[str]] = None):
+        """Coverage of every chunk by the source at ``position`` in the catalog."""
+        bounds = {self.concat_dim: self.file_extent(position)}
+        tables = {}
+        for var_name in (self.meta.array_meta if var_names is None else var_names):
+            grid = self.meta.chunk_grid(var_name, chunk_sizes)
+            tables[var_name] = coverage.compute_grid_coverage(var_name, grid, bounds)
+        if compact:
+            return tables
+        return coverage.to_coverage_dict(tables.values())
+
+    def chunk_sources(self, var_name: str, chunk_slices: dict):
+        """Sources and local slices that together fill one chunk.
+
+        Variables without the concat dim are read from the first source.
+        """
+        dims = self.meta.array_meta[var_name].attributes['dimension_names']
+        if self.concat_dim not in dims:
+            return [(0, self.sources[0], dict(chunk_slices))]
+
+        chunk = chunk_slices[self.concat_dim]
+        first, last = self.locate([chunk.start, chunk.stop - 1])
+        pieces = []
+        for position in range(int(first), int(last) + 1):
+            file_start, file_stop = self.file_extent(position)
+            local = dict(chunk_slices)
+            local[self.concat_dim] = slice(max(chunk.start, file_start) - file_start, min(chunk.stop, file_stop) - file_start)
+            pieces.append((position, self.sources[position], local))
+        return pieces
+
+    def select_sources(self, var_name: str, bounds: dict):
+        """Sources and local slices holding the values within ``{dim: (lo, hi)}``.
+
+        Bounds are coordinate values, inclusive, looked up in the merged
+        coordinate indexes (see ``NDimMeta.from_xarray(index_coords=True)``).
+        """
+        selection = self._selection(var_name, bounds)
+        if any(slc.stop <= slc.start for slc in selection.values()):
+            return []
+        return self.chunk_sources(var_name, selection)
+
+    def select_chunks(self, var_name: str, bounds: dict, chunk_sizes: dict):
+        """Chunks touched by a coordinate bounding box, with the sources filling each.
+
+        Returns ``(chunk_coords, chunk_sources(...))`` pairs in row-major order.
+        """
+        grid = self.meta.chunk_grid(var_name, chunk_sizes)
+        chunk_ids = grid.chunk_ids(self._selection(var_name, bounds))
+        touched = []
+        for chunk_id in chunk_ids:
+            coords = grid.coords(int(chunk_id))
+            touched.append((coords, self.chunk_sources(var_name, grid.chunk_slices(coords))))
+        return touched
+
+    def _selection(self, var_name: str, bounds: dict) -> dict:
+        dims = self.meta.array_meta[var_name].attributes['dimension_names']
+        selection = {dim: slice(0, size) for dim, size in zip(dims, self.meta.array_meta[var_name].shape)}
+        unknown = set(bounds) - set(dims)
+        if unknown:
+            raise ValueError(f"Dimensions {unknown} not found in variable '{var_name}'.")
+        selection.update(self.meta.index_selection(bounds))
+        return selection
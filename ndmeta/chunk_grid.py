@@ -0,0 +1,173 @@
+from dataclasses import dataclass
+import functools
+import operator
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .cost import normalize_indices
+
+
+@dataclass(frozen=True)
+class ChunkGrid:
+    """Regular chunk grid over an array, addressable without materializing it.
+
+    A grid may be a rectangular view onto a larger one: ``origin`` is the chunk
+    coordinate of its first chunk and ``grid_shape`` the number of chunks it
+    spans per dimension. Linear indices are row-major within the view.
+    """
+    dims: Tuple[str, ...]
+    shape: Tuple[int, ...]
+    chunk_shape: Tuple[int, ...]
+    origin: Optional[Tuple[int, ...]] = None
+    grid_shape: Optional[Tuple[int, ...]] = None
+
+    def __post_init__(self):
+        if not len(self.dims) == len(self.shape) == len(self.chunk_shape):
+            raise ValueError("dims, shape and chunk_shape must have the same length")
+        if any(size < 1 for size in self.chunk_shape):
+            raise ValueError(f"Chunk sizes must be positive, got {self.chunk_shape}")
+        if self.origin is None:
+            object.__setattr__(self, 'origin', (0,) * len(self.dims))
+        if self.grid_shape is None:
+            object.__setattr__(self, 'grid_shape', self.num_chunks)
+
+    @classmethod
+    def from_shape(cls, dims, shape, chunk_sizes: dict) -> 'ChunkGrid':
+        chunk_shape = []
+        for dim, size in zip(dims, shape):
+            chunk = chunk_sizes.get(dim)
+            if chunk is None:
+                # Use full size if not specified, and one for zero-length dims
+                chunk = max(size, 1)
+            elif chunk < 1:
+                raise ValueError(f"Chunk size for '{dim}' must be positive, got {chunk}")
+            chunk_shape.append(chunk)
+        return cls(dims=tuple(dims), shape=tuple(shape), chunk_shape=tuple(chunk_shape))
+
+    @classmethod
+    def from_array_meta(cls, array_meta, chunk_sizes: dict) -> 'ChunkGrid':
+        return cls.from_shape(array_meta.attributes['dimension_names'], array_meta.shape, chunk_sizes)
+
+    @property
+    def ndim(self):
+        return len(self.dims)
+
+    @property
+    def num_chunks(self) -> Tuple[int, ...]:
+        """Number of chunks per dimension in the full (unviewed) grid."""
+        return tuple(-(-size // chunk) for size, chunk in zip(self.shape, self.chunk_shape))
+
+    def __len__(self):
+        return functools.reduce(operator.mul, self.grid_shape, 1)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.chunk_slices(self.coords(key))
+        if isinstance(key, tuple) and all(isinstance(k, (int, np.integer)) for k in key):
+            return self.chunk_slices(key)
+        if isinstance(key, tuple):
+            return self.subgrid(key)
+        raise TypeError(f"ChunkGrid indices must be ints or tuples, not {type(key).__name__}")
+
+    def coords(self, index: int) -> Tuple[int, ...]:
+        """Chunk coordinates (relative to this view) of a linear index."""
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError(f"Chunk index {index} out of range for grid of {length} chunks")
+        coords = []
+        for extent in reversed(self.grid_shape):
+            index, coord = divmod(index, extent)
+            coords.append(coord)
+        return tuple(reversed(coords))
+
+    def linear_index(self, coords) -> int:
+        index = 0
+        for coord, extent in zip(coords, self.grid_shape):
+            index = index * extent + coord
+        return index
+
+    def chunk_slices(self, coords) -> dict:
+        if len(coords) != self.ndim:
+            raise IndexError(f"Expected {self.ndim} chunk coordinates, got {len(coords)}")
+        slices = {}
+        for dim, coord, extent, offset, size, chunk in zip(
+            self.dims, coords, self.grid_shape, self.origin, self.shape, self.chunk_shape
+        ):
+            if coord < 0:
+                coord += extent
+            if not 0 <= coord < extent:
+                raise IndexError(f"Chunk coordinate {coord} out of range along '{dim}'")
+            start = (offset + coord) * chunk
+            slices[dim] = slice(start, min(start + chunk, size))
+        return slices
+
+    def subgrid(self, key) -> 'ChunkGrid':
+        """Rectangular view selected by per-dimension slices in chunk space."""
+        if len(key) != self.ndim:
+            raise IndexError(f"Expected {self.ndim} chunk-space slices, got {len(key)}")
+        origin, grid_shape = [], []
+        for k, offset, extent in zip(key, self.origin, self.grid_shape):
+            if isinstance(k, (int, np.integer)):
+                k = slice(k, k + 1 if k != -1 else None)
+            start, stop, step = k.indices(extent)
+            if step != 1:
+                raise ValueError("Sub-grid slices must have a step of 1")
+            origin.append(offset + start)
+            grid_shape.append(max(stop - start, 0))
+        return ChunkGrid(self.dims, self.shape, self.chunk_shape, tuple(origin), tuple(grid_shape))
+
+    def edges(self, dim: str):
+        """Start and stop array indices of this view's chunks along ``dim``."""
+        axis = self.dims.index(dim)
+        chunk = self.chunk_shape[axis]
+        coords = np.arange(self.origin[axis], self.origin[axis] + self.grid_shape[axis], dtype=np.int64)
+        starts = coords * chunk
+        return starts, np.minimum(starts + chunk, self.shape[axis])
+
+    def chunk_ids(self, selection: dict) -> np.ndarray:
+        """Linear indices of the chunks touched by a selection of array indices.
+
+        ``selection`` maps dimensions to an int, a slice or an array of
+        indices; dimensions not listed are selected in full. Unknown
+        dimensions and out-of-range indices raise ValueError.
+        """
+        unknown = set(selection) - set(self.dims)
+        if unknown:
+            raise ValueError(f"Dimensions {unknown} not found in chunk grid over {self.dims}.")
+        per_dim = []
+        for dim, extent, offset, size, chunk in zip(
+            self.dims, self.grid_shape, self.origin, self.shape, self.chunk_shape
+        ):
+            sel = selection.get(dim, slice(None))
+            if isinstance(sel, slice):
+                start, stop, step = sel.indices(size)
+                if step == 1:
+                    touched = np.arange(start // chunk, -(-stop // chunk)) if stop > start else np.empty(0, np.int64)
+                else:
+                    touched = np.unique(np.arange(start, stop, step) // chunk)
+            else:
+                touched = np.unique(normalize_indices(sel, size, dim) // chunk)
+            touched = touched - offset
+            per_dim.append(touched[(touched >= 0) & (touched < extent)])
+
+        if self.ndim == 0:
+            return np.zeros(1, dtype=np.int64)
+        if any(len(touched) == 0 for touched in per_dim):
+            return np.empty(0, dtype=np.int64)
+        grid = np.meshgrid(*per_dim, indexing='ij')
+        return np.ravel_multi_index([g.reshape(-1) for g in grid], self.grid_shape).astype(np.int64)
+
+    def shard(self, index: int, count: int) -> range:
+        """Contiguous range of linear indices assigned to shard ``index`` of ``count``."""
+        if not 0 <= index < count:
+            raise IndexError(f"Shard {index} out of range for {count} shards")
+        base, extra = divmod(len(self), count)
+        start = index * base + min(index, extra)
+        return range(start, start + base + (1 if index < extra else 0))
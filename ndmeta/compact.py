@@ -0,0 +1,208 @@
+from dataclasses import dataclass
+import threading
+from typing import Any, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .array_meta import ArrayMeta, _fill_values_equal, check_mergeable, concat_axis, merge_dimension_ranges, merge_obj_sizes, values_equal
+
+
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def _freeze(value):
+    """Hashable key for a metadata value, or raise TypeError."""
+    if type(value) in _SCALAR_TYPES:
+        return (type(value), value)
+    if isinstance(value, (dict, Mapping)):
+        # Keys are frozen too, so that e.g. 1 and True stay distinct
+        return ('__map__', tuple((_freeze(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return ('__list__', tuple(_freeze(v) for v in value))
+    if isinstance(value, tuple):
+        return ('__tuple__', tuple(_freeze(v) for v in value))
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return ('__objarray__', value.shape, tuple(_freeze(v) for v in value.ravel()))
+        return ('__ndarray__', value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, np.generic):
+        return ('__npscalar__', value.dtype.str, value.tobytes())
+    hash(value)
+    return (type(value), value)
+
+
+class FrozenDict(dict):
+    """Read-only dict; unlike a mappingproxy it pickles and deep-copies."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(f"'{type(self).__name__}' object is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict.__repr__(self)})"
+
+
+class AttributePool:
+    """Interns attribute mappings and small tuples shared across many files.
+
+    Equal values are mapped to a single read-only instance, so a catalog of
+    files with identical variable attributes stores each mapping once. A
+    pool keeps everything it interned alive, including per-file ranges, so
+    scope it to one catalog or batch rather than a whole process.
+    """
+
+    def __init__(self):
+        self._interned = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._interned)
+
+    def _intern(self, value, build, key=None):
+        try:
+            key = _freeze(value) if key is None else key
+            hash(key)
+        except TypeError:
+            return build(value)
+        with self._lock:
+            interned = self._interned.get(key)
+            if interned is None:
+                interned = self._interned[key] = build(value)
+            return interned
+
+    def attributes(self, attributes: Mapping) -> Mapping:
+        return self._intern(attributes, lambda a: a if isinstance(a, FrozenDict) else FrozenDict(a))
+
+    def ranges(self, dimension_ranges: Mapping) -> tuple:
+        # Interned per dimension so shared lat/lon ranges are stored once
+        return tuple(
+            self._intern((dim, start, end), lambda v: v, key=('__range__', dim, type(start), start, type(end), end))
+            for dim, (start, end) in dimension_ranges.items()
+        )
+
+    def value(self, value):
+        return self._intern(value, lambda v: v)
+
+
+def _geometry(shape, chunk_grid, pool: AttributePool) -> np.ndarray:
+    values = [*shape, *chunk_grid]
+    dtype = np.min_scalar_type(max(values, default=0))
+    geometry = np.array(values, dtype=dtype).reshape(2, len(shape))
+    geometry.flags.writeable = False
+    # Files of equal shape share one read-only array
+    return pool.value(geometry)
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class CompactArrayMeta:
+    """Slotted, immutable ArrayMeta with interned attributes.
+
+    Shape and chunk grid share one small integer array; attributes,
+    dimension names and ranges are interned through an AttributePool. It
+    exposes the same read interface as ArrayMeta, so NDimMeta works with
+    either.
+    """
+    geometry: np.ndarray
+    fill_value: Any
+    dtype: np.dtype
+    attributes: Mapping
+    ranges: Tuple[Tuple[str, Any, Any], ...]
+    estimated_obj_size: float
+    is_data_var: bool
+
+    @classmethod
+    def from_array_meta(cls, meta: ArrayMeta, pool: Optional[AttributePool] = None) -> 'CompactArrayMeta':
+        pool = AttributePool() if pool is None else pool
+        return cls(
+            geometry=_geometry(meta.shape, meta.chunk_grid, pool),
+            fill_value=pool.value(meta.fill_value),
+            dtype=np.dtype(meta.dtype),
+            attributes=pool.attributes(meta.attributes),
+            ranges=pool.ranges(meta.dimension_ranges),
+            estimated_obj_size=meta.estimated_obj_size,
+            is_data_var=meta.is_data_var,
+        )
+
+    def to_array_meta(self) -> ArrayMeta:
+        return ArrayMeta(
+            shape=self.shape,
+            fill_value=self.fill_value,
+            dtype=self.dtype,
+            chunk_grid=self.chunk_grid,
+            attributes=dict(self.attributes),
+            dimension_ranges=self.dimension_ranges,
+            estimated_obj_size=self.estimated_obj_size,
+            is_data_var=self.is_data_var
+        )
+
+    @property
+    def shape(self) -> tuple:
+        return tuple(int(size) for size in self.geometry[0])
+
+    @property
+    def chunk_grid(self) -> tuple:
+        return tuple(int(size) for size in self.geometry[1])
+
+    @property
+    def ndim(self) -> int:
+        return self.geometry.shape[1]
+
+    @property
+    def dimension_ranges(self) -> dict:
+        return {dim: (start, end) for dim, start, end in self.ranges}
+
+    def __eq__(self, other):
+        if isinstance(other, ArrayMeta):
+            other = CompactArrayMeta.from_array_meta(other, AttributePool())
+        if not isinstance(other, CompactArrayMeta):
+            return NotImplemented
+        return (
+            np.array_equal(self.geometry, other.geometry)
+            and self.dtype == other.dtype
+            and _fill_values_equal(self.fill_value, other.fill_value)
+            and values_equal(dict(self.attributes), dict(other.attributes))
+            and values_equal(self.ranges, other.ranges)
+            and self.estimated_obj_size == other.estimated_obj_size
+            and self.is_data_var == other.is_data_var
+        )
+
+    __hash__ = None
+
+    def to_dict(self):
+        return self.to_array_meta().to_dict()
+
+    def merge_with(self, other: 'CompactArrayMeta', concat_dim: str, pool: Optional[AttributePool] = None):
+        return CompactArrayMeta.concat([self, other], concat_dim, pool)
+
+    @classmethod
+    def concat(cls, metas: Sequence['CompactArrayMeta'], concat_dim: str, pool: Optional[AttributePool] = None) -> 'CompactArrayMeta':
+        """Concatenate along ``concat_dim``, reusing shared attributes without copying."""
+        pool = AttributePool() if pool is None else pool
+        first = metas[0]
+        concat_index = concat_axis(first, concat_dim)
+        check_mergeable(metas)
+
+        attributes = first.attributes
+        if any(meta.attributes is not attributes for meta in metas[1:]):
+            merged = {}
+            for meta in metas:
+                merged.update(meta.attributes)
+            attributes = pool.attributes(merged)
+
+        geometry = first.geometry.astype(np.int64)
+        geometry[0, concat_index] = sum(int(meta.geometry[0, concat_index]) for meta in metas)
+
+        return cls(
+            geometry=_geometry(geometry[0], geometry[1], pool),
+            fill_value=first.fill_value,
+            dtype=first.dtype,
+            attributes=attributes,
+            ranges=pool.ranges(merge_dimension_ranges(metas, concat_dim)),
+            estimated_obj_size=merge_obj_sizes(metas),
+            is_data_var=first.is_data_var,
+        )
@@ -0,0 +1,257 @@
+from dataclasses import dataclass, field
+import math
+import re
+import threading
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CoordinateCodec:
+    """Maps coordinate values to monotonic numbers and back.
+
+    ``kind`` is 'numeric', 'datetime64' (``unit`` is the numpy time unit) or
+    'cftime' (values are numbers of ``unit`` since ``CFTIME_EPOCH`` in
+    ``calendar``).
+    """
+    kind: str
+    unit: Optional[str] = None
+    calendar: Optional[str] = None
+
+    @classmethod
+    def for_values(cls, values: np.ndarray) -> 'CoordinateCodec':
+        if values.dtype.kind in 'iuf':
+            return cls('numeric')
+        if values.dtype.kind == 'M':
+            return cls('datetime64', unit=np.datetime_data(values.dtype)[0])
+        if values.dtype.kind == 'O' and values.size and hasattr(values.flat[0], 'calendar'):
+            return cls('cftime', unit='seconds', calendar=values.flat[0].calendar)
+        raise ValueError(f"Cannot index coordinates of dtype {values.dtype}")
+
+    def encode(self, values) -> np.ndarray:
+        if self.kind == 'numeric':
+            return np.asarray(values, dtype=np.float64)
+        if self.kind == 'datetime64':
+            return np.asarray(values, dtype=f'datetime64[{self.unit}]').view(np.int64)
+        import cftime
+        values = np.asarray(values, dtype=object)
+        flat = [_parse_cftime(v, self.calendar) if isinstance(v, str) else v for v in values.reshape(-1)]
+        encoded = cftime.date2num(flat, f'{self.unit} since {CFTIME_EPOCH}', calendar=self.calendar)
+        return np.asarray(encoded, dtype=np.float64).reshape(values.shape)
+
+    def decode(self, encoded: np.ndarray) -> np.ndarray:
+        if self.kind == 'numeric':
+            return encoded
+        if self.kind == 'datetime64':
+            return np.asarray(encoded, dtype=np.int64).view(f'datetime64[{self.unit}]')
+        import cftime
+        return np.asarray(cftime.num2date(encoded, f'{self.unit} since {CFTIME_EPOCH}', calendar=self.calendar))
+
+
+CFTIME_EPOCH = '1970-01-01'
+
+
+def _parse_cftime(text: str, calendar: str):
+    # ISO-like "YYYY[-MM[-DD[ HH[:MM[:SS]]]]]"; missing fields take their first value
+    import cftime
+    fields = [int(f) for f in re.split(r'[-T: ]', text.strip()) if f]
+    if not 1 <= len(fields) <= 6:
+        raise ValueError(f"Cannot parse {text!r} as a date")
+    fields += [1, 1, 0, 0, 0][len(fields) - 1:]
+    return cftime.datetime(*fields, calendar=calendar)
+
+
+def _sorted_bounds(a: np.ndarray, b: np.ndarray):
+    return np.minimum(a, b), np.maximum(a, b)
+
+
+@dataclass(frozen=True)
+class RegularIndex:
+    """Evenly spaced coordinate: ``value(i) = start + i * step`` in codec units."""
+    start: float
+    step: float
+    size: int
+    codec: CoordinateCodec
+
+    # Tolerance, in steps, for values that fall on a grid point up to rounding
+    EPS = 1e-6
+
+    @property
+    def descending(self) -> bool:
+        return self.step < 0
+
+    def __len__(self):
+        return self.size
+
+    def encoded_values(self) -> np.ndarray:
+        if self.codec.kind == 'datetime64':
+            # Stay in integers: float64 cannot hold nanosecond timestamps exactly
+            return self.start + np.arange(self.size, dtype=np.int64) * round(self.step)
+        return self.start + np.arange(self.size) * self.step
+
+    def get_indexer(self, values) -> np.ndarray:
+        """Nearest index of each value; -1 for values off the end of the axis."""
+        positions = (self.codec.encode(values) - self.start) / self.step
+        indices = np.rint(positions).astype(np.int64)
+        outside = (positions < -0.5 - self.EPS) | (positions > self.size - 0.5 + self.EPS)
+        return np.where(outside, -1, np.clip(indices, 0, self.size - 1))
+
+    def slice_indexer(self, lo, hi) -> slice:
+        """Index range of the values within ``[lo, hi]`` (in either order)."""
+        a, b = (self.codec.encode([lo, hi]) - self.start) / self.step
+        first = max(math.ceil(min(a, b) - self.EPS), 0)
+        last = min(math.floor(max(a, b) + self.EPS), self.size - 1)
+        return slice(first, last + 1) if first <= last else slice(0, 0)
+
+    def to_dict(self) -> dict:
+        return {'type': 'regular', 'start': self.start, 'step': self.step, 'size': self.size, 'codec': vars(self.codec)}
+
+
+@dataclass(frozen=True, eq=False)
+class SortedIndex:
+    """Strictly monotonic, irregular coordinate held as one encoded array.
+
+    Descending axes are stored negated so lookups always binary-search an
+    ascending array. ``keys`` may be a view of a larger buffer shared with
+    the index it was extended from (see ``extend``).
+    """
+    keys: np.ndarray
+    descending: bool
+    codec: CoordinateCodec
+    _buffer: Optional['_KeyBuffer'] = field(default=None, repr=False)
+
+    def __reduce__(self):
+        # Drop the spare capacity and the buffer's lock
+        return SortedIndex, (np.array(self.keys), self.descending, self.codec)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __eq__(self, other):
+        if not isinstance(other, SortedIndex):
+            return NotImplemented
+        return self.codec == other.codec and self.descending == other.descending and np.array_equal(self.keys, other.keys)
+
+    __hash__ = None
+
+    @property
+    def size(self) -> int:
+        return len(self.keys)
+
+    def encoded_values(self) -> np.ndarray:
+        return -self.keys if self.descending else self.keys
+
+    def _keys_for(self, values) -> np.ndarray:
+        encoded = self.codec.encode(values)
+        return -encoded if self.descending else encoded
+
+    def get_indexer(self, values) -> np.ndarray:
+        """Nearest index of each value; -1 for values outside the first/last values."""
+        keys = np.atleast_1d(self._keys_for(values))
+        right = np.clip(np.searchsorted(self.keys, keys, side='left'), 1, max(self.size - 1, 1))
+        left = right - 1
+        if self.size == 1:
+            indices = np.zeros(keys.shape, dtype=np.int64)
+        else:
+            indices = np.where(np.abs(keys - self.keys[left]) <= np.abs(self.keys[right] - keys), left, right)
+        outside = (keys < self.keys[0]) | (keys > self.keys[-1])
+        return np.where(outside, -1, indices).astype(np.int64)
+
+    def slice_indexer(self, lo, hi) -> slice:
+        lo, hi = _sorted_bounds(*self._keys_for([lo, hi]))
+        return slice(int(np.searchsorted(self.keys, lo, side='left')), int(np.searchsorted(self.keys, hi, side='right')))
+
+    def extend(self, encoded: np.ndarray) -> 'SortedIndex':
+        """Index with the encoded values ``encoded`` appended.
+
+        Only the new values and the boundary are checked, and they are
+        written into spare capacity after ``keys`` when no other index has
+        claimed it, so repeated appends cost amortized O(appended values).
+        """
+        new_keys = np.asarray(encoded).reshape(-1)
+        new_keys = -new_keys if self.descending else new_keys
+        if not np.all(np.diff(np.concatenate([self.keys[-1:], new_keys])) > 0):
+            raise ValueError("Coordinate values must be strictly monotonic to be indexed")
+        size, end = self.size, self.size + new_keys.size
+        dtype = np.result_type(self.keys, new_keys)
+        buffer = self._buffer
+        with _KeyBuffer.lock:
+            # Extend in place only from the buffer's tip: an older index being
+            # extended again must not overwrite keys another index already uses
+            if buffer is None or buffer.size != size or len(buffer.array) < end or buffer.array.dtype != dtype:
+                array = np.empty(max(2 * end, 16), dtype=dtype)
+                array[:size] = self.keys
+                buffer = _KeyBuffer(array, size)
+            buffer.array[size:end] = new_keys
+            buffer.size = end
+        return SortedIndex(buffer.array[:end], self.descending, self.codec, buffer)
+
+    def to_dict(self) -> dict:
+        return {'type': 'sorted', 'keys': self.keys, 'descending': self.descending, 'codec': vars(self.codec)}
+
+
+@dataclass(eq=False)
+class _KeyBuffer:
+    """Growable key storage; ``size`` is the length claimed by the newest index."""
+    array: np.ndarray
+    size: int
+
+    lock = threading.Lock()
+
+
+CoordinateIndex = Union[RegularIndex, SortedIndex]
+
+
+def from_encoded(encoded: np.ndarray, codec: CoordinateCodec, rtol: float = 1e-6) -> CoordinateIndex:
+    """RegularIndex if the values are evenly spaced, else a SortedIndex."""
+    encoded = np.asarray(encoded).reshape(-1)
+    if encoded.size > 1:
+        diffs = np.diff(encoded)
+        if not (np.all(diffs > 0) or np.all(diffs < 0)):
+            raise ValueError("Coordinate values must be strictly monotonic to be indexed")
+        step = (encoded[-1] - encoded[0]) / (encoded.size - 1)
+        if np.allclose(diffs, step, rtol=rtol, atol=0):
+            return RegularIndex(start=encoded[0].item(), step=float(step), size=int(encoded.size), codec=codec)
+    descending = bool(encoded.size > 1 and encoded[-1] < encoded[0])
+    return SortedIndex(keys=-encoded if descending else encoded, descending=descending, codec=codec)
+
+
+def from_values(values, rtol: float = 1e-6) -> CoordinateIndex:
+    values = np.asarray(values)
+    codec = CoordinateCodec.for_values(values)
+    return from_encoded(codec.encode(values), codec, rtol)
+
+
+def concat_indexes(indexes: Sequence[CoordinateIndex], rtol: float = 1e-6) -> CoordinateIndex:
+    """Index of the ordered concatenation of ``indexes``.
+
+    Runs of regular indexes that continue each other's step stay regular
+    without materializing values, and a leading irregular index is extended
+    by the later values only.
+    """
+    codec = indexes[0].codec
+    if any(index.codec != codec for index in indexes[1:]):
+        raise ValueError("Cannot concatenate coordinate indexes with different encodings")
+    first = indexes[0]
+    if isinstance(first, RegularIndex):
+        size = first.size
+        for index in indexes[1:]:
+            expected = first.start + size * first.step
+            if not (isinstance(index, RegularIndex)
+                    and math.isclose(index.step, first.step, rel_tol=rtol)
+                    and abs(index.start - expected) <= abs(first.step) * rtol):
+                break
+            size += index.size
+        else:
+            return RegularIndex(first.start, first.step, size, codec)
+    elif first.size > 1 and len(indexes) > 1:
+        return first.extend(np.concatenate([index.encoded_values() for index in indexes[1:]]))
+    return from_encoded(np.concatenate([index.encoded_values() for index in indexes]), codec, rtol)
+
+
+def index_from_dict(data: dict) -> CoordinateIndex:
+    codec = CoordinateCodec(**data['codec'])
+    if data['type'] == 'regular':
+        return RegularIndex(data['start'], data['step'], data['size'], codec)
+    return SortedIndex(np.asarray(data['keys']), data['descending'], codec)
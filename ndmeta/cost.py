@@ -0,0 +1,100 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from . import instrument
+
+
+Selection = Dict[str, Union[int, slice, Sequence[int]]]
+
+
+@dataclass
+class QueryPattern:
+    """A read expressed as array-index selections per dimension.
+
+    Dimensions missing from ``selection`` are read in full.
+    """
+    name: str
+    selection: Selection
+
+
+@dataclass
+class QueryCost:
+    query: str
+    var_name: str
+    chunks_touched: int
+    bytes_read: float
+    bytes_requested: float
+
+    @property
+    def read_amplification(self) -> float:
+        return self.bytes_read / self.bytes_requested if self.bytes_requested else float('inf')
+
+
+def normalize_indices(sel, size: int, dim: str) -> np.ndarray:
+    """Array indices selected along ``dim`` in selection order, negatives wrapped."""
+    if isinstance(sel, slice):
+        return np.arange(*sel.indices(size))
+    indices = np.atleast_1d(np.asarray(sel, dtype=np.int64))
+    indices = np.where(indices < 0, indices + size, indices)
+    outside = (indices < 0) | (indices >= size)
+    if outside.any():
+        raise ValueError(f"Index {int(np.asarray(sel).reshape(-1)[outside][0])} out of range for '{dim}' of size {size}")
+    return indices
+
+
+def _selected_indices(sel, size: int, dim: str) -> np.ndarray:
+    return np.unique(normalize_indices(sel, size, dim))
+
+
+def estimate_query_cost(meta, chunk_sizes: dict, query: QueryPattern, var_name: str) -> QueryCost:
+    """Chunks touched and bytes read by one query against one variable.
+
+    Chunk geometry comes from the variable's ChunkGrid, so edge chunks are
+    counted at their clipped size.
+    """
+    array_meta = meta.array_meta[var_name]
+    grid = meta.chunk_grid(var_name, chunk_sizes)
+
+    chunks_touched = 1
+    elements_read = 1
+    elements_requested = 1
+    for dim, size in zip(grid.dims, grid.shape):
+        indices = _selected_indices(query.selection.get(dim, slice(None)), size, dim)
+        starts, stops = grid.edges(dim)
+        touched = np.unique(np.searchsorted(stops, indices, side='right'))
+        chunks_touched *= len(touched)
+        elements_read *= int((stops[touched] - starts[touched]).sum())
+        elements_requested *= len(indices)
+
+    bytes_read = elements_read * array_meta.estimated_obj_size
+    instrument.count('cost.bytes_estimated', bytes_read)
+    return QueryCost(
+        query=query.name,
+        var_name=var_name,
+        chunks_touched=chunks_touched,
+        bytes_read=bytes_read,
+        bytes_requested=elements_requested * array_meta.estimated_obj_size,
+    )
+
+
+def estimate_costs(meta, chunk_sizes: dict, queries: Sequence[QueryPattern], var_names: Optional[Sequence[str]] = None) -> List[QueryCost]:
+    """Cost of every query against every selected variable (default: data vars)."""
+    var_names = list(meta.data_vars) if var_names is None else list(var_names)
+    return [
+        estimate_query_cost(meta, chunk_sizes, query, var_name)
+        for query in queries
+        for var_name in var_names
+    ]
+
+
+def summarize_costs(costs: Sequence[QueryCost]) -> Dict[str, QueryCost]:
+    """Total cost of each query across variables."""
+    totals = {}
+    for cost in costs:
+        total = totals.setdefault(cost.query, QueryCost(cost.query, '*', 0, 0.0, 0.0))
+        total.chunks_touched += cost.chunks_touched
+        total.bytes_read += cost.bytes_read
+        total.bytes_requested += cost.bytes_requested
+    return totals
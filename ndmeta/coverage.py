@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+from .chunk_grid import ChunkGrid
+from . import instrument
+
+
+FULL = 2
+PARTIAL = 1
+NONE = 0
+
+
+@dataclass
+class VariableCoverage:
+    """Array-backed coverage of one variable's chunks by a single file.
+
+    Row ``i`` describes one covered chunk: its chunk coordinates, the local
+    slice bounds inside the file and whether the file covers it fully.
+    """
+    var_name: str
+    dims: Tuple[str, ...]
+    chunk_coords: np.ndarray
+    starts: np.ndarray
+    stops: np.ndarray
+    full: np.ndarray
+
+    def __len__(self):
+        return len(self.full)
+
+    def slices(self, row: int) -> dict:
+        return {
+            dim: slice(int(start), int(stop))
+            for dim, start, stop in zip(self.dims, self.starts[row], self.stops[row])
+        }
+
+    def iter_full(self):
+        for row in np.flatnonzero(self.full):
+            yield self.var_name, self.slices(row)
+
+    def iter_partial(self):
+        for row in np.flatnonzero(~self.full):
+            yield self.var_name, self.slices(row)
+
+
+def _dim_coverage(chunk_starts, chunk_stops, bounds):
+    if bounds is None:
+        status = np.full(len(chunk_starts), FULL, dtype=np.int8)
+        return status, chunk_starts, chunk_stops
+
+    file_start, file_stop = bounds
+    lo = np.maximum(chunk_starts, file_start)
+    hi = np.minimum(chunk_stops, file_stop)
+    status = np.where(
+        (chunk_starts >= file_start) & (chunk_stops <= file_stop),
+        FULL,
+        np.where(lo < hi, PARTIAL, NONE),
+    ).astype(np.int8)
+    return status, lo - file_start, hi - file_start
+
+
+def compute_coverage(var_name: str, dims, shape, chunk_sizes: dict, bounds: Dict[str, Tuple[int, int]]) -> VariableCoverage:
+    return compute_grid_coverage(var_name, ChunkGrid.from_shape(dims, shape, chunk_sizes), bounds)
+
+
+def compute_grid_coverage(var_name: str, grid: ChunkGrid, bounds: Dict[str, Tuple[int, int]]) -> VariableCoverage:
+    """Classify every chunk of a variable against a file's extent in one pass.
+
+    ``bounds`` maps a dimension to the ``[start, stop)`` global index range the
+    file holds along it; dimensions not listed are taken to be fully held.
+    """
+    with instrument.timer('coverage.classify'):
+        table = _classify(var_name, grid, bounds)
+    instrument.count('coverage.chunks_classified', len(table))
+    return table
+
+
+def _classify(var_name: str, grid: ChunkGrid, bounds) -> VariableCoverage:
+    dims = grid.dims
+    if grid.ndim == 0:
+        empty = np.zeros((1, 0), dtype=np.int64)
+        return VariableCoverage(var_name, dims, empty, empty, empty, np.ones(1, dtype=bool))
+
+    indices, statuses, starts, stops = [], [], [], []
+    for axis, dim in enumerate(dims):
+        status, dim_starts, dim_stops = _dim_coverage(*grid.edges(dim), bounds.get(dim))
+        covered = np.flatnonzero(status > NONE)
+        indices.append(covered + grid.origin[axis])
+        statuses.append(status[covered])
+        starts.append(dim_starts[covered])
+        stops.append(dim_stops[covered])
+
+    # Only the per-dimension survivors are expanded into the Cartesian product
+    mesh = np.meshgrid(*[np.arange(len(i)) for i in indices], indexing='ij')
+    flat = [m.reshape(-1) for m in mesh]
+
+    chunk_coords = np.stack([idx[f] for idx, f in zip(indices, flat)], axis=1)
+    local_starts = np.stack([s[f] for s, f in zip(starts, flat)], axis=1)
+    local_stops = np.stack([s[f] for s, f in zip(stops, flat)], axis=1)
+    full = np.logical_and.reduce([st[f] == FULL for st, f in zip(statuses, flat)])
+
+    return VariableCoverage(var_name, dims, chunk_coords, local_starts, local_stops, full)
+
+
+def to_coverage_dict(tables: Iterable[VariableCoverage]) -> dict:
+    covered_results = {
+        'full_coverage': [],
+        'partial_coverage': []
+    }
+    for table in tables:
+        covered_results['full_coverage'].extend(table.iter_full())
+        covered_results['partial_coverage'].extend(table.iter_partial())
+    return covered_results
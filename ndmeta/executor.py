@@ -0,0 +1,209 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import functools
+import logging
+import operator
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .catalog import Catalog
+from . import instrument
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INFLIGHT_BYTES = 256 * 1024 ** 2
+
+
+@dataclass
+class ReadTask:
+    position: int
+    var_name: str
+    chunk_coords: Tuple[int, ...]
+    chunk_slices: Dict[str, slice]
+    local_slices: Dict[str, slice]
+    full: bool
+    estimated_bytes: int
+
+
+def _slice_length(slc: slice) -> int:
+    return slc.stop - slc.start
+
+
+def _read(ds, var_name: str, local_slices: dict) -> np.ndarray:
+    with instrument.timer('executor.read'):
+        data = np.asarray(ds[var_name].isel(local_slices).values)
+    instrument.count('executor.bytes_read', data.nbytes)
+    return data
+
+
+def _file_subgrids(catalog: Catalog, position: int, chunk_sizes: dict, var_names):
+    """Each variable's chunks touched by the file at ``position``, as lazy sub-grids."""
+    concat_dim = catalog.concat_dim
+    file_start, file_stop = catalog.file_extent(position)
+    for var_name in var_names:
+        dims = catalog.meta.array_meta[var_name].attributes['dimension_names']
+        grid = catalog.meta.chunk_grid(var_name, chunk_sizes)
+        if concat_dim not in dims:
+            # Variables without the concat dim are identical in every file
+            if position == 0:
+                yield var_name, grid
+            continue
+        axis = dims.index(concat_dim)
+        chunk = grid.chunk_shape[axis]
+        key = [slice(None)] * grid.ndim
+        key[axis] = slice(file_start // chunk, -(-file_stop // chunk)) if file_stop > file_start else slice(0, 0)
+        yield var_name, grid.subgrid(tuple(key))
+
+
+def _count_file_tasks(catalog: Catalog, position: int, chunk_sizes: dict, var_names) -> int:
+    return sum(len(subgrid) for _, subgrid in _file_subgrids(catalog, position, chunk_sizes, var_names))
+
+
+def _iter_file_tasks(catalog: Catalog, position: int, chunk_sizes: dict, var_names):
+    concat_dim = catalog.concat_dim
+    file_start, file_stop = catalog.file_extent(position)
+    for var_name, subgrid in _file_subgrids(catalog, position, chunk_sizes, var_names):
+        array_meta = catalog.meta.array_meta[var_name]
+        for index in range(len(subgrid)):
+            view_coords = subgrid.coords(index)
+            coords = tuple(o + c for o, c in zip(subgrid.origin, view_coords))
+            chunk_slices = subgrid.chunk_slices(view_coords)
+            local_slices = dict(chunk_slices)
+            full = True
+            if concat_dim in chunk_slices:
+                chunk = chunk_slices[concat_dim]
+                local_slices[concat_dim] = slice(max(chunk.start, file_start) - file_start, min(chunk.stop, file_stop) - file_start)
+                full = file_start <= chunk.start and chunk.stop <= file_stop
+            elements = functools.reduce(operator.mul, map(_slice_length, local_slices.values()), 1)
+            yield ReadTask(
+                position=position,
+                var_name=var_name,
+                chunk_coords=coords,
+                chunk_slices=chunk_slices,
+                local_slices=local_slices,
+                full=full,
+                estimated_bytes=int(elements * array_meta.estimated_obj_size),
+            )
+
+
+class _Stitcher:
+    """Assembles chunks that span file boundaries from their per-file pieces."""
+
+    def __init__(self, catalog: Catalog):
+        self.catalog = catalog
+        self.pending = {}
+        self.pending_bytes = 0
+
+    def add(self, task: ReadTask, data: np.ndarray):
+        key = (task.var_name, task.chunk_coords)
+        concat_dim = self.catalog.concat_dim
+        dims = list(task.chunk_slices)
+        axis = dims.index(concat_dim)
+        chunk = task.chunk_slices[concat_dim]
+
+        if key not in self.pending:
+            shape = tuple(_slice_length(task.chunk_slices[dim]) for dim in dims)
+            dtype = self.catalog.meta.array_meta[task.var_name].dtype
+            buffer = np.empty(shape, dtype=dtype)
+            self.pending[key] = [buffer, 0]
+            self.pending_bytes += buffer.nbytes
+        entry = self.pending[key]
+
+        file_start, _ = self.catalog.file_extent(task.position)
+        piece = task.local_slices[concat_dim]
+        offset = file_start + piece.start - chunk.start
+        index = [slice(None)] * len(dims)
+        index[axis] = slice(offset, offset + _slice_length(piece))
+        entry[0][tuple(index)] = data
+        entry[1] += _slice_length(piece)
+
+        if entry[1] == _slice_length(chunk):
+            del self.pending[key]
+            self.pending_bytes -= entry[0].nbytes
+            return entry[0]
+        return None
+
+
+def stream_chunks(
+    catalog: Catalog,
+    chunk_sizes: dict,
+    var_names: Optional[Sequence[str]] = None,
+    max_inflight_bytes: int = DEFAULT_INFLIGHT_BYTES,
+    max_workers: int = 4,
+    open_dataset: Optional[Callable] = None,
+    open_kwargs: Optional[dict] = None,
+) -> Iterator[Tuple[str, Dict[str, slice], np.ndarray]]:
+    """Read every chunk of the catalogued files, yielding complete chunks.
+
+    Reads run concurrently on a thread pool while the estimated bytes of
+    in-flight reads plus partially stitched chunks stay under
+    ``max_inflight_bytes`` (a single read larger than the budget still
+    proceeds on its own). Chunks split across files are stitched and yielded
+    once all of their pieces have arrived. Chunk slices are global indices.
+    """
+    if open_dataset is None:
+        import xarray as xr
+        open_dataset = xr.open_dataset
+    open_kwargs = open_kwargs or {}
+    var_names = list(catalog.meta.array_meta) if var_names is None else list(var_names)
+
+    datasets = {}
+    remaining = {}
+
+    def file_tasks():
+        # Tasks are generated lazily; the count per file is known from the grid alone
+        for position in range(len(catalog)):
+            count = _count_file_tasks(catalog, position, chunk_sizes, var_names)
+            if not count:
+                continue
+            remaining[position] = count
+            yield from _iter_file_tasks(catalog, position, chunk_sizes, var_names)
+
+    def release(position):
+        remaining[position] -= 1
+        if remaining[position] == 0:
+            datasets.pop(position).close()
+
+    stitcher = _Stitcher(catalog)
+    inflight = deque()
+    inflight_bytes = 0
+    tasks = file_tasks()
+    next_task = next(tasks, None)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        try:
+            while next_task is not None or inflight:
+                while next_task is not None and (
+                    not inflight or inflight_bytes + stitcher.pending_bytes + next_task.estimated_bytes <= max_inflight_bytes
+                ):
+                    if next_task.position not in datasets:
+                        instrument.count('files.opened')
+                        datasets[next_task.position] = open_dataset(catalog.sources[next_task.position], **open_kwargs)
+                    ds = datasets[next_task.position]
+                    inflight.append((next_task, pool.submit(_read, ds, next_task.var_name, next_task.local_slices)))
+                    inflight_bytes += next_task.estimated_bytes
+                    instrument.count('executor.bytes_estimated', next_task.estimated_bytes)
+                    next_task = next(tasks, None)
+
+                task, future = inflight.popleft()
+                data = future.result()
+                inflight_bytes -= task.estimated_bytes
+                release(task.position)
+
+                if task.full:
+                    yield task.var_name, task.chunk_slices, data
+                else:
+                    stitched = stitcher.add(task, data)
+                    if stitched is not None:
+                        yield task.var_name, task.chunk_slices, stitched
+        finally:
+            # Reads already running can't be cancelled; let them finish before their datasets close
+            pool.shutdown(wait=True, cancel_futures=True)
+            for ds in datasets.values():
+                ds.close()
+
+    if stitcher.pending:
+        logger.warning("%d chunks were never completed by the catalogued files", len(stitcher.pending))
@@ -0,0 +1,228 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+from xarray.backends import BackendArray
+from xarray.core import indexing
+
+from . import instrument
+
+
+# netCDF-4 bookkeeping that h5py exposes as ordinary attributes
+HDF5_INTERNAL_ATTRS = {
+    'CLASS', 'NAME', 'REFERENCE_LIST', 'DIMENSION_LIST', '_Netcdf4Dimid', '_Netcdf4Coordinates', '_nc3_strict', '_NCProperties',
+}
+NETCDF_DIMENSION_SCALE = 'This is a netCDF dimension but not a netCDF variable'
+
+
+@dataclass
+class HeaderVariable:
+    """One variable as stored on disk, before any CF decoding."""
+    name: str
+    dims: Tuple[str, ...]
+    shape: Tuple[int, ...]
+    dtype: np.dtype
+    attrs: dict
+    storage_chunks: Optional[Tuple[int, ...]]
+    read: Callable[[Any], np.ndarray]
+    indexing_support: indexing.IndexingSupport = indexing.IndexingSupport.OUTER
+
+
+class _NetCDF4Reader:
+    def __init__(self, path):
+        import netCDF4
+        self.ds = netCDF4.Dataset(path, 'r')
+        self.ds.set_auto_maskandscale(False)
+        self.ds.set_auto_chartostring(False)
+
+    def dimensions(self) -> Dict[str, int]:
+        return {name: len(dim) for name, dim in self.ds.dimensions.items()}
+
+    def global_attrs(self) -> dict:
+        return {key: self.ds.getncattr(key) for key in self.ds.ncattrs()}
+
+    def variables(self) -> Dict[str, HeaderVariable]:
+        variables = {}
+        for name, var in self.ds.variables.items():
+            chunking = var.chunking()
+            variables[name] = HeaderVariable(
+                name=name,
+                dims=tuple(var.dimensions),
+                shape=tuple(var.shape),
+                dtype=np.dtype(object) if var.dtype is str else np.dtype(var.dtype),
+                attrs={key: var.getncattr(key) for key in var.ncattrs()},
+                storage_chunks=None if chunking in (None, 'contiguous') else tuple(chunking),
+                read=var.__getitem__,
+            )
+        return variables
+
+    def close(self):
+        self.ds.close()
+
+
+def _h5_attr(value):
+    # Match netCDF4-python: text as str, single-element arrays as numpy scalars
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    if isinstance(value, np.ndarray) and value.size == 1 and value.ndim <= 1:
+        return _h5_attr(value.reshape(-1)[0])
+    if isinstance(value, np.bytes_):
+        return value.decode('utf-8')
+    if isinstance(value, np.str_):
+        return str(value)
+    return value
+
+
+class _H5pyReader:
+    def __init__(self, path):
+        import h5py
+        self.h5py = h5py
+        self.file = h5py.File(path, 'r')
+
+    def _is_dimension_only(self, dset) -> bool:
+        name = dset.attrs.get('NAME', b'')
+        name = name.decode('utf-8', 'replace') if isinstance(name, bytes) else str(name)
+        return name.startswith(NETCDF_DIMENSION_SCALE)
+
+    def _datasets(self):
+        return {name: obj for name, obj in self.file.items() if isinstance(obj, self.h5py.Dataset)}
+
+    def _dims(self, dset) -> Tuple[str, ...]:
+        # A dimension scale is not attached to itself; its name is its dimension
+        if dset.is_scale and dset.ndim == 1:
+            return (dset.name.rsplit('/', 1)[-1],)
+        dims = []
+        for axis, dim in enumerate(dset.dims):
+            dims.append(dim[0].name.rsplit('/', 1)[-1] if len(dim) else f'phony_dim_{axis}')
+        return tuple(dims)
+
+    def dimensions(self) -> Dict[str, int]:
+        sizes = {}
+        for dset in self._datasets().values():
+            sizes.update(zip(self._dims(dset), dset.shape))
+        return sizes
+
+    def global_attrs(self) -> dict:
+        return {key: _h5_attr(value) for key, value in self.file.attrs.items() if key not in HDF5_INTERNAL_ATTRS}
+
+    def variables(self) -> Dict[str, HeaderVariable]:
+        variables = {}
+        for name, dset in self._datasets().items():
+            if self._is_dimension_only(dset):
+                continue
+            string_dtype = self.h5py.check_string_dtype(dset.dtype)
+            variables[name] = HeaderVariable(
+                name=name,
+                dims=self._dims(dset),
+                shape=tuple(dset.shape),
+                dtype=np.dtype(object) if string_dtype is not None and string_dtype.length is None else dset.dtype,
+                attrs={key: _h5_attr(value) for key, value in dset.attrs.items() if key not in HDF5_INTERNAL_ATTRS},
+                storage_chunks=dset.chunks,
+                read=(dset.asstr() if string_dtype is not None and string_dtype.length is None else dset).__getitem__,
+                # h5py takes at most one index array per selection
+                indexing_support=indexing.IndexingSupport.OUTER_1VECTOR,
+            )
+        return variables
+
+    def close(self):
+        self.file.close()
+
+
+ENGINES = {'netcdf4': _NetCDF4Reader, 'h5py': _H5pyReader}
+
+
+def _open_reader(path, engine: Optional[str]):
+    if engine is not None:
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {sorted(ENGINES)}")
+        return ENGINES[engine](path)
+    for reader in ENGINES.values():
+        try:
+            return reader(path)
+        except ImportError:
+            continue
+    raise ImportError("Reading headers directly needs netCDF4 or h5py")
+
+
+class _HeaderArray(BackendArray):
+    """Lazily indexed on-disk values of a header variable."""
+
+    def __init__(self, var: HeaderVariable):
+        self.var = var
+        self.shape = var.shape
+        self.dtype = var.dtype
+
+    def __getitem__(self, key):
+        return indexing.explicit_indexing_adapter(key, self.shape, self.var.indexing_support, self._getitem)
+
+    def _getitem(self, key):
+        return np.asarray(self.var.read(key))
+
+
+@dataclass
+class DecodedHeader:
+    """The parts of a Dataset that ``NDimMeta.from_xarray`` reads, without building one.
+
+    ``variables`` are lazily CF-decoded, so indexing one reads and decodes
+    only the selected elements. No pandas indexes are built, which would
+    read every dimension coordinate in full.
+    """
+    variables: Dict[str, Any]
+    coord_names: set
+    sizes: Dict[str, int]
+
+    @property
+    def dims(self) -> Dict[str, int]:
+        return self.sizes
+
+    @property
+    def data_vars(self) -> set:
+        return {name for name in self.variables if name not in self.coord_names}
+
+
+def decode_header(reader) -> DecodedHeader:
+    """Lazily decode a reader's variables with xarray's default CF rules."""
+    from xarray import Variable
+    from xarray.conventions import decode_cf_variables
+
+    variables = {}
+    for name, var in reader.variables().items():
+        encoding = {}
+        if var.storage_chunks is not None:
+            encoding['chunksizes'] = var.storage_chunks
+        if var.dtype == object:
+            # Marks variable-length strings for xarray's string decoding, as its netCDF4 backend does
+            encoding['dtype'] = str
+        variables[name] = Variable(var.dims, indexing.LazilyIndexedArray(_HeaderArray(var)), var.attrs, encoding=encoding)
+    decoded, _, coord_names = decode_cf_variables(variables, reader.global_attrs())
+    # As in a Dataset, a variable named after its only dimension is a coordinate
+    coord_names = set(coord_names) | {name for name, var in decoded.items() if var.dims == (name,)}
+    return DecodedHeader(decoded, coord_names, reader.dimensions())
+
+
+def read_header(path, engine: Optional[str] = None, use_storage_chunks: bool = False, stats=None, index_coords: bool = False):
+    """NDimMeta for a NetCDF/HDF5 file, read from its header.
+
+    Variables are decoded lazily by xarray's CF coders, so the result
+    equals ``NDimMeta.from_xarray(xr.open_dataset(path))`` while only the
+    two endpoints of each dimension coordinate (and object-dtype samples)
+    are read and decoded. ``engine`` is 'netcdf4' or 'h5py' (default:
+    whichever is installed). With ``use_storage_chunks``, ``chunk_grid``
+    holds the on-disk chunk shape instead of the full shape.
+    """
+    from .ndim_meta import NDimMeta
+
+    with instrument.timer('header.read'):
+        instrument.count('files.opened')
+        reader = _open_reader(path, engine)
+        try:
+            header = decode_header(reader)
+            meta = NDimMeta.from_xarray(header, stats=stats, index_coords=index_coords)
+        finally:
+            reader.close()
+    if use_storage_chunks:
+        for name, array_meta in meta.array_meta.items():
+            storage_chunks = header.variables[name].encoding.get('chunksizes')
+            if storage_chunks is not None:
+                array_meta.chunk_grid = tuple(storage_chunks[:array_meta.ndim])
+    return meta
@@ -0,0 +1,230 @@
+from contextlib import contextmanager
+import cProfile
+from dataclasses import dataclass, field
+import pstats
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class NullSink:
+    """Default sink: instrumentation calls return immediately."""
+    enabled = False
+
+    def count(self, name: str, value=1):
+        pass
+
+    def span(self, name: str):
+        return _NULL_SPAN
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+_sink = NullSink()
+
+
+def get_sink():
+    return _sink
+
+
+def set_sink(sink) -> object:
+    """Install ``sink`` process-wide and return the previous one.
+
+    The sink is a module global and is not propagated to worker processes
+    (e.g. ``executor='process'``): work done there is not recorded.
+    """
+    global _sink
+    previous = _sink
+    _sink = NullSink() if sink is None else sink
+    return previous
+
+
+@contextmanager
+def use_sink(sink):
+    previous = set_sink(sink)
+    try:
+        yield sink
+    finally:
+        set_sink(previous)
+
+
+def count(name: str, value=1):
+    if _sink.enabled:
+        _sink.count(name, value)
+
+
+def timer(name: str):
+    """Context manager timing a block under ``name`` on the active sink."""
+    if _sink.enabled:
+        return _sink.span(name)
+    return _NULL_SPAN
+
+
+class _Timer:
+    __slots__ = ('sink', 'name', 'start')
+
+    def __init__(self, sink, name):
+        self.sink = sink
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.sink.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+@dataclass
+class TimingStats:
+    calls: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+
+class StatsSink:
+    """Accumulates counters and timings in dicts."""
+    enabled = True
+
+    def __init__(self):
+        self.counters: Dict[str, float] = {}
+        self.timings: Dict[str, TimingStats] = {}
+        self._lock = threading.Lock()
+
+    def count(self, name: str, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def span(self, name: str):
+        return _Timer(self, name)
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            stats = self.timings.setdefault(name, TimingStats())
+            stats.calls += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'timings': {name: vars(stats).copy() for name, stats in self.timings.items()},
+            }
+
+
+@dataclass
+class Span:
+    name: str
+    start: float
+    duration: Optional[float] = None
+    parent: Optional['Span'] = None
+    attributes: Dict[str, float] = field(default_factory=dict)
+
+
+class SpanSink:
+    """OpenTelemetry-style spans.
+
+    With a ``tracer`` exposing ``start_as_current_span`` (such as an
+    OpenTelemetry tracer), spans and counter attributes are forwarded to it.
+    Otherwise finished spans are kept in ``spans`` with their parent links and
+    the counters recorded while they were innermost.
+    """
+    enabled = True
+
+    def __init__(self, tracer=None):
+        self.tracer = tracer
+        self.spans: List[Span] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name: str):
+        stack = self._stack()
+        if self.tracer is not None:
+            with self.tracer.start_as_current_span(name) as otel_span:
+                stack.append(otel_span)
+                try:
+                    yield otel_span
+                finally:
+                    stack.pop()
+            return
+
+        span = Span(name=name, start=time.perf_counter(), parent=stack[-1] if stack else None)
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            stack.pop()
+            span.duration = time.perf_counter() - span.start
+            with self._lock:
+                self.spans.append(span)
+
+    def count(self, name: str, value=1):
+        stack = self._stack()
+        if not stack:
+            return
+        current = stack[-1]
+        if self.tracer is not None:
+            current.add_event(name, {'value': value})
+        else:
+            current.attributes[name] = current.attributes.get(name, 0) + value
+
+
+class ProfileSink:
+    """Runs cProfile while any instrumented block is active on the profiling thread."""
+    enabled = True
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self._depth = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def count(self, name: str, value=1):
+        pass
+
+    @contextmanager
+    def span(self, name: str):
+        # cProfile only sees the thread that enabled it; the first thread to open a
+        # span owns the profiler until its outermost span exits, other threads pass through
+        ident = threading.get_ident()
+        with self._lock:
+            if self._thread is None:
+                self._thread = ident
+            if self._thread != ident:
+                owner = False
+            else:
+                owner = True
+                if self._depth == 0:
+                    self.profile.enable()
+                self._depth += 1
+        if not owner:
+            yield
+            return
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.profile.disable()
+                    self._thread = None
+
+    def stats(self) -> pstats.Stats:
+        return pstats.Stats(self.profile)
@@ -0,0 +1,232 @@
+from dataclasses import dataclass
+import json
+import logging
+import math
+import os
+import shutil
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .catalog import Catalog
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_COLUMNS = ('chunk_id', 'position', 'start', 'stop')
+
+
+def zarr_data_type(dtype) -> str:
+    dtype = np.dtype(dtype)
+    if dtype.kind in 'biufc' and dtype.fields is None:
+        return 'bool' if dtype.kind == 'b' else dtype.name
+    raise ValueError(f"dtype {dtype} has no Zarr v3 data type")
+
+
+def _json_fill_value(fill_value, dtype):
+    dtype = np.dtype(dtype)
+    if fill_value is None:
+        return False if dtype.kind == 'b' else 0
+    if dtype.kind == 'c':
+        return [_json_fill_value(fill_value.real, 'f8'), _json_fill_value(fill_value.imag, 'f8')]
+    if dtype.kind == 'f':
+        value = float(fill_value)
+        if math.isnan(value):
+            return 'NaN'
+        if math.isinf(value):
+            return 'Infinity' if value > 0 else '-Infinity'
+        return value
+    if dtype.kind == 'b':
+        return bool(fill_value)
+    return int(fill_value)
+
+
+def _check_var_name(var_name: str):
+    # Names become path components, so they must be valid Zarr v3 node names
+    if (not isinstance(var_name, str) or not var_name or set(var_name) == {'.'}
+            or var_name.startswith('__') or '/' in var_name or '\\' in var_name):
+        raise ValueError(f"Variable name {var_name!r} is not a valid Zarr v3 node name")
+
+
+def _json_attribute(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        # Zarr v3 spells non-finite floats as strings; bare NaN is not JSON
+        return 'NaN' if math.isnan(value) else ('Infinity' if value > 0 else '-Infinity')
+    if isinstance(value, (str, bool, int, float)) or value is None:
+        return value
+    if isinstance(value, np.generic):
+        return _json_attribute(value.item())
+    if isinstance(value, np.ndarray):
+        return [_json_attribute(v) for v in value.tolist()]
+    if isinstance(value, (list, tuple)):
+        return [_json_attribute(v) for v in value]
+    return str(value)
+
+
+def zarr_array_metadata(array_meta, chunk_sizes: dict) -> dict:
+    """Zarr v3 ``zarr.json`` document for one variable under ``chunk_sizes``."""
+    dims = tuple(array_meta.attributes['dimension_names'])
+    chunk_shape = [chunk_sizes.get(dim, size) or 1 for dim, size in zip(dims, array_meta.shape)]
+    attributes = {key: _json_attribute(value) for key, value in array_meta.attributes.items() if key != 'dimension_names'}
+    return {
+        "zarr_format": 3,
+        "node_type": "array",
+        "shape": list(array_meta.shape),
+        "data_type": zarr_data_type(array_meta.dtype),
+        "chunk_grid": {"name": "regular", "configuration": {"chunk_shape": chunk_shape}},
+        "chunk_key_encoding": {"name": "default", "configuration": {"separator": "/"}},
+        "fill_value": _json_fill_value(array_meta.fill_value, array_meta.dtype),
+        "codecs": [{"name": "bytes", "configuration": {"endian": "little"}}],
+        "attributes": attributes,
+        "dimension_names": list(dims),
+    }
+
+
+def _write_json(path, document):
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2, allow_nan=False)
+
+
+def _variable_references(catalog: Catalog, var_name: str, chunk_sizes: dict):
+    grid = catalog.meta.chunk_grid(var_name, chunk_sizes)
+    dims = catalog.meta.array_meta[var_name].attributes['dimension_names']
+    positions = range(len(catalog)) if catalog.concat_dim in dims else range(1)
+
+    columns = {name: [] for name in MANIFEST_COLUMNS}
+    for position in positions:
+        table = catalog.chunk_coverage(position, chunk_sizes, compact=True, var_names=[var_name])[var_name]
+        if grid.ndim:
+            chunk_ids = np.ravel_multi_index(table.chunk_coords.T, grid.num_chunks)
+        else:
+            chunk_ids = np.zeros(len(table), dtype=np.int64)
+        columns['chunk_id'].append(chunk_ids.astype(np.int64))
+        columns['position'].append(np.full(len(table), position, dtype=np.int32))
+        columns['start'].append(table.starts)
+        columns['stop'].append(table.stops)
+
+    columns = {name: np.concatenate(parts) for name, parts in columns.items()}
+    # Stable, so pieces of one chunk stay in file order
+    order = np.argsort(columns['chunk_id'], kind='stable')
+    return {name: column[order] for name, column in columns.items()}
+
+
+def write_manifest(catalog: Catalog, root, chunk_sizes: dict, var_names: Optional[Sequence[str]] = None) -> List[str]:
+    """Write Zarr v3 metadata and a chunk reference table per variable.
+
+    Each variable gets ``<root>/<var>/zarr.json`` and columnar ``.npy`` files
+    under ``<root>/<var>/manifest/`` holding, per chunk piece, its linear
+    chunk id, source position and local start/stop indices, sorted by chunk
+    id. Without ``var_names``, variables with no Zarr data type (e.g. decoded
+    datetimes) or whose names are not valid Zarr node names are skipped.
+    Variable directories left in ``root`` by an earlier write are removed
+    when their variable was not written this time (with ``var_names``,
+    only those no longer in the catalog). Returns the variables written.
+    """
+    root = os.fspath(root)
+    os.makedirs(root, exist_ok=True)
+    _write_json(os.path.join(root, 'zarr.json'), {"zarr_format": 3, "node_type": "group", "attributes": {}})
+    _write_json(os.path.join(root, 'sources.json'), {
+        "concat_dim": catalog.concat_dim,
+        "sources": [str(source) for source in catalog.sources],
+        "offsets": catalog.offsets.tolist(),
+    })
+
+    explicit = var_names is not None
+    written = []
+    for var_name in (var_names if explicit else catalog.meta.array_meta):
+        try:
+            _check_var_name(var_name)
+            array_meta = catalog.meta.array_meta[var_name]
+            document = zarr_array_metadata(array_meta, chunk_sizes)
+        except ValueError as e:
+            if explicit:
+                raise
+            logger.warning("Skipping %r: %s", var_name, e)
+            continue
+
+        var_root = os.path.join(root, var_name)
+        manifest_root = os.path.join(var_root, 'manifest')
+        os.makedirs(manifest_root, exist_ok=True)
+        _write_json(os.path.join(var_root, 'zarr.json'), document)
+        for name, column in _variable_references(catalog, var_name, chunk_sizes).items():
+            np.save(os.path.join(manifest_root, f"{name}.npy"), column)
+        written.append(var_name)
+
+    keep = set(catalog.meta.array_meta) if explicit else set(written)
+    for stale in set(_variable_dirs(root)) - keep:
+        logger.debug("Removing stale manifest for %s", stale)
+        shutil.rmtree(os.path.join(root, stale))
+    return written
+
+
+def _variable_dirs(root: str) -> List[str]:
+    return sorted(
+        entry.name for entry in os.scandir(root)
+        if entry.is_dir() and os.path.exists(os.path.join(entry.path, 'zarr.json'))
+    )
+
+
+@dataclass
+class VariableManifest:
+    dims: tuple
+    chunk_shape: tuple
+    num_chunks: tuple
+    chunk_id: np.ndarray
+    position: np.ndarray
+    start: np.ndarray
+    stop: np.ndarray
+
+
+class ChunkManifest:
+    """Read side of a manifest written by ``write_manifest``.
+
+    Reference columns are memory-mapped, and lookups binary-search the sorted
+    chunk id column, so only the rows for the requested chunk are read.
+    """
+
+    def __init__(self, root):
+        self.root = os.fspath(root)
+        with open(os.path.join(self.root, 'sources.json')) as f:
+            index = json.load(f)
+        self.concat_dim = index['concat_dim']
+        self.sources = index['sources']
+        self._variables: Dict[str, VariableManifest] = {}
+
+    @property
+    def variables(self) -> List[str]:
+        return _variable_dirs(self.root)
+
+    def array_metadata(self, var_name: str) -> dict:
+        _check_var_name(var_name)
+        with open(os.path.join(self.root, var_name, 'zarr.json')) as f:
+            return json.load(f)
+
+    def _variable(self, var_name: str) -> VariableManifest:
+        if var_name not in self._variables:
+            metadata = self.array_metadata(var_name)
+            chunk_shape = tuple(metadata['chunk_grid']['configuration']['chunk_shape'])
+            shape = tuple(metadata['shape'])
+            manifest_root = os.path.join(self.root, var_name, 'manifest')
+            columns = {name: np.load(os.path.join(manifest_root, f"{name}.npy"), mmap_mode='r') for name in MANIFEST_COLUMNS}
+            self._variables[var_name] = VariableManifest(
+                dims=tuple(metadata['dimension_names']),
+                chunk_shape=chunk_shape,
+                num_chunks=tuple(-(-size // chunk) for size, chunk in zip(shape, chunk_shape)),
+                **columns
+            )
+        return self._variables[var_name]
+
+    def chunk_sources(self, var_name: str, chunk_coords) -> list:
+        """(source, variable, local slices) for every piece of one chunk."""
+        manifest = self._variable(var_name)
+        chunk_id = int(np.ravel_multi_index(tuple(chunk_coords), manifest.num_chunks)) if manifest.dims else 0
+        lo = np.searchsorted(manifest.chunk_id, chunk_id, side='left')
+        hi = np.searchsorted(manifest.chunk_id, chunk_id, side='right')
+        pieces = []
+        for row in range(lo, hi):
+            slices = {
+                dim: slice(int(start), int(stop))
+                for dim, start, stop in zip(manifest.dims, manifest.start[row], manifest.stop[row])
+            }
+            pieces.append((self.sources[int(manifest.position[row])], var_name, slices))
+        return pieces
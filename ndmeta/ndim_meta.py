@@ -1,17 +1,24 @@
 from dataclasses import dataclass
 import functools
-from itertools import product
 import logging
 import operator
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Tuple
 
 import numpy as np
-import objsize
-import xarray as xr
 
 from .array_meta import ArrayMeta
+from .chunk_grid import ChunkGrid
+from .compact import AttributePool, CompactArrayMeta
+from . import coord_index
+from . import cost
+from . import coverage
+from . import instrument
+from . import optimize
 from . import util
 
+if TYPE_CHECKING:
+    import xarray as xr
+
 
 logger = logging.getLogger(__name__)
 
@@ -19,146 +26,148 @@ logger = logging.getLogger(__name__)
 class NDimMeta:
     array_meta: Dict[str, ArrayMeta]
     concat_dim: Optional[str]
+    coord_indexes: Optional[Dict[str, coord_index.CoordinateIndex]] = None
+    # Every dimension the files were merged along. A TiledCatalog over several
+    # dims sets all of them and leaves ``concat_dim`` None, as no single one applies.
+    concat_dims: Tuple[str, ...] = ()
+
+    def __post_init__(self):
+        self.concat_dims = tuple(self.concat_dims)
+        if not self.concat_dims and self.concat_dim is not None:
+            self.concat_dims = (self.concat_dim,)
+
+    def chunk_grid(self, var_name: str, chunk_sizes: dict) -> ChunkGrid:
+        return ChunkGrid.from_array_meta(self.array_meta[var_name], chunk_sizes)
+
+    def chunk_grids(self, chunk_sizes: dict) -> Dict[str, ChunkGrid]:
+        return {var_name: self.chunk_grid(var_name, chunk_sizes) for var_name in self.array_meta}
 
     def to_chunks(self, chunk_sizes: dict):
-        for var_name, array_meta in self.array_meta.items():
-            dimension_chunks = {}
-            
-            # Calculate chunk indices for each dimension based on the provided chunk sizes
-            for dim, full_size in zip(array_meta.attributes['dimension_names'], array_meta.shape):
-                chunk_size = chunk_sizes.get(dim, full_size)  # Use full size if not specified
-                num_full_chunks = full_size // chunk_size
-                last_chunk_size = full_size % chunk_size
-                
-                # Create a list of slice objects for each chunk in this dimension
-                dimension_chunks[dim] = [slice(i * chunk_size, (i + 1) * chunk_size) for i in range(num_full_chunks)]
-                if last_chunk_size > 0:
-                    dimension_chunks[dim].append(slice(num_full_chunks * chunk_size, full_size))
-            
-            # Generate all possible chunk combinations using Cartesian product
-            for chunk_combination in product(*dimension_chunks.values()):
-                # Map each dimension to its corresponding slice from the combination
-                chunk_definition = {dim: slc for dim, slc in zip(dimension_chunks.keys(), chunk_combination)}
+        for var_name, grid in self.chunk_grids(chunk_sizes).items():
+            for chunk_definition in grid:
                 yield var_name, chunk_definition
 
-    def chunk_coverage(self, dataset, chunk_sizes, file_index):
-        covered_results = {
-            'full_coverage': [],
-            'partial_coverage': []
-        }
-        
-        for var_name, chunk_ranges in self.to_chunks(chunk_sizes):
-            if var_name in dataset.variables:
-                fully_covered = True
-                partially_covered = True
-                actual_covered_ranges = {}
-
-                for dim, slice_range in chunk_ranges.items():
-                    if dim in dataset.variables and dim == self.concat_dim:
-                        chunk_size = chunk_sizes[dim]
-
-                        # Calculate the start and end indices of the current file
-                        file_start = file_index * dataset.sizes[dim]
-                        file_end = file_start + dataset.sizes[dim]
-
-                        chunk_start = slice_range.start
-                        chunk_end = slice_range.stop
-
-                        # Calculate the end index of the first chunk within the current file
-                        file_chunk_offset = file_start % chunk_size
-
-                        # Not covered at all, move on
-                        if chunk_end < file_start or chunk_start > file_end:
-                            fully_covered = False
-                            partially_covered = False
-                            break
-
-                        # Check if the chunk starts before the current file
-                        if chunk_start < file_start:
-                            fully_covered = False
-                            if chunk_end <= file_end:
-                                # The chunk ends within the current file
-                                actual_covered_ranges[dim] = slice(0, chunk_size - file_chunk_offset)
-                            else:
-                                # The chunk ends beyond the current file
-                                actual_covered_ranges[dim] = slice(0, dataset.sizes[dim])
-                        # Check if the chunk starts within the current file
-                        elif chunk_start < file_end:
-                            if chunk_end <= file_end:
-                                # The chunk is fully contained within the current file
-                                actual_covered_ranges[dim] = slice(chunk_start - file_start, chunk_end - file_start)
-                            else:
-                                # The chunk extends beyond the current file
-                                actual_covered_ranges[dim] = slice(chunk_start - file_chunk_offset, dataset.sizes[dim])
-                                fully_covered = False
-                    else:
-                        actual_covered_ranges[dim] = slice_range
-
-                if fully_covered:
-                    logger.info(f"FULLY COVERED: {var_name=}, {actual_covered_ranges=}")
-                    logger.info("---")
-                    covered_results['full_coverage'].append((var_name, actual_covered_ranges))
-                elif partially_covered and actual_covered_ranges:
-                    logger.info(f"PARTIALLY COVERED: {var_name=}, {actual_covered_ranges=}")
-                    logger.info("---")
-                    covered_results['partial_coverage'].append((var_name, actual_covered_ranges))
-                else:
-                    logger.info(f"NOT COVERED: {var_name=}, {chunk_ranges=}")
-                    logger.info("---")
+    def chunk_coverage(self, dataset, chunk_sizes, file_index=None, compact=False, file_start: Optional[int] = None):
+        """Coverage of every chunk by ``dataset``, one of the merged files.
+
+        The file's global start along the concat dim is ``file_start`` if
+        given, else looked up from its first coordinate in the merged
+        ``coord_indexes``; without either only ``file_index=0`` can be placed.
+        ``Catalog.chunk_coverage`` tracks offsets for every file.
+        """
+        if len(self.concat_dims) > 1:
+            raise ValueError(
+                f"Metadata tiled along {self.concat_dims} cannot place a file by one dimension; "
+                "use TiledCatalog.chunk_coverage."
+            )
+        bounds = {}
+        if self.concat_dim is not None and self.concat_dim in dataset.variables:
+            if file_start is None:
+                file_start = self._file_start(dataset, file_index)
+            bounds[self.concat_dim] = (file_start, file_start + dataset.sizes[self.concat_dim])
 
-        return covered_results
+        tables = {}
+        for var_name in self.array_meta:
+            if var_name not in dataset.variables:
+                continue
+            table = coverage.compute_grid_coverage(var_name, self.chunk_grid(var_name, chunk_sizes), bounds)
+            logger.debug("Coverage for %s: %d full, %d partial chunks", var_name, table.full.sum(), (~table.full).sum())
+            tables[var_name] = table
+
+        if compact:
+            return tables
+        return coverage.to_coverage_dict(tables.values())
+
+    def _file_start(self, dataset, file_index) -> int:
+        if self.coord_indexes and self.concat_dim in self.coord_indexes:
+            first_value = dataset[self.concat_dim].values[:1]
+            start = int(self.coord_indexes[self.concat_dim].get_indexer(first_value)[0])
+            if start < 0:
+                raise ValueError(f"First '{self.concat_dim}' value of the dataset is outside the merged coordinates.")
+            return start
+        if file_index == 0:
+            return 0
+        raise ValueError(
+            f"Cannot place file {file_index} along '{self.concat_dim}' without file_start or a coordinate index; "
+            "use Catalog.chunk_coverage for files of unequal length."
+        )
 
     def merge_with(self, other: 'NDimMeta', concat_dim: str) -> 'NDimMeta':
-        # Perform initial checks to ensure all variables and dimensions are present in both metadata sets
-        self_keys = set(self.array_meta.keys())
-        other_keys = set(other.array_meta.keys())
-        
-        if self_keys != other_keys:
-            missing_in_self = other_keys - self_keys
-            missing_in_other = self_keys - other_keys
-            error_message = f"Metadata mismatch: missing in self {missing_in_self}, missing in other {missing_in_other}."
-            raise ValueError(error_message)
-
-        # Create a new dictionary to store merged metadata
-        new_metadata_dict = {}
+        return NDimMeta.concat([self, other], concat_dim)
+
+    @classmethod
+    def concat(cls, metas: Sequence['NDimMeta'], concat_dim: str) -> 'NDimMeta':
+        """Merge ordered per-file metadata along ``concat_dim`` in one linear pass."""
+        if not metas:
+            raise ValueError("At least one metadata set is required to concatenate.")
+        first = metas[0]
 
-        # Only add keys that are present in both metadata dictionaries
-        for key in self_keys:
-            if concat_dim in self.array_meta[key].attributes['dimension_names'] and \
-                concat_dim in other.array_meta[key].attributes['dimension_names']:
-                # Merge metadata and add it to the new dictionary
-                new_metadata_dict[key] = self.array_meta[key].merge_with(other.array_meta[key], concat_dim)
+        # Perform initial checks to ensure all variables and dimensions are present in every metadata set
+        first_keys = set(first.array_meta.keys())
+        for position, meta in enumerate(metas[1:], start=1):
+            other_keys = set(meta.array_meta.keys())
+            if first_keys != other_keys:
+                missing_in_first = other_keys - first_keys
+                missing_in_other = first_keys - other_keys
+                error_message = f"Metadata mismatch: missing in set 0 {missing_in_first}, missing in set {position} {missing_in_other}."
+                raise ValueError(error_message)
+
+        new_metadata_dict = {}
+        pool = AttributePool()
+        for key, array_meta in first.array_meta.items():
+            var_metas = _same_representation([meta.array_meta[key] for meta in metas], pool)
+            if all(concat_dim in m.attributes['dimension_names'] for m in var_metas):
+                new_metadata_dict[key] = type(array_meta).concat(var_metas, concat_dim)
             else:
                 # Check for equality for dimensions that do not include the concat dimension
-                if self.array_meta[key] == other.array_meta[key]:
-                    new_metadata_dict[key] = self.array_meta[key]
+                if all(m == array_meta for m in var_metas[1:]):
+                    new_metadata_dict[key] = array_meta
                 else:
                     raise ValueError(f"Non-merging variable '{key}' differs between metadata sets.")
 
-        return NDimMeta(
+        coord_indexes = None
+        if all(meta.coord_indexes is not None for meta in metas):
+            coord_indexes = dict(first.coord_indexes)
+            if all(concat_dim in meta.coord_indexes for meta in metas):
+                coord_indexes[concat_dim] = coord_index.concat_indexes([meta.coord_indexes[concat_dim] for meta in metas])
+            else:
+                coord_indexes.pop(concat_dim, None)
+
+        return cls(
             array_meta=new_metadata_dict,
-            concat_dim=concat_dim
+            concat_dim=concat_dim,
+            coord_indexes=coord_indexes
         )
 
     @classmethod
-    def from_xarray(cls, ds: xr.Dataset):
+    def from_xarray(cls, ds: 'xr.Dataset', stats: Optional['ExtractionStats'] = None, index_coords: bool = False):
+        """Build metadata for every variable in ``ds``.
+
+        ``ds`` is a Dataset, or anything with its ``variables``,
+        ``data_vars``, ``dims`` and ``sizes`` such as ``header.DecodedHeader``.
+        Each dimension's endpoints are read once and shared by all variables
+        using it, and object-dtype size sampling indexes only the sampled
+        elements. Pass ``stats`` to collect how much was actually read.
+        With ``index_coords``, every 1-D monotonic dimension coordinate is
+        read in full to build a coordinate index for value lookups.
+        """
+        if stats is None:
+            stats = ExtractionStats()
         metadata_dict = {}
-        visited_dims = set()
+        dimension_ranges_by_dim = {}
 
         for var_name, var in ds.variables.items():
             dimension_ranges = {}
             for dim in var.dims:
-                dimension_data = ds[dim]
-                first_value = dimension_data.isel({dim: 0}).values.item()
-                last_value = dimension_data.isel({dim: -1}).values.item()
-                dimension_ranges[dim] = (first_value, last_value)
-                if dim not in visited_dims:
-                    logger.info(f"Dimension {dim} ranges from {first_value} to {last_value}")
-                    visited_dims.add(dim)
+                if dim not in dimension_ranges_by_dim:
+                    first_value, last_value = _read_dimension_range(ds, dim, stats)
+                    dimension_ranges_by_dim[dim] = (first_value, last_value)
+                    logger.debug("Dimension %s ranges from %s to %s", dim, first_value, last_value)
+                dimension_ranges[dim] = dimension_ranges_by_dim[dim]
 
-
-            if hasattr(var.data, 'chunks') and var.data.chunks:
-                chunk_sizes = tuple(map(len, var.data.chunks))
+            # ``var.chunks`` rather than ``var.data.chunks``: ``.data`` loads lazily indexed arrays
+            if var.chunks:
+                chunk_sizes = tuple(map(len, var.chunks))
             else:
                 chunk_sizes = var.shape  # Default to one chunk per dimension if not chunked
 
@@ -166,11 +175,7 @@ class NDimMeta:
             attributes['dimension_names'] = var.dims
 
             if var.dtype == object:
-                # Rough estimation: Average size of a few sampled elements
-                sample_size = min(10, var.shape[0])
-                sample_indices = np.random.choice(range(var.shape[0]), size=sample_size)
-                average_size = np.mean([objsize.get_exclusive_deep_size(var.values[index]) for index in sample_indices])
-                estimated_item_size = average_size
+                estimated_item_size = _sample_object_size(var, stats)
             else:
                 estimated_item_size = var.dtype.itemsize
 
@@ -178,7 +183,8 @@ class NDimMeta:
             
             metadata = ArrayMeta(
                 shape=var.shape,
-                fill_value=var.attrs.get('_FillValue', None),
+                # CF decoding moves _FillValue from attrs to encoding
+                fill_value=var.attrs.get('_FillValue', var.encoding.get('_FillValue')),
                 dtype=var.dtype,
                 chunk_grid=chunk_sizes,
                 attributes=attributes,
@@ -188,21 +194,65 @@ class NDimMeta:
             )
             metadata_dict[var_name] = metadata
 
-        return cls(array_meta=metadata_dict, concat_dim=None)
-    
+        coord_indexes = _build_coord_indexes(ds, stats) if index_coords else None
+        return cls(array_meta=metadata_dict, concat_dim=None, coord_indexes=coord_indexes)
+
+    @classmethod
+    def from_file(cls, path, engine: Optional[str] = None, use_storage_chunks: bool = False,
+                  stats: Optional['ExtractionStats'] = None, index_coords: bool = False) -> 'NDimMeta':
+        """Build metadata from a NetCDF/HDF5 header read via netCDF4 or h5py.
+
+        See ``header.read_header``; the result matches ``from_xarray`` on the
+        same file opened with default decoding.
+        """
+        from . import header
+        return header.read_header(path, engine=engine, use_storage_chunks=use_storage_chunks, stats=stats, index_coords=index_coords)
+
+    def compact(self, pool: Optional[AttributePool] = None) -> 'NDimMeta':
+        """Copy using CompactArrayMeta, interning attributes through ``pool``.
+
+        Pass one pool to every file of a catalog to share attributes across
+        files; by default each call interns into a pool of its own.
+        """
+        pool = AttributePool() if pool is None else pool
+        return NDimMeta(
+            array_meta={var_name: CompactArrayMeta.from_array_meta(meta, pool) for var_name, meta in self.array_meta.items()},
+            concat_dim=self.concat_dim,
+            coord_indexes=self.coord_indexes,
+            concat_dims=self.concat_dims
+        )
+
+    def index_selection(self, bounds: dict) -> Dict[str, slice]:
+        """Index slices of the coordinate values within ``{dim: (lo, hi)}``, inclusive.
+
+        Requires metadata built with ``index_coords=True``.
+        """
+        selection = {}
+        for dim, (lo, hi) in bounds.items():
+            if not self.coord_indexes or dim not in self.coord_indexes:
+                raise ValueError(f"No coordinate index for dimension '{dim}'.")
+            selection[dim] = self.coord_indexes[dim].slice_indexer(lo, hi)
+        return selection
+
     @property
     def is_merged(self):
-        return self.concat_dim is not None
+        return bool(self.concat_dims)
 
     @property    
     def data_vars(self):
         return {dim: meta for dim, meta in self.array_meta.items() if meta.is_data_var}
 
+    def optimize_chunks(self, target_bytes, access_weights=None, top=10, **kwargs):
+        return optimize.optimize_chunks(self, target_bytes, access_weights=access_weights, top=top, **kwargs)
+
+    def estimate_access_costs(self, chunk_sizes, queries, var_names=None):
+        return cost.estimate_costs(self, chunk_sizes, queries, var_names)
+
     def analyze_chunking_strategy(self, chunk_sizes):
         logger.info("Starting chunking strategy analysis for each proposed dimension:")
         proposed_chunk_mem = {}
         for dim, chunk_size in chunk_sizes.items():
-            logger.info(f"\n=== Dimension: {dim} ===")
+            logger.info("=== Dimension: %s ===", dim)
             dim_size = self.array_meta[dim].shape[0]
             estimated_object_size = self.array_meta[dim].estimated_obj_size
             proposed_chunk_mem[dim] = util.analyze_chunking_strategy(dim_size, chunk_size, estimated_object_size)
@@ -214,5 +264,85 @@ class NDimMeta:
             data_var_chunk_shape = [chunk_sizes[dim] for dim in data_var_indices]
             data_var_chunk_mem = meta.estimated_obj_size * functools.reduce(operator.mul, data_var_chunk_shape)
             formatted_mem = util.format_mem_size(data_var_chunk_mem)
-            logger.info(f"Data Variable {var_name}")
-            logger.info(f"  - Chunk shape {tuple(data_var_chunk_shape)} @{formatted_mem} per chunk.")
+            logger.info("Data Variable %s", var_name)
+            logger.info("  - Chunk shape %s @%s per chunk.", tuple(data_var_chunk_shape), formatted_mem)
+
+
+@dataclass
+class ExtractionStats:
+    coordinate_reads: int = 0
+    object_samples: int = 0
+    bytes_read: int = 0
+
+
+def _same_representation(var_metas, pool: AttributePool):
+    # Mixed compact and plain metadata (e.g. new files appended to a compacted catalog)
+    # are merged in the representation of the first one
+    if isinstance(var_metas[0], CompactArrayMeta):
+        return [m if isinstance(m, CompactArrayMeta) else CompactArrayMeta.from_array_meta(m, pool) for m in var_metas]
+    return [m.to_array_meta() if isinstance(m, CompactArrayMeta) else m for m in var_metas]
+
+
+def _read_dimension_range(ds, dim, stats: ExtractionStats):
+    # Fetch both endpoints with a single indexed read
+    with instrument.timer('metadata.coordinate_read'):
+        if dim in ds.variables:
+            endpoints = ds.variables[dim][[0, -1]].values
+        else:
+            # xarray's default index for a dimension without a coordinate
+            endpoints = np.array([0, ds.sizes[dim] - 1], dtype=np.int64)
+    if endpoints.dtype == object:
+        nbytes = sum(_deep_size(value) for value in endpoints)
+    else:
+        nbytes = endpoints.nbytes
+    stats.coordinate_reads += 1
+    stats.bytes_read += nbytes
+    instrument.count('coordinates.read')
+    instrument.count('coordinates.bytes_read', nbytes)
+    return endpoints[0:1].item(), endpoints[1:2].item()
+
+
+def _build_coord_indexes(ds, stats: ExtractionStats):
+    indexes = {}
+    for dim in ds.dims:
+        if dim not in ds.variables or ds.variables[dim].ndim != 1:
+            continue
+        values = ds.variables[dim].values
+        stats.coordinate_reads += 1
+        stats.bytes_read += values.nbytes
+        try:
+            indexes[dim] = coord_index.from_values(values)
+        except ValueError as e:
+            logger.debug("Not indexing %s: %s", dim, e)
+    return indexes
+
+
+def _deep_size(value) -> int:
+    import objsize
+    # Values read from a file are fresh, so nothing else shares them. That makes
+    # get_exclusive_deep_size's gc.collect() and the default scan of every
+    # module's globals (to exclude them) pure overhead on each call
+    return objsize.get_deep_size(value, exclude_modules_globals=False)
+
+
+def _sample_object_size(var, stats: ExtractionStats, max_samples: int = 10):
+    # Rough estimation: Average size of a few sampled elements
+    size = int(np.prod(var.shape))
+    if var.ndim == 0:
+        samples = [var.values.item()]
+    elif size == 0:
+        return var.dtype.itemsize
+    else:
+        positions = np.sort(np.random.choice(size, size=min(max_samples, size), replace=False))
+        if var.ndim == 1:
+            sampled = var[positions].values
+            samples = [sampled[i] for i in range(len(positions))]
+        else:
+            # Read single elements; indexing the first axis alone would load whole rows
+            coords = np.unravel_index(positions, var.shape)
+            samples = [var[tuple(int(c[i]) for c in coords)].values[()] for i in range(len(positions))]
+
+    sizes = [_deep_size(sample) for sample in samples]
+    stats.object_samples += len(samples)
+    stats.bytes_read += sum(sizes)
+    return np.mean(sizes)
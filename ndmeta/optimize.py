@@ -0,0 +1,164 @@
+from dataclasses import dataclass
+import functools
+import logging
+import math
+import operator
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from . import instrument
+from . import util
+
+
+logger = logging.getLogger(__name__)
+
+MAX_COMBINATIONS = 2_000_000
+
+
+@dataclass
+class ChunkCandidate:
+    chunk_sizes: Dict[str, int]
+    num_chunks: int
+    chunk_bytes: float
+    waste: float
+    score: float
+
+    def describe(self) -> str:
+        shape = ", ".join(f"{dim}={size}" for dim, size in self.chunk_sizes.items())
+        return f"{shape}: {self.num_chunks} chunks @{util.format_mem_size(self.chunk_bytes)} per chunk, {self.waste:.1%} remainder waste"
+
+
+def candidate_sizes(dim_size: int, max_candidates: int) -> np.ndarray:
+    """Divisors and powers of two up to ``dim_size``, thinned to roughly log-spaced values."""
+    pool = set(util.divisors(dim_size))
+    pool.update(1 << p for p in range(dim_size.bit_length()) if 1 << p <= dim_size)
+    pool.add(dim_size)
+    pool = np.array(sorted(pool), dtype=np.int64)
+    if len(pool) <= max_candidates:
+        return pool
+
+    targets = np.log(np.geomspace(1, dim_size, max_candidates))
+    nearest = np.abs(np.log(pool)[None, :] - targets[:, None]).argmin(axis=1)
+    return np.unique(np.concatenate([pool[nearest], [dim_size]]))
+
+
+def _normalize_patterns(access_weights):
+    patterns = []
+    for dims, weight in (access_weights or {}).items():
+        dims = (dims,) if isinstance(dims, str) else tuple(dims)
+        patterns.append((dims, float(weight)))
+    return patterns
+
+
+def optimize_chunks(
+    meta,
+    target_bytes: float,
+    access_weights: Optional[dict] = None,
+    top: int = 10,
+    max_candidates_per_dim: int = 16,
+    fixed: Optional[Dict[str, int]] = None,
+    size_weight: float = 4.0,
+) -> List[ChunkCandidate]:
+    """Rank chunk shapes shared by all data variables of ``meta``.
+
+    Every combination of per-dimension candidate sizes is scored at once:
+    the log2 distance of the largest data-variable chunk from
+    ``target_bytes``, the weighted log2 read amplification of each access
+    pattern, and the fraction of the padded chunk grid lying past the array
+    edge. ``access_weights`` maps the dimension(s) a query reads in full,
+    e.g. ``{'time': 1.0}`` for time series or ``{('lat', 'lon'): 1.0}`` for
+    maps. The size term is scaled by ``size_weight`` so the target dominates
+    and access patterns choose among shapes of similar size. ``fixed`` pins
+    dimensions to a given chunk size.
+    """
+    data_vars = meta.data_vars
+    if not data_vars:
+        raise ValueError("No data variables to optimize chunking for.")
+    fixed = fixed or {}
+
+    dims, dim_sizes = [], {}
+    for array_meta in data_vars.values():
+        for dim, size in zip(array_meta.attributes['dimension_names'], array_meta.shape):
+            if dim not in dim_sizes:
+                dims.append(dim)
+                dim_sizes[dim] = size
+
+    unknown = set(fixed) - set(dims)
+    if unknown:
+        raise ValueError(f"Fixed dimensions {unknown} not found in data variables.")
+    nonpositive = {dim: size for dim, size in fixed.items() if size < 1}
+    if nonpositive:
+        raise ValueError(f"Fixed chunk sizes must be positive, got {nonpositive}")
+    free_dims = [dim for dim in dims if dim not in fixed]
+    per_dim = max_candidates_per_dim
+    while free_dims and per_dim > 2 and per_dim ** len(free_dims) > MAX_COMBINATIONS:
+        per_dim //= 2
+
+    candidates = {}
+    for dim in dims:
+        if dim in fixed:
+            candidates[dim] = np.array([fixed[dim]], dtype=np.int64)
+        elif dim_sizes[dim] == 0:
+            # Zero-length dims have no chunks; any size works, so use 1
+            candidates[dim] = np.array([1], dtype=np.int64)
+        else:
+            candidates[dim] = candidate_sizes(dim_sizes[dim], per_dim)
+
+    # One broadcastable axis per dimension
+    grids = dict(zip(dims, np.ix_(*[candidates[dim] for dim in dims])))
+    counts = {dim: -(-dim_sizes[dim] // grids[dim]) for dim in dims}
+
+    chunk_bytes = 0
+    num_chunks = 0
+    padded_bytes = 0
+    actual_bytes = 0
+    for array_meta in data_vars.values():
+        var_dims = array_meta.attributes['dimension_names']
+        var_chunk_bytes = array_meta.estimated_obj_size * functools.reduce(operator.mul, [grids[dim] for dim in var_dims], 1)
+        var_num_chunks = functools.reduce(operator.mul, [counts[dim] for dim in var_dims], 1)
+        chunk_bytes = np.maximum(chunk_bytes, var_chunk_bytes)
+        num_chunks = num_chunks + var_num_chunks
+        padded_bytes = padded_bytes + var_chunk_bytes * var_num_chunks
+        actual_bytes += array_meta.estimated_obj_size * math.prod(array_meta.shape)
+
+    # Variables with a zero-length dim pad nothing; with no padded bytes at all there is no waste
+    waste = 1 - np.where(padded_bytes > 0, actual_bytes / np.where(padded_bytes > 0, padded_bytes, 1), 1)
+    score = size_weight * np.abs(np.log2(chunk_bytes / target_bytes)) - np.log2(1 - waste)
+
+    patterns = _normalize_patterns(access_weights)
+    total_weight = sum(weight for _, weight in patterns)
+    if patterns and total_weight <= 0:
+        raise ValueError(f"Access weights must sum to a positive value, got {total_weight}")
+    for pattern_dims, weight in patterns:
+        unknown = set(pattern_dims) - set(dims)
+        if unknown:
+            raise ValueError(f"Access pattern dimensions {unknown} not found in data variables.")
+        log_amplification = 0
+        for dim in dims:
+            if dim in pattern_dims:
+                if dim_sizes[dim] == 0:
+                    continue
+                log_amplification = log_amplification + np.log2(counts[dim] * grids[dim] / dim_sizes[dim])
+            else:
+                log_amplification = log_amplification + np.log2(grids[dim])
+        score = score + weight / total_weight * log_amplification
+
+    shape = tuple(len(candidates[dim]) for dim in dims)
+    score = np.broadcast_to(score, shape)
+    best = np.argsort(score, axis=None, kind='stable')[:top]
+    logger.debug("Scored %d chunk shape combinations", score.size)
+    instrument.count('optimize.shapes_scored', score.size)
+
+    ranked = []
+    for flat_index in best:
+        index = np.unravel_index(flat_index, shape)
+        chunk_sizes = {dim: int(candidates[dim][i]) for dim, i in zip(dims, index)}
+        ranked.append(ChunkCandidate(
+            chunk_sizes=chunk_sizes,
+            num_chunks=int(np.broadcast_to(num_chunks, shape)[index]),
+            chunk_bytes=float(np.broadcast_to(chunk_bytes, shape)[index]),
+            waste=float(np.broadcast_to(waste, shape)[index]),
+            score=float(score[index]),
+        ))
+    return ranked
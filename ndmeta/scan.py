@@ -0,0 +1,157 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+import functools
+import logging
+import os
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+from .cache import MetadataCache
+from .catalog import Catalog
+from . import instrument
+from .ndim_meta import NDimMeta
+
+
+logger = logging.getLogger(__name__)
+
+HDF5_SIGNATURE = b'\x89HDF\r\n\x1a\n'
+
+
+@dataclass
+class ScanResult:
+    paths: List[str]
+    metas: List[Optional[NDimMeta]]
+    errors: Dict[str, BaseException] = field(default_factory=dict)
+    catalog: Optional[Catalog] = None
+    catalog_error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and self.catalog_error is None
+
+    def succeeded(self):
+        return [(path, meta) for path, meta in zip(self.paths, self.metas) if meta is not None]
+
+
+def extract_metadata(path, open_dataset: Optional[Callable] = None, open_kwargs: Optional[dict] = None, index_coords: bool = False) -> NDimMeta:
+    if open_dataset is None:
+        import xarray as xr
+        open_dataset = xr.open_dataset
+    with instrument.timer('scan.extract_metadata'):
+        instrument.count('files.opened')
+        with open_dataset(path, **(open_kwargs or {})) as ds:
+            return NDimMeta.from_xarray(ds, index_coords=index_coords)
+
+
+def check_unique(paths: Sequence[str]):
+    # Errors and cache entries are keyed by path, so duplicates would collide
+    seen = set()
+    for path in paths:
+        if path in seen:
+            raise ValueError(f"Path {path!r} is listed more than once.")
+        seen.add(path)
+
+
+def collect_results(paths, outcomes, concat_dim: Optional[str] = None) -> ScanResult:
+    """Assemble per-file ``(meta, error)`` outcomes into a ScanResult.
+
+    If the successful files cannot be merged (a gap, overlap or mismatch),
+    the merge error is kept in ``catalog_error`` and the per-file results are
+    still returned.
+    """
+    result = ScanResult(paths=paths, metas=[meta for meta, _ in outcomes])
+    for path, (_, error) in zip(paths, outcomes):
+        if error is not None:
+            logger.warning("Failed to extract metadata from %s: %r", path, error)
+            result.errors[path] = error
+
+    if concat_dim is not None:
+        succeeded = result.succeeded()
+        if succeeded:
+            try:
+                result.catalog = Catalog.from_metas(
+                    [meta for _, meta in succeeded],
+                    concat_dim,
+                    sources=[path for path, _ in succeeded]
+                )
+            except ValueError as e:
+                logger.warning("Failed to merge scanned files along %s: %s", concat_dim, e)
+                result.catalog_error = e
+    return result
+
+
+def _scan_one(path, open_dataset, open_kwargs, cache, index_coords):
+    try:
+        extract = functools.partial(extract_metadata, open_dataset=open_dataset, open_kwargs=open_kwargs, index_coords=index_coords)
+        if cache is not None:
+            return cache.get_or_extract(path, extract, index_coords), None
+        return extract(path), None
+    except Exception as e:
+        return None, e
+
+
+def _is_local_hdf5(path) -> bool:
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(HDF5_SIGNATURE)) == HDF5_SIGNATURE
+    except (OSError, TypeError, ValueError):
+        return False
+
+
+def _choose_executor(paths, open_dataset, max_workers: int) -> str:
+    # xarray's netCDF4/HDF5 backends serialize opens behind one global lock, so only
+    # processes scale; one worker, a custom opener or an active sink stays on threads
+    if (max_workers > 1 and open_dataset is None and not instrument.get_sink().enabled
+            and paths and _is_local_hdf5(paths[0])):
+        return 'process'
+    return 'thread'
+
+
+def _make_executor(executor, max_workers):
+    if executor == 'thread':
+        return ThreadPoolExecutor(max_workers=max_workers)
+    if executor == 'process':
+        return ProcessPoolExecutor(max_workers=max_workers)
+    raise ValueError(f"Unknown executor '{executor}', expected 'auto', 'thread', 'process' or an Executor instance.")
+
+
+def scan_files(
+    paths: Sequence[str],
+    concat_dim: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    executor: Union[str, Executor] = 'auto',
+    open_dataset: Optional[Callable] = None,
+    open_kwargs: Optional[dict] = None,
+    cache: Optional[MetadataCache] = None,
+    index_coords: bool = False,
+) -> ScanResult:
+    """Extract NDimMeta from many files concurrently.
+
+    Results keep the order of ``paths``, which must be unique. A file that
+    fails to open or parse is recorded in ``errors`` instead of aborting the
+    batch. With ``concat_dim``, the successful results are merged into a
+    Catalog, or the merge error is recorded in ``catalog_error``. Unchanged
+    files are served from ``cache`` when one is given.
+
+    xarray serializes netCDF4/HDF5 opens behind one global lock, so a
+    thread pool does not scale with cores there. ``executor='auto'`` uses
+    a process pool when several workers read local NetCDF4/HDF5 files
+    (judged from the first path) with the default ``open_dataset``, and
+    threads otherwise, or while an instrumentation sink is active (sinks
+    do not see work in other processes). In a process pool ``open_dataset`` must be picklable.
+    """
+    paths = list(paths)
+    check_unique(paths)
+    max_workers = max_workers or os.cpu_count()
+    if executor == 'auto':
+        executor = _choose_executor(paths, open_dataset, max_workers)
+        logger.debug("Scanning %d files with a %s pool", len(paths), executor)
+    owns_executor = not isinstance(executor, Executor)
+    pool = _make_executor(executor, max_workers) if owns_executor else executor
+    try:
+        futures = [pool.submit(_scan_one, path, open_dataset, open_kwargs, cache, index_coords) for path in paths]
+        outcomes = [future.result() for future in futures]
+    finally:
+        if owns_executor:
+            pool.shutdown()
+
+    return collect_results(paths, outcomes, concat_dim)
@@ -0,0 +1,348 @@
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+import functools
+import heapq
+from itertools import product
+import logging
+import operator
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import instrument
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TASK_BYTES = 512 * 1024 ** 2
+
+
+@dataclass
+class ChunkPiece:
+    """Part of a chunk held by one source: where to read it and where it goes."""
+    source: Any
+    local_slices: Dict[str, slice]
+    chunk_offsets: Dict[str, int]
+
+
+@dataclass
+class ChunkWork:
+    var_name: str
+    chunk_coords: Tuple[int, ...]
+    chunk_slices: Dict[str, slice]
+    dtype: str
+    estimated_bytes: int
+    pieces: List[ChunkPiece]
+
+
+@dataclass
+class WorkTask:
+    task_id: int
+    chunks: List[ChunkWork] = field(default_factory=list)
+    estimated_bytes: int = 0
+
+    @property
+    def sources(self) -> list:
+        """Distinct sources the task reads, in first-use order."""
+        seen = {}
+        for chunk in self.chunks:
+            for piece in chunk.pieces:
+                seen.setdefault(piece.source, None)
+        return list(seen)
+
+    def to_dict(self) -> dict:
+        """Plain JSON-compatible form (slices become ``[start, stop]``)."""
+        return {
+            'task_id': self.task_id,
+            'estimated_bytes': self.estimated_bytes,
+            'chunks': [{
+                'var_name': chunk.var_name,
+                'chunk_coords': list(chunk.chunk_coords),
+                'chunk_slices': _encode_slices(chunk.chunk_slices),
+                'dtype': chunk.dtype,
+                'estimated_bytes': chunk.estimated_bytes,
+                'pieces': [[piece.source, _encode_slices(piece.local_slices), piece.chunk_offsets] for piece in chunk.pieces],
+            } for chunk in self.chunks],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'WorkTask':
+        chunks = [ChunkWork(
+            var_name=chunk['var_name'],
+            chunk_coords=tuple(chunk['chunk_coords']),
+            chunk_slices=_decode_slices(chunk['chunk_slices']),
+            dtype=chunk['dtype'],
+            estimated_bytes=chunk['estimated_bytes'],
+            pieces=[ChunkPiece(source, _decode_slices(local), dict(offsets)) for source, local, offsets in chunk['pieces']],
+        ) for chunk in data['chunks']]
+        return cls(task_id=data['task_id'], chunks=chunks, estimated_bytes=data['estimated_bytes'])
+
+
+def _encode_slices(slices: dict) -> dict:
+    return {dim: [slc.start, slc.stop] for dim, slc in slices.items()}
+
+
+def _decode_slices(data: dict) -> dict:
+    return {dim: slice(start, stop) for dim, (start, stop) in data.items()}
+
+
+def _chunk_work(var_name, array_meta, coords, chunk_slices, pieces) -> ChunkWork:
+    elements = functools.reduce(operator.mul, (slc.stop - slc.start for slc in chunk_slices.values()), 1)
+    return ChunkWork(
+        var_name=var_name,
+        chunk_coords=tuple(coords),
+        chunk_slices=chunk_slices,
+        dtype=np.dtype(array_meta.dtype).str,
+        estimated_bytes=int(elements * array_meta.estimated_obj_size),
+        pieces=pieces,
+    )
+
+
+def _concat_spans(offsets, size: int, chunk: int):
+    """Files read by each chunk along the concat dim, from the catalog's offsets.
+
+    Returns the first file of every chunk and, per chunk, its
+    ``(position, local_start, local_stop, chunk_offset)`` pieces.
+    """
+    offsets = np.asarray(offsets)
+    starts = np.arange(0, size, chunk)
+    stops = np.minimum(starts + chunk, size)
+    first = np.searchsorted(offsets, starts, side='right') - 1
+    last = np.searchsorted(offsets, stops - 1, side='right') - 1
+    counts = last - first + 1
+    # One row per (chunk, file) overlap
+    chunk_ids = np.repeat(np.arange(len(starts)), counts)
+    positions = first[chunk_ids] + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    lo = np.maximum(starts[chunk_ids], offsets[positions])
+    hi = np.minimum(stops[chunk_ids], offsets[positions + 1])
+    rows = list(zip(
+        positions.tolist(), (lo - offsets[positions]).tolist(), (hi - offsets[positions]).tolist(), (lo - starts[chunk_ids]).tolist()
+    ))
+    ends = np.cumsum(counts).tolist()
+    pieces = [rows[end - count:end] for end, count in zip(ends, counts.tolist())]
+    return first, pieces
+
+
+def _iter_catalog_chunk_work(catalog, chunk_sizes: dict, var_names) -> Iterator[Tuple[Any, ChunkWork]]:
+    # Chunks come out already ordered by (first file, variable, coords): a chunk's
+    # first file only depends on its position along the concat dim, which is monotonic
+    concat_dim = catalog.concat_dim
+    grids, slices, spans = {}, {}, {}
+    for var_name in var_names:
+        grid = grids[var_name] = catalog.meta.chunk_grid(var_name, chunk_sizes)
+        # Chunk slices per dim, built once and combined per chunk
+        slices[var_name] = [
+            [slice(start, min(start + chunk, size)) for start in range(0, size, chunk)]
+            for size, chunk in zip(grid.shape, grid.chunk_shape)
+        ]
+        if concat_dim in grid.dims:
+            axis = grid.dims.index(concat_dim)
+            spans[var_name] = (axis, *_concat_spans(catalog.offsets, grid.shape[axis], grid.chunk_shape[axis]))
+
+    localities = {0}
+    for _, first, _ in spans.values():
+        localities.update(first.tolist())
+
+    for locality in sorted(localities):
+        for var_name in var_names:
+            array_meta = catalog.meta.array_meta[var_name]
+            grid = grids[var_name]
+            dim_slices = slices[var_name]
+            if var_name not in spans:
+                if locality != 0:
+                    continue
+                source = catalog.sources[0]
+                for coords in product(*map(range, grid.grid_shape)):
+                    chunk_slices = dict(zip(grid.dims, map(list.__getitem__, dim_slices, coords)))
+                    offsets = dict.fromkeys(grid.dims, 0)
+                    yield locality, _chunk_work(var_name, array_meta, coords, chunk_slices, [ChunkPiece(source, dict(chunk_slices), offsets)])
+                continue
+
+            axis, first, concat_pieces = spans[var_name]
+            lo, hi = np.searchsorted(first, [locality, locality + 1]).tolist()
+            if lo == hi:
+                continue
+            ranges = list(map(range, grid.grid_shape))
+            ranges[axis] = range(lo, hi)
+            for coords in product(*ranges):
+                chunk_slices = dict(zip(grid.dims, map(list.__getitem__, dim_slices, coords)))
+                pieces = []
+                for position, local_start, local_stop, chunk_offset in concat_pieces[coords[axis]]:
+                    local = dict(chunk_slices)
+                    local[concat_dim] = slice(local_start, local_stop)
+                    offsets = dict.fromkeys(grid.dims, 0)
+                    offsets[concat_dim] = chunk_offset
+                    pieces.append(ChunkPiece(catalog.sources[position], local, offsets))
+                yield locality, _chunk_work(var_name, array_meta, coords, chunk_slices, pieces)
+
+
+def _iter_tiled_chunk_work(catalog, chunk_sizes: dict, var_names) -> Iterator[Tuple[Any, ChunkWork]]:
+    for var_name in var_names:
+        array_meta = catalog.meta.array_meta[var_name]
+        grid = catalog.meta.chunk_grid(var_name, chunk_sizes)
+        for coords in np.ndindex(*grid.grid_shape):
+            chunk_slices = grid.chunk_slices(coords)
+            pieces = []
+            locality = None
+            for key, source, local in catalog.chunk_sources(var_name, chunk_slices):
+                locality = key if locality is None else locality
+                extents = catalog.tile_extent(key)
+                offsets = {
+                    dim: (extents[dim][0] + local[dim].start - chunk_slices[dim].start) if dim in extents else 0
+                    for dim in chunk_slices
+                }
+                pieces.append(ChunkPiece(source, local, offsets))
+            yield locality, _chunk_work(var_name, array_meta, coords, chunk_slices, pieces)
+
+
+def _iter_chunk_work(catalog, chunk_sizes: dict, var_names) -> Iterator[Tuple[Any, ChunkWork]]:
+    """``(locality, ChunkWork)`` pairs ordered by first source read, variable, then chunk coords."""
+    if not hasattr(catalog, 'tile_extent'):
+        return _iter_catalog_chunk_work(catalog, chunk_sizes, var_names)
+    order = {var_name: i for i, var_name in reversed(list(enumerate(var_names)))}
+    return iter(sorted(
+        _iter_tiled_chunk_work(catalog, chunk_sizes, var_names),
+        key=lambda item: (item[0], order[item[1].var_name], item[1].chunk_coords)
+    ))
+
+
+def _chunk_lengths(size: int, chunk: int, count: int) -> Counter:
+    lengths = Counter()
+    if count:
+        lengths[chunk] += count - 1
+        lengths[size - (count - 1) * chunk] += 1
+    return +lengths
+
+
+def _planned_bytes(catalog, chunk_sizes: dict, var_names) -> int:
+    # Sum of ChunkWork.estimated_bytes without building the chunks: along each dim
+    # chunks have at most two lengths (full and tail), so only their combinations matter
+    total = 0
+    for var_name in var_names:
+        array_meta = catalog.meta.array_meta[var_name]
+        grid = catalog.meta.chunk_grid(var_name, chunk_sizes)
+        lengths = [_chunk_lengths(size, chunk, count) for size, chunk, count in zip(grid.shape, grid.chunk_shape, grid.grid_shape)]
+        for combination in product(*(counter.items() for counter in lengths)):
+            elements = functools.reduce(operator.mul, (length for length, _ in combination), 1)
+            chunks = functools.reduce(operator.mul, (count for _, count in combination), 1)
+            total += chunks * int(elements * array_meta.estimated_obj_size)
+    return total
+
+
+def plan_tasks(
+    catalog,
+    chunk_sizes: dict,
+    target_task_bytes: Optional[int] = None,
+    num_tasks: Optional[int] = None,
+    var_names: Optional[Sequence[str]] = None,
+    locality_fill: float = 0.75,
+) -> List[WorkTask]:
+    """Group the chunks of a Catalog or TiledCatalog into byte-balanced tasks.
+
+    Chunks are ordered by the first source they read, then packed greedily
+    into tasks of at most ``target_task_bytes``, or into about ``num_tasks``
+    tasks of equal bytes. A task is also closed at a source boundary once it
+    is ``locality_fill`` full, so tasks open as few files as possible. Chunk
+    bytes come from ``estimated_obj_size``, so mixed dtypes weigh what they
+    read.
+    """
+    var_names = list(catalog.meta.array_meta) if var_names is None else list(var_names)
+    remaining = _planned_bytes(catalog, chunk_sizes, var_names)
+    if target_task_bytes is None and not num_tasks:
+        target_task_bytes = DEFAULT_TASK_BYTES
+    if target_task_bytes is not None and target_task_bytes <= 0:
+        raise ValueError(f"Target task size must be positive, got {target_task_bytes}")
+
+    def next_target():
+        if target_task_bytes is not None:
+            return target_task_bytes
+        # Spread what is left over the tasks still to be made, so early cuts don't add tasks
+        return remaining / max(num_tasks - len(tasks), 1)
+
+    tasks = []
+    task, target, current_locality = None, 0, None
+    planned = 0
+    for locality, chunk in _iter_chunk_work(catalog, chunk_sizes, var_names):
+        planned += 1
+        if task is not None and task.chunks:
+            # With a byte cap the cap is hard; with a task count, round to the nearer side
+            overshoot = chunk.estimated_bytes if target_task_bytes is not None else chunk.estimated_bytes / 2
+            if task.estimated_bytes + overshoot > target or (
+                locality != current_locality and task.estimated_bytes >= locality_fill * target
+            ):
+                task = None
+        if task is None:
+            target = next_target()
+            task = WorkTask(task_id=len(tasks))
+            tasks.append(task)
+        task.chunks.append(chunk)
+        task.estimated_bytes += chunk.estimated_bytes
+        remaining -= chunk.estimated_bytes
+        current_locality = locality
+
+    instrument.count('schedule.chunks_planned', planned)
+    logger.debug("Planned %d chunks into %d tasks", planned, len(tasks))
+    return tasks
+
+
+def assign_tasks(tasks: Sequence[WorkTask], num_workers: int) -> List[List[WorkTask]]:
+    """Longest-processing-time-first assignment of tasks to workers by bytes."""
+    if num_workers < 1:
+        raise ValueError(f"Need at least one worker, got {num_workers}")
+    loads = [(0, worker) for worker in range(num_workers)]
+    assignment = [[] for _ in range(num_workers)]
+    for task in sorted(tasks, key=lambda t: t.estimated_bytes, reverse=True):
+        load, worker = heapq.heappop(loads)
+        assignment[worker].append(task)
+        heapq.heappush(loads, (load + task.estimated_bytes, worker))
+    return assignment
+
+
+def submit_tasks(tasks: Sequence[WorkTask], client, fn: Callable, **kwargs) -> List[Future]:
+    """Submit ``fn(task_dict, **kwargs)`` for every task, largest first.
+
+    ``client`` is anything with an Executor-style ``submit``, such as a
+    ``concurrent.futures`` pool or a ``dask.distributed.Client``. Tasks are
+    passed in their ``to_dict`` form so they serialize cheaply. Returned
+    futures follow the order of ``tasks``.
+    """
+    order = sorted(range(len(tasks)), key=lambda i: tasks[i].estimated_bytes, reverse=True)
+    futures = [None] * len(tasks)
+    for i in order:
+        futures[i] = client.submit(fn, tasks[i].to_dict(), **kwargs)
+    return futures
+
+
+def read_task(task, open_dataset: Optional[Callable] = None, open_kwargs: Optional[dict] = None):
+    """Read every chunk of a task (a WorkTask or its dict form), opening each source once.
+
+    Returns a list of ``(var_name, chunk_slices, ndarray)``, so it can be
+    passed to ``submit_tasks`` and its result sent back from a worker.
+    """
+    if isinstance(task, dict):
+        task = WorkTask.from_dict(task)
+    if open_dataset is None:
+        import xarray as xr
+        open_dataset = xr.open_dataset
+    datasets = {}
+    results = []
+    try:
+        for chunk in task.chunks:
+            dims = list(chunk.chunk_slices)
+            buffer = np.empty(tuple(slc.stop - slc.start for slc in chunk.chunk_slices.values()), dtype=chunk.dtype)
+            for piece in chunk.pieces:
+                if piece.source not in datasets:
+                    instrument.count('files.opened')
+                    datasets[piece.source] = open_dataset(piece.source, **(open_kwargs or {}))
+                data = datasets[piece.source][chunk.var_name].isel(piece.local_slices).values
+                index = tuple(
+                    slice(piece.chunk_offsets[dim], piece.chunk_offsets[dim] + piece.local_slices[dim].stop - piece.local_slices[dim].start)
+                    for dim in dims
+                )
+                buffer[index] = data
+            results.append((chunk.var_name, chunk.chunk_slices, buffer))
+    finally:
+        for ds in datasets.values():
+            ds.close()
+    return results
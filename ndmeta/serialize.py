@@ -0,0 +1,158 @@
+import base64
+import datetime
+import json
+import math
+
+import numpy as np
+
+from .array_meta import ArrayMeta
+from .coord_index import index_from_dict
+from .ndim_meta import NDimMeta
+
+
+FORMAT_VERSION = 1
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode('ascii')
+
+
+def encode_value(value):
+    """Encode a metadata value as JSON-compatible data.
+
+    Values JSON cannot represent natively (tuples, numpy scalars and dtypes,
+    non-finite floats, datetimes, cftime dates) become single-key tagged
+    objects, so ``decode_value(encode_value(v)) == v``.
+    """
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, int) and not isinstance(value, np.integer):
+        return value
+    if isinstance(value, float) and not isinstance(value, np.floating):
+        return value if math.isfinite(value) else {'__float__': repr(value)}
+    if isinstance(value, tuple):
+        return {'__tuple__': [encode_value(v) for v in value]}
+    if isinstance(value, list):
+        return [encode_value(v) for v in value]
+    if isinstance(value, dict):
+        return {'__dict__': [[encode_value(k), encode_value(v)] for k, v in value.items()]}
+    if isinstance(value, np.dtype):
+        return {'__dtype__': value.str}
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return {'__objarray__': [encode_value(v) for v in value.ravel()], 'shape': list(value.shape)}
+        return {'__ndarray__': value.dtype.str, 'shape': list(value.shape), 'data': _b64(np.ascontiguousarray(value).tobytes())}
+    if isinstance(value, np.generic):
+        return {'__npscalar__': value.dtype.str, 'data': _b64(value.tobytes())}
+    if isinstance(value, bytes):
+        return {'__bytes__': _b64(value)}
+    if type(value).__module__.startswith('cftime'):
+        return {
+            '__cftime__': value.calendar,
+            'class': type(value).__name__,
+            'args': [value.year, value.month, value.day, value.hour, value.minute, value.second, value.microsecond],
+            'has_year_zero': value.has_year_zero,
+        }
+    if isinstance(value, datetime.datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, datetime.timedelta):
+        return {'__timedelta__': [value.days, value.seconds, value.microseconds]}
+    raise TypeError(f"Cannot serialize value of type {type(value).__name__}")
+
+
+def decode_value(value):
+    if isinstance(value, list):
+        return [decode_value(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if '__tuple__' in value:
+        return tuple(decode_value(v) for v in value['__tuple__'])
+    if '__dict__' in value:
+        return {decode_value(k): decode_value(v) for k, v in value['__dict__']}
+    if '__float__' in value:
+        return float(value['__float__'])
+    if '__dtype__' in value:
+        return np.dtype(value['__dtype__'])
+    if '__ndarray__' in value:
+        data = base64.b64decode(value['data'])
+        return np.frombuffer(data, dtype=value['__ndarray__']).reshape(value['shape']).copy()
+    if '__objarray__' in value:
+        array = np.empty(len(value['__objarray__']), dtype=object)
+        array[:] = [decode_value(v) for v in value['__objarray__']]
+        return array.reshape(value['shape'])
+    if '__npscalar__' in value:
+        return np.frombuffer(base64.b64decode(value['data']), dtype=value['__npscalar__'])[0]
+    if '__bytes__' in value:
+        return base64.b64decode(value['__bytes__'])
+    if '__cftime__' in value:
+        return _decode_cftime(value)
+    if '__datetime__' in value:
+        return datetime.datetime.fromisoformat(value['__datetime__'])
+    if '__date__' in value:
+        return datetime.date.fromisoformat(value['__date__'])
+    if '__timedelta__' in value:
+        return datetime.timedelta(*value['__timedelta__'])
+    raise ValueError(f"Unknown serialized value tag in {sorted(value)}")
+
+
+def _decode_cftime(value: dict):
+    import cftime
+    # Rebuild the calendar subclass (e.g. DatetimeNoLeap) the value was encoded from
+    cls = getattr(cftime, value.get('class', 'datetime'), None)
+    if not (isinstance(cls, type) and issubclass(cls, cftime.datetime)):
+        raise ValueError(f"Unknown cftime class {value['class']!r}")
+    if cls is cftime.datetime:
+        return cls(*value['args'], calendar=value['__cftime__'], has_year_zero=value['has_year_zero'])
+    return cls(*value['args'], has_year_zero=value['has_year_zero'])
+
+
+def encode_array_meta(meta: ArrayMeta) -> dict:
+    return {
+        "shape": encode_value(tuple(meta.shape)),
+        "fill_value": encode_value(meta.fill_value),
+        "dtype": encode_value(np.dtype(meta.dtype)),
+        "chunk_grid": encode_value(tuple(meta.chunk_grid)),
+        "attributes": encode_value(dict(meta.attributes)),
+        "dimension_ranges": encode_value(dict(meta.dimension_ranges)),
+        "estimated_obj_size": encode_value(meta.estimated_obj_size),
+        "is_data_var": meta.is_data_var
+    }
+
+
+def decode_array_meta(data: dict) -> ArrayMeta:
+    return ArrayMeta(**{key: decode_value(value) for key, value in data.items()})
+
+
+def encode_ndim_meta(meta: NDimMeta) -> dict:
+    return {
+        "version": FORMAT_VERSION,
+        "concat_dim": meta.concat_dim,
+        "concat_dims": list(meta.concat_dims),
+        "array_meta": [[var_name, encode_array_meta(array_meta)] for var_name, array_meta in meta.array_meta.items()],
+        "coord_indexes": None if meta.coord_indexes is None else [
+            [dim, encode_value(index.to_dict())] for dim, index in meta.coord_indexes.items()
+        ],
+    }
+
+
+def decode_ndim_meta(data: dict) -> NDimMeta:
+    if data.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported serialized metadata version {data.get('version')!r}")
+    return NDimMeta(
+        array_meta={var_name: decode_array_meta(array_meta) for var_name, array_meta in data["array_meta"]},
+        concat_dim=data["concat_dim"],
+        coord_indexes=None if data.get("coord_indexes") is None else {
+            dim: index_from_dict(decode_value(index)) for dim, index in data["coord_indexes"]
+        },
+        concat_dims=data.get("concat_dims", ())
+    )
+
+
+def dumps(meta: NDimMeta) -> str:
+    return json.dumps(encode_ndim_meta(meta), separators=(',', ':'))
+
+
+def loads(text) -> NDimMeta:
+    return decode_ndim_meta(json.loads(text))
@@ -0,0 +1,162 @@
+from dataclasses import dataclass, replace
+from itertools import product
+import logging
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .catalog import check_contiguous, concat_length, concat_range, is_descending
+from .ndim_meta import NDimMeta
+from . import coverage
+
+
+logger = logging.getLogger(__name__)
+
+
+def _tile_positions(ranges, lengths, sources, dim: str):
+    """Position of every file along ``dim`` plus the ordered tile lengths.
+
+    Files starting at the same coordinate share a position and must agree on
+    their full range and length.
+    """
+    by_start = {}
+    for i, (first, _) in enumerate(ranges):
+        by_start.setdefault(first, i)
+    for i, (rng, length) in enumerate(zip(ranges, lengths)):
+        j = by_start[rng[0]]
+        if ranges[j] != rng or lengths[j] != length:
+            raise ValueError(f"Sources {sources[j]!r} and {sources[i]!r} overlap along '{dim}'.")
+
+    representatives = list(by_start.values())
+    descending = is_descending([ranges[i] for i in representatives], [lengths[i] for i in representatives])
+    representatives.sort(key=lambda i: ranges[i][0], reverse=descending)
+    check_contiguous(
+        [ranges[i] for i in representatives],
+        [lengths[i] for i in representatives],
+        [sources[i] for i in representatives],
+        descending
+    )
+    rank = {ranges[i][0]: position for position, i in enumerate(representatives)}
+    return [rank[first] for first, _ in ranges], [lengths[i] for i in representatives]
+
+
+@dataclass
+class TiledCatalog:
+    """Merged metadata of files tiling a hypercube along several dimensions.
+
+    ``sources`` is an object array with one entry per tile, indexed by tile
+    position along each of ``concat_dims``. ``offsets[dim][i]`` is the global
+    index at which tiles at position ``i`` start along ``dim``. The merged
+    ``meta`` records all of ``concat_dims``; its ``concat_dim`` is set only
+    for a tiling along one dimension.
+    """
+    meta: NDimMeta
+    concat_dims: Tuple[str, ...]
+    sources: np.ndarray
+    offsets: Dict[str, np.ndarray]
+
+    @classmethod
+    def from_metas(cls, metas: Sequence[NDimMeta], concat_dims: Sequence[str], sources: Optional[Sequence[Any]] = None) -> 'TiledCatalog':
+        """Place each file in the tile grid from its ``dimension_ranges`` and merge.
+
+        Every grid cell must hold exactly one file, and tiles along each
+        dimension must be contiguous. Placement is a hash lookup per file and
+        the merge concatenates each grid axis in turn, so the cost is linear
+        in the number of files.
+        """
+        if not metas:
+            raise ValueError("At least one metadata set is required to build a catalog.")
+        concat_dims = tuple(concat_dims)
+        sources = list(range(len(metas))) if sources is None else list(sources)
+        if len(sources) != len(metas):
+            raise ValueError(f"Got {len(sources)} sources for {len(metas)} metadata sets.")
+
+        positions, offsets = [], {}
+        for dim in concat_dims:
+            ranges = [concat_range(meta, dim) for meta in metas]
+            lengths = [concat_length(meta, dim) for meta in metas]
+            dim_positions, tile_lengths = _tile_positions(ranges, lengths, sources, dim)
+            positions.append(dim_positions)
+            offsets[dim] = np.zeros(len(tile_lengths) + 1, dtype=np.int64)
+            np.cumsum(tile_lengths, out=offsets[dim][1:])
+
+        grid_shape = tuple(len(offsets[dim]) - 1 for dim in concat_dims)
+        tiles = np.full(grid_shape, -1, dtype=np.int64)
+        for i, tile in enumerate(zip(*positions)):
+            if tiles[tile] >= 0:
+                raise ValueError(f"Sources {sources[tiles[tile]]!r} and {sources[i]!r} occupy the same tile {tile}.")
+            tiles[tile] = i
+        missing = np.argwhere(tiles < 0)
+        if len(missing):
+            raise ValueError(f"Gap in tiling: no source for tile {tuple(int(c) for c in missing[0])} of grid {grid_shape}.")
+
+        # Concatenate the innermost grid axis first, collapsing one axis per pass
+        merged = np.empty(grid_shape, dtype=object)
+        for tile in np.ndindex(*grid_shape):
+            merged[tile] = metas[tiles[tile]]
+        for axis in reversed(range(len(concat_dims))):
+            collapsed = np.empty(merged.shape[:-1], dtype=object)
+            for index in np.ndindex(*collapsed.shape):
+                collapsed[index] = NDimMeta.concat(list(merged[index]), concat_dims[axis])
+            merged = collapsed
+
+        source_grid = np.empty(grid_shape, dtype=object)
+        for tile in np.ndindex(*grid_shape):
+            source_grid[tile] = sources[tiles[tile]]
+        logger.debug("Tiled %d sources into a %s grid along %s", len(sources), grid_shape, concat_dims)
+        meta = replace(merged[()], concat_dim=concat_dims[0] if len(concat_dims) == 1 else None, concat_dims=concat_dims)
+        return cls(meta=meta, concat_dims=concat_dims, sources=source_grid, offsets=offsets)
+
+    @property
+    def grid_shape(self) -> Tuple[int, ...]:
+        return self.sources.shape
+
+    def __len__(self):
+        return self.sources.size
+
+    def tile_extent(self, tile) -> Dict[str, Tuple[int, int]]:
+        """Global ``[start, stop)`` range the tile holds along each concat dim."""
+        return {
+            dim: (int(self.offsets[dim][position]), int(self.offsets[dim][position + 1]))
+            for dim, position in zip(self.concat_dims, tile)
+        }
+
+    def locate(self, dim: str, index):
+        """Tile position along ``dim`` holding each global index."""
+        return np.searchsorted(self.offsets[dim], index, side='right') - 1
+
+    def chunk_coverage(self, tile, chunk_sizes: dict, compact: bool = False, var_names: Optional[Sequence[str]] = None):
+        """Coverage of every chunk by the source at ``tile`` in the grid."""
+        bounds = self.tile_extent(tile)
+        tables = {}
+        for var_name in (self.meta.array_meta if var_names is None else var_names):
+            grid = self.meta.chunk_grid(var_name, chunk_sizes)
+            tables[var_name] = coverage.compute_grid_coverage(var_name, grid, bounds)
+        if compact:
+            return tables
+        return coverage.to_coverage_dict(tables.values())
+
+    def chunk_sources(self, var_name: str, chunk_slices: dict):
+        """Tiles, sources and local slices that together fill one chunk.
+
+        Along concat dims a variable lacks, it is read from the first tile.
+        """
+        dims = self.meta.array_meta[var_name].attributes['dimension_names']
+        per_dim = []
+        for dim in self.concat_dims:
+            if dim in dims:
+                chunk = chunk_slices[dim]
+                first, last = self.locate(dim, [chunk.start, chunk.stop - 1])
+                per_dim.append(range(int(first), int(last) + 1))
+            else:
+                per_dim.append(range(1))
+
+        pieces = []
+        for tile in product(*per_dim):
+            local = dict(chunk_slices)
+            for dim, (tile_start, tile_stop) in self.tile_extent(tile).items():
+                if dim in dims:
+                    chunk = chunk_slices[dim]
+                    local[dim] = slice(max(chunk.start, tile_start) - tile_start, min(chunk.stop, tile_stop) - tile_start)
+            pieces.append((tile, self.sources[tile], local))
+        return pieces
@@ -1,3 +1,9 @@
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
 def format_mem_size(bytes, suffix="B"):
     """Scale bytes to its proper format"""
     factor = 1024
@@ -6,21 +12,43 @@ def format_mem_size(bytes, suffix="B"):
             return f"{bytes:.2f}{unit}{suffix}"
         bytes /= factor
 
+def prime_factors(n):
+    """Prime factorization of n as a {prime: exponent} dict, by trial division up to sqrt(n)"""
+    factors = {}
+    p = 2
+    while p * p <= n:
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+        p += 1 if p == 2 else 2
+    if n > 1:
+        factors[n] = factors.get(n, 0) + 1
+    return factors
+
+def divisors(n):
+    """Sorted divisors of n, generated from its prime factorization"""
+    if n < 1:
+        return []
+    result = [1]
+    for prime, exponent in prime_factors(n).items():
+        result = [d * prime ** e for d in result for e in range(exponent + 1)]
+    return sorted(result)
+
 def analyze_chunking_strategy(dim_size, proposed_chunk_size, estimated_object_size):
-    print(f"\nAnalyzing chunking strategy for dimension size {dim_size} and proposed chunk size {proposed_chunk_size}:")
+    logger.info("Analyzing chunking strategy for dimension size %d and proposed chunk size %d:", dim_size, proposed_chunk_size)
     num_chunks = dim_size // proposed_chunk_size
     remainder = dim_size % proposed_chunk_size
     proposed_chunk_mem = estimated_object_size * proposed_chunk_size
     proposed_formatted_mem_size = format_mem_size(proposed_chunk_mem)
-    print(f"  - {num_chunks} chunks of size {proposed_chunk_size}, with a remainder of {remainder} @{proposed_formatted_mem_size} per chunk.")
+    logger.info("  - %d chunks of size %d, with a remainder of %d @%s per chunk.", num_chunks, proposed_chunk_size, remainder, proposed_formatted_mem_size)
 
-    print("\nAlternative chunk sizes based on divisors:")
-    divisors = [i for i in range(1, dim_size + 1) if dim_size % i == 0 and i != 1 and i != dim_size]
-    alternative_chunk_sizes = sorted(divisors, key=lambda x: abs(x - proposed_chunk_size))
+    logger.info("Alternative chunk sizes based on divisors:")
+    proper_divisors = [i for i in divisors(dim_size) if i != 1 and i != dim_size]
+    alternative_chunk_sizes = sorted(proper_divisors, key=lambda x: abs(x - proposed_chunk_size))
 
     for alternative_chunk_size in alternative_chunk_sizes[:5]:
         alternative_chunk_mem = estimated_object_size * alternative_chunk_size
         alternative_formatted_mem_size = format_mem_size(alternative_chunk_mem)
-        print(f"  - Chunk size of {alternative_chunk_size} evenly divides the dimension @{alternative_formatted_mem_size} per chunk.")
+        logger.info("  - Chunk size of %d evenly divides the dimension @%s per chunk.", alternative_chunk_size, alternative_formatted_mem_size)
 
     return proposed_chunk_mem
\ No newline at end of file
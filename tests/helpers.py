@@ -0,0 +1,54 @@
+"""Synthetic datasets, metadata and openers shared by the test modules."""
+import numpy as np
+import xarray as xr
+
+from ndmeta import Catalog, NDimMeta
+
+
+def make_dataset(time_start, time_size, lat_size=6, lon_size=8):
+    return xr.Dataset(
+        {'pr': (('time', 'lat', 'lon'), np.zeros((time_size, lat_size, lon_size), dtype='float32'))},
+        coords={
+            'time': np.arange(time_start, time_start + time_size),
+            'lat': np.linspace(-90, 90, lat_size),
+            'lon': np.linspace(0, 360, lon_size, endpoint=False),
+        }
+    )
+
+
+def make_metas(lengths, start=0):
+    metas = []
+    for length in lengths:
+        metas.append(NDimMeta.from_xarray(make_dataset(start, length)))
+        start += length
+    return metas
+
+
+def open_synthetic(path):
+    # Paths look like "<start>:<length>"
+    start, length = map(int, path.split(':'))
+    if length <= 0:
+        raise OSError(f"cannot open {path}")
+    return make_dataset(start, length)
+
+
+FULL_PR = np.arange(17 * 4 * 6, dtype='float32').reshape(17, 4, 6)
+
+
+class Opener:
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self, path):
+        self.opened.append(path)
+        start, length = map(int, path.split(':'))
+        return xr.Dataset(
+            {'pr': (('time', 'lat', 'lon'), FULL_PR[start:start + length])},
+            coords={'time': np.arange(start, start + length), 'lat': np.arange(4.0), 'lon': np.arange(6.0)},
+        )
+
+
+def make_catalog(paths):
+    opener = Opener()
+    metas = [NDimMeta.from_xarray(opener(path)) for path in paths]
+    return Catalog.from_metas(metas, 'time', sources=paths)
@@ -0,0 +1,203 @@
+import asyncio
+import functools
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import importlib.util
+import io
+import os
+import pickle
+import re
+import threading
+import time
+
+import pytest
+
+from ndmeta import instrument
+from ndmeta.aio import scan_files_async
+from ndmeta.cache import MetadataCache
+from tests.helpers import make_dataset
+
+
+class FakeObjectStore:
+    """In-memory stand-in for an fsspec filesystem."""
+
+    def __init__(self, objects, delay=0.01, slow=()):
+        self.objects = objects
+        self.delay = delay
+        self.slow = set(slow)
+        self.active = 0
+        self.max_active = 0
+        self.opened = 0
+        self.lock = threading.Lock()
+
+    def info(self, path):
+        return {'size': len(self.objects[path]), 'ETag': str(hash(self.objects[path]))}
+
+    def open(self, path, mode='rb', **kwargs):
+        with self.lock:
+            self.opened += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.5 if path in self.slow else self.delay)
+        if path not in self.objects:
+            self.closed()
+            raise FileNotFoundError(path)
+        f = io.BytesIO(self.objects[path])
+        f.close = self.closed
+        return f
+
+    def closed(self):
+        with self.lock:
+            self.active -= 1
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Static file server answering ``Range: bytes=a-b`` like an object store."""
+
+    def log_message(self, *args):
+        pass
+
+    def send_head(self):
+        match = re.fullmatch(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+        path = self.translate_path(self.path)
+        if not match or not os.path.isfile(path):
+            return super().send_head()
+        with open(path, 'rb') as f:
+            data = f.read()
+        start = int(match.group(1))
+        stop = min(int(match.group(2) or len(data) - 1) + 1, len(data))
+        self.send_response(206)
+        self.send_header('Content-Range', f'bytes {start}-{stop - 1}/{len(data)}')
+        self.send_header('Content-Length', str(stop - start))
+        self.end_headers()
+        return io.BytesIO(data[start:stop])
+
+
+def serve(directory):
+    handler = functools.partial(RangeRequestHandler, directory=str(directory))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def unpickle_dataset(f):
+    return pickle.load(f)
+
+
+def test_scan_files_async_with_fake_store():
+    objects = {f"s3://bucket/{i}.nc": pickle.dumps(make_dataset(i * 4, 4)) for i in range(10)}
+    urls = list(objects)[::-1] + ['s3://bucket/missing.nc', 's3://bucket/slow.nc']
+    objects['s3://bucket/slow.nc'] = objects[urls[0]]
+    store = FakeObjectStore(objects, slow={'s3://bucket/slow.nc'})
+
+    result = asyncio.run(scan_files_async(
+        urls, concat_dim='time', concurrency=3, timeout=0.2, fs=store, open_dataset=unpickle_dataset
+    ))
+
+    assert(store.max_active == 3)
+    assert(set(result.errors) == {'s3://bucket/missing.nc', 's3://bucket/slow.nc'})
+    assert(isinstance(result.errors['s3://bucket/slow.nc'], asyncio.TimeoutError))
+    assert(result.catalog.sources == [f"s3://bucket/{i}.nc" for i in range(10)])
+    assert(result.catalog.offsets[-1] == 40)
+    # The timed-out open closes its file once it returns
+    time.sleep(0.5)
+    assert(store.active == 0)
+
+
+def test_scan_files_async_timeout_frees_slot():
+    objects = {f"s3://bucket/{i}.nc": pickle.dumps(make_dataset(i * 4, 4)) for i in range(3)}
+    store = FakeObjectStore(objects, slow={'s3://bucket/0.nc'})
+
+    start = time.monotonic()
+    result = asyncio.run(scan_files_async(
+        list(objects), concurrency=1, timeout=0.1, fs=store, open_dataset=unpickle_dataset
+    ))
+    elapsed = time.monotonic() - start
+
+    assert(list(result.errors) == ['s3://bucket/0.nc'])
+    assert(isinstance(result.errors['s3://bucket/0.nc'], asyncio.TimeoutError))
+    assert(len(result.succeeded()) == 2)
+    # The other files ran while the slow open was still blocked
+    assert(elapsed < 0.4)
+    time.sleep(0.5)
+
+
+def test_scan_files_async_uses_cache_and_index_coords(tmp_path):
+    objects = {f"s3://bucket/{i}.nc": pickle.dumps(make_dataset(i * 4, 4)) for i in range(3)}
+    store = FakeObjectStore(objects)
+    cache = MetadataCache(tmp_path / 'cache')
+
+    def scan():
+        return asyncio.run(scan_files_async(
+            list(objects), concat_dim='time', fs=store, open_dataset=unpickle_dataset, cache=cache, index_coords=True
+        ))
+
+    first = scan()
+    assert(store.opened == 3)
+    assert(first.catalog.meta.coord_indexes['time'].size == 12)
+    second = scan()
+    assert(store.opened == 3)
+    assert(second.catalog.meta == first.catalog.meta)
+
+    # A rewritten object has a new ETag and is read again
+    objects['s3://bucket/2.nc'] = pickle.dumps(make_dataset(8, 5))
+    third = scan()
+    assert(store.opened == 4)
+    assert(third.catalog.offsets[-1] == 13)
+
+
+def test_scan_files_async_explains_missing_h5netcdf(monkeypatch):
+    pytest.importorskip('h5py')
+    buffer = io.BytesIO()
+    make_dataset(0, 4).to_netcdf(buffer, engine='h5netcdf' if importlib.util.find_spec('h5netcdf') else 'scipy')
+    if not buffer.getvalue().startswith(b'\x89HDF'):
+        pytest.skip("needs h5netcdf to write a NetCDF4 test object")
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, 'find_spec', lambda name, *args: None if name == 'h5netcdf' else find_spec(name, *args))
+
+    result = asyncio.run(scan_files_async(['s3://bucket/a.nc'], fs=FakeObjectStore({'s3://bucket/a.nc': buffer.getvalue()})))
+    assert(isinstance(result.errors['s3://bucket/a.nc'], ImportError))
+    assert('h5netcdf' in str(result.errors['s3://bucket/a.nc']))
+
+
+def test_scan_files_async_over_http(tmp_path):
+    pytest.importorskip('fsspec')
+    pytest.importorskip('aiohttp')
+    pytest.importorskip('scipy')
+    for i in range(3):
+        make_dataset(i * 5, 5).to_netcdf(tmp_path / f"{i}.nc", engine='scipy')
+
+    server, base = serve(tmp_path)
+    try:
+        urls = [f"{base}/{i}.nc" for i in (2, 0, 1)] + [f"{base}/missing.nc"]
+        result = asyncio.run(scan_files_async(urls, concat_dim='time', concurrency=2))
+    finally:
+        server.shutdown()
+
+    assert(list(result.errors) == [f"{base}/missing.nc"])
+    assert(result.catalog.sources == [f"{base}/{i}.nc" for i in range(3)])
+    assert(result.catalog.meta.array_meta['pr'].shape == (15, 6, 8))
+
+
+def test_scan_files_async_reads_netcdf4_headers_over_http(tmp_path):
+    pytest.importorskip('fsspec')
+    pytest.importorskip('aiohttp')
+    pytest.importorskip('h5netcdf')
+    for i in range(2):
+        ds = make_dataset(i * 500, 500, lat_size=90, lon_size=180)
+        ds.to_netcdf(tmp_path / f"{i}.nc", engine='h5netcdf', encoding={'pr': {'chunksizes': (10, 90, 180)}})
+    file_size = os.path.getsize(tmp_path / '0.nc')
+
+    server, base = serve(tmp_path)
+    stats = instrument.StatsSink()
+    try:
+        with instrument.use_sink(stats):
+            result = asyncio.run(scan_files_async(
+                [f"{base}/{i}.nc" for i in range(2)], concat_dim='time', block_size=64 * 1024
+            ))
+    finally:
+        server.shutdown()
+
+    assert(result.ok)
+    assert(result.catalog.meta.array_meta['pr'].shape == (1000, 90, 180))
+    # Only header and coordinate blocks are fetched, not the data chunks
+    assert(stats.counters['aio.bytes_fetched'] < file_size / 4)
@@ -0,0 +1,115 @@
+import os
+
+from ndmeta import MetadataCache, NDimMeta
+from ndmeta.scan import scan_files
+from tests.helpers import make_dataset
+
+
+def write_source(tmp_path, name, content=b'data'):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_cache_hits_and_invalidates(tmp_path):
+    cache = MetadataCache(tmp_path / 'cache')
+    source = write_source(tmp_path, 'a.nc')
+    calls = []
+
+    def extract(path):
+        calls.append(path)
+        return NDimMeta.from_xarray(make_dataset(0, 4))
+
+    meta = cache.get_or_extract(source, extract)
+    assert(cache.get_or_extract(source, extract) == meta)
+    assert(MetadataCache(tmp_path / 'cache').get(source) == meta)
+    assert(len(calls) == 1)
+
+    write_source(tmp_path, 'a.nc', b'changed contents')
+    assert(cache.get(source) is None)
+    cache.get_or_extract(source, extract)
+    assert(len(calls) == 2)
+
+
+def test_content_hash_key(tmp_path):
+    source = write_source(tmp_path, 'a.nc', b'one')
+    cache = MetadataCache(tmp_path / 'cache', hash_content=True)
+    key = cache.key(source)
+    stat = os.stat(source)
+    write_source(tmp_path, 'a.nc', b'two')
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert(cache.key(source) != key)
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = MetadataCache(tmp_path / 'cache', max_entries=2, memory_entries=0)
+    meta = NDimMeta.from_xarray(make_dataset(0, 4))
+    sources = [write_source(tmp_path, f'{name}.nc') for name in 'abc']
+
+    cache.put(sources[0], meta)
+    cache.put(sources[1], meta)
+    os.utime(cache._entry_path(cache.key(sources[0])), ns=(1, 1))
+    os.utime(cache._entry_path(cache.key(sources[1])), ns=(2, 2))
+    assert(cache.get(sources[0]) == meta)
+    cache.put(sources[2], meta)
+
+    assert(cache.get(sources[0]) == meta)
+    assert(cache.get(sources[1]) is None)
+    assert(cache.get(sources[2]) == meta)
+
+
+def test_cache_put_scans_directory_rarely(tmp_path):
+    cache = MetadataCache(tmp_path / 'cache', max_entries=50, memory_entries=0)
+    meta = NDimMeta.from_xarray(make_dataset(0, 4))
+    scans = []
+    entries = cache._entries
+    cache._entries = lambda: scans.append(1) or entries()
+
+    for i in range(200):
+        cache.put(write_source(tmp_path, f'{i}.nc'), meta)
+        assert(len(entries()) <= 50)
+
+    # One initial scan, then at most one per tenth of the limit in writes
+    assert(len(scans) <= 1 + 200 // 5)
+    assert(len(entries()) >= 45)
+
+
+def test_cache_keys_entries_by_index_coords(tmp_path):
+    cache = MetadataCache(tmp_path / 'cache')
+    source = str(tmp_path / 'a.nc')
+    make_dataset(0, 4).to_netcdf(source, engine='scipy')
+
+    plain = scan_files([source], cache=cache).metas[0]
+    indexed = scan_files([source], cache=cache, index_coords=True).metas[0]
+    assert(plain.coord_indexes is None)
+    assert(indexed.coord_indexes is not None and 'time' in indexed.coord_indexes)
+    assert(cache.get(source).coord_indexes is None)
+    assert(cache.get(source, index_coords=True).coord_indexes is not None)
+
+
+def test_cache_memory_hits_refresh_disk_lru(tmp_path):
+    cache = MetadataCache(tmp_path / 'cache', max_entries=2)
+    meta = NDimMeta.from_xarray(make_dataset(0, 4))
+    sources = [write_source(tmp_path, f'{name}.nc') for name in 'abc']
+
+    cache.put(sources[0], meta)
+    cache.put(sources[1], meta)
+    os.utime(cache._entry_path(cache.key(sources[0])), ns=(1, 1))
+    os.utime(cache._entry_path(cache.key(sources[1])), ns=(2, 2))
+    # Served from memory, but still marks the disk entry as recently used
+    assert(cache.get(sources[0]) is meta)
+    cache.put(sources[2], meta)
+
+    assert(os.path.exists(cache._entry_path(cache.key(sources[0]))))
+    assert(not os.path.exists(cache._entry_path(cache.key(sources[1]))))
+
+
+def test_cache_discards_partial_entries(tmp_path):
+    cache = MetadataCache(tmp_path / 'cache', memory_entries=0)
+    source = write_source(tmp_path, 'a.nc')
+    for content in ['{"version": 1}', '{"version": 1, "concat_dim": null, "array_meta": [["pr", {}]]}', '{"version": 1, "conc']:
+        entry_path = cache._entry_path(cache.key(source))
+        with open(entry_path, 'w') as f:
+            f.write(content)
+        assert(cache.get(source) is None)
+        assert(not os.path.exists(entry_path))
@@ -0,0 +1,81 @@
+import pytest
+
+from ndmeta import Catalog, NDimMeta
+from tests.helpers import make_dataset, make_metas
+
+
+def test_catalog_sorts_and_indexes_uneven_files():
+    metas = make_metas([5, 7, 3])
+    catalog = Catalog.from_metas([metas[2], metas[0], metas[1]], 'time', sources=['c.nc', 'a.nc', 'b.nc'])
+
+    assert(catalog.sources == ['a.nc', 'b.nc', 'c.nc'])
+    assert(catalog.offsets.tolist() == [0, 5, 12, 15])
+    assert(catalog.meta.array_meta['pr'].shape == (15, 6, 8))
+    assert(catalog.meta.array_meta['time'].dimension_ranges['time'] == (0, 14))
+    assert(catalog.meta == metas[0].merge_with(metas[1], 'time').merge_with(metas[2], 'time'))
+    assert(catalog.locate([0, 4, 5, 14]).tolist() == [0, 0, 1, 2])
+
+
+def test_catalog_coverage_and_chunk_sources():
+    catalog = Catalog.from_metas(make_metas([5, 7, 3]), 'time', sources=['a.nc', 'b.nc', 'c.nc'])
+    chunk_sizes = {'time': 4, 'lat': 6, 'lon': 8}
+
+    covered = catalog.chunk_coverage(1, chunk_sizes)
+    assert([s['time'] for v, s in covered['full_coverage'] if v == 'pr'] == [slice(3, 7)])
+    assert([s['time'] for v, s in covered['partial_coverage'] if v == 'pr'] == [slice(0, 3)])
+
+    pieces = catalog.chunk_sources('pr', {'time': slice(4, 8), 'lat': slice(0, 6), 'lon': slice(0, 8)})
+    assert([(source, local['time']) for _, source, local in pieces] == [('a.nc', slice(4, 5)), ('b.nc', slice(0, 3))])
+    pieces = catalog.chunk_sources('pr', {'time': slice(8, 15), 'lat': slice(0, 6), 'lon': slice(0, 8)})
+    assert([(source, local['time']) for _, source, local in pieces] == [('b.nc', slice(3, 7)), ('c.nc', slice(0, 3))])
+    assert(catalog.chunk_sources('lat', {'lat': slice(0, 6)}) == [(0, 'a.nc', {'lat': slice(0, 6)})])
+
+
+def test_catalog_rejects_gaps_and_overlaps():
+    with pytest.raises(ValueError, match="Gap"):
+        Catalog.from_metas(make_metas([5]) + make_metas([5], start=7), 'time')
+    with pytest.raises(ValueError, match="overlap"):
+        Catalog.from_metas(make_metas([5]) + make_metas([5], start=3), 'time')
+
+
+def test_catalog_append_matches_full_rebuild():
+    metas = make_metas([5, 7, 3, 4, 6])
+    sources = ['a.nc', 'b.nc', 'c.nc', 'd.nc', 'e.nc']
+    catalog = Catalog.from_metas(metas[:3], 'time', sources=sources[:3])
+    previous_length = int(catalog.offsets[-1])
+
+    appended = catalog.append([metas[4], metas[3]], sources=[sources[4], sources[3]])
+    rebuilt = Catalog.from_metas(metas, 'time', sources=sources)
+    assert(appended.meta == rebuilt.meta)
+    assert(appended.sources == rebuilt.sources)
+    assert(appended.offsets.tolist() == rebuilt.offsets.tolist())
+    assert(catalog.offsets.tolist() == [0, 5, 12, 15])
+
+    changed = appended.appended_chunks({'time': 4, 'lat': 3}, previous_length)
+    assert(set(changed) == {'pr', 'time'})
+    # Chunk [12, 16) was partial before the append; [16, 20), [20, 24) and [24, 25) are new
+    assert([slices['time'] for slices in changed['time']] == [slice(12, 16), slice(16, 20), slice(20, 24), slice(24, 25)])
+    assert(len(changed['pr']) == 4 * 2)
+
+
+def test_catalog_append_checks_step_of_last_file():
+    def meta_for(times):
+        ds = make_dataset(0, len(times)).assign_coords(time=times)
+        return NDimMeta.from_xarray(ds)
+
+    # Hourly then every 100 hours: the archive-wide average step is ~9
+    catalog = Catalog.from_metas([meta_for(list(range(100))), meta_for(list(range(100, 1001, 100)))], 'time')
+    appended = catalog.append([meta_for([1100, 1200])])
+    assert(appended.offsets.tolist() == [0, 100, 110, 112])
+    assert(appended.last_range == (1100, 1200))
+    with pytest.raises(ValueError, match="Gap"):
+        catalog.append([meta_for([1300, 1400])])
+
+
+def test_catalog_append_rejects_discontinuous_files():
+    metas = make_metas([5, 7])
+    catalog = Catalog.from_metas(metas[:1], 'time')
+    with pytest.raises(ValueError, match="overlap"):
+        catalog.append(make_metas([3], start=2))
+    with pytest.raises(ValueError, match="Gap"):
+        catalog.append(make_metas([3], start=9))
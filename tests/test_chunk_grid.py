@@ -0,0 +1,64 @@
+from itertools import product
+
+import numpy as np
+import pytest
+
+from ndmeta import ChunkGrid
+
+
+def reference_chunks(dims, shape, chunk_shape):
+    per_dim = [
+        [slice(start, min(start + chunk, size)) for start in range(0, size, chunk)]
+        for size, chunk in zip(shape, chunk_shape)
+    ]
+    return [dict(zip(dims, combination)) for combination in product(*per_dim)]
+
+
+def test_grid_matches_cartesian_product():
+    grid = ChunkGrid.from_shape(('time', 'lat', 'lon'), (25, 7, 9), {'time': 10, 'lat': 3})
+    expected = reference_chunks(grid.dims, grid.shape, (10, 3, 9))
+    assert(len(grid) == len(expected) == 9)
+    assert(list(grid) == expected)
+    assert(grid[-1] == expected[-1])
+    assert(grid[(2, 1, 0)] == expected[grid.linear_index((2, 1, 0))])
+    with pytest.raises(IndexError):
+        grid[len(grid)]
+
+
+def test_subgrid_and_shards():
+    grid = ChunkGrid.from_shape(('time', 'lat'), (100, 10), {'time': 10, 'lat': 5})
+    sub = grid[5:, 1]
+    assert(len(sub) == 5)
+    assert(sub[0] == {'time': slice(50, 60), 'lat': slice(5, 10)})
+    assert(list(sub) == [grid[(t, 1)] for t in range(5, 10)])
+
+    shards = [grid.shard(i, 3) for i in range(3)]
+    assert([len(s) for s in shards] == [7, 7, 6])
+    assert(sum((list(s) for s in shards), []) == list(range(len(grid))))
+
+
+def test_chunk_ids_for_selection():
+    grid = ChunkGrid.from_shape(('time', 'lat'), (100, 10), {'time': 10, 'lat': 5})
+    ids = grid.chunk_ids({'time': slice(15, 31), 'lat': 7})
+    assert(ids.tolist() == [grid.linear_index((t, 1)) for t in (1, 2, 3)])
+    assert(grid.chunk_ids({'time': [0, 99, -1]}).tolist() == [0, 1, 18, 19])
+    assert(grid.chunk_ids({'time': slice(5, 5)}).tolist() == [])
+
+    sub = grid[2:4, :]
+    assert(sub.chunk_ids({'time': slice(0, 100)}).tolist() == list(range(len(sub))))
+    assert(np.array_equal(sub.edges('time')[0], [20, 30]))
+
+
+def test_grid_rejects_bad_chunk_sizes_and_selections():
+    with pytest.raises(ValueError, match="must be positive"):
+        ChunkGrid.from_shape(('time', 'lat'), (100, 10), {'time': 0})
+    empty = ChunkGrid.from_shape(('time', 'lat'), (0, 10), {})
+    assert(empty.chunk_shape == (1, 10) and len(empty) == 0)
+
+    grid = ChunkGrid.from_shape(('time', 'lat'), (100, 10), {'time': 10, 'lat': 5})
+    with pytest.raises(ValueError, match="not found"):
+        grid.chunk_ids({'level': 0})
+    with pytest.raises(ValueError, match="out of range"):
+        grid.chunk_ids({'time': [5, 100]})
+    with pytest.raises(ValueError, match="out of range"):
+        grid.chunk_ids({'lat': -11})
@@ -0,0 +1,76 @@
+import copy
+import dataclasses
+import pickle
+
+import numpy as np
+import pytest
+
+from ndmeta import AttributePool, Catalog, CompactArrayMeta
+from tests.helpers import make_metas
+
+
+def test_compact_round_trip_and_equality():
+    meta = make_metas([5])[0]
+    pool = AttributePool()
+    compact = meta.compact(pool)
+
+    for var_name, array_meta in meta.array_meta.items():
+        compact_meta = compact.array_meta[var_name]
+        assert(compact_meta.shape == array_meta.shape)
+        assert(compact_meta.chunk_grid == array_meta.chunk_grid)
+        assert(compact_meta.dimension_ranges == array_meta.dimension_ranges)
+        assert(compact_meta == array_meta)
+        assert(compact_meta.to_array_meta() == array_meta)
+    assert(compact.array_meta['pr'].geometry.dtype == np.uint8)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        compact.array_meta['pr'].is_data_var = False
+    with pytest.raises(AttributeError):
+        compact.array_meta['pr'].__dict__
+
+
+def test_attributes_are_shared_across_files():
+    pool = AttributePool()
+    metas = [meta.compact(pool) for meta in make_metas([5, 7, 3])]
+    assert(metas[0].array_meta['pr'].attributes is metas[2].array_meta['pr'].attributes)
+    assert(metas[0].array_meta['lat'].ranges[0] is metas[1].array_meta['lat'].ranges[0])
+
+
+def test_compact_catalog_matches_plain():
+    plain = make_metas([5, 7, 3])
+    pool = AttributePool()
+    compact = [meta.compact(pool) for meta in plain]
+    plain_catalog = Catalog.from_metas(plain, 'time')
+    compact_catalog = Catalog.from_metas(compact, 'time')
+
+    assert(isinstance(compact_catalog.meta.array_meta['pr'], CompactArrayMeta))
+    assert(compact_catalog.meta.array_meta['pr'].attributes is compact[0].array_meta['pr'].attributes)
+    for var_name, array_meta in plain_catalog.meta.array_meta.items():
+        assert(compact_catalog.meta.array_meta[var_name] == array_meta)
+    assert(compact_catalog.chunk_coverage(1, {'time': 4}) == plain_catalog.chunk_coverage(1, {'time': 4}))
+
+
+def test_compact_metadata_pickles_and_copies():
+    meta = make_metas([5])[0].compact()
+    for restored in [pickle.loads(pickle.dumps(meta)), copy.deepcopy(meta)]:
+        assert(restored == meta)
+        assert(restored.array_meta['pr'] == meta.array_meta['pr'])
+    with pytest.raises(TypeError):
+        meta.array_meta['pr'].attributes['units'] = 'K'
+
+
+def test_pool_keeps_keys_of_different_types_apart():
+    pool = AttributePool()
+    assert(pool.attributes({1: 'a'}) is not pool.attributes({True: 'a'}))
+    assert(list(pool.attributes({True: 'a'})) == [True])
+
+
+def test_concat_mixed_compact_and_plain_metas():
+    plain = make_metas([5, 7, 3])
+    compact = [meta.compact() for meta in plain]
+    expected = Catalog.from_metas(plain, 'time').meta
+
+    for metas in ([compact[0], plain[1], plain[2]], [plain[0], compact[1], compact[2]]):
+        merged = Catalog.from_metas(metas, 'time').meta
+        assert(type(merged.array_meta['pr']) is type(metas[0].array_meta['pr']))
+        for name, array_meta in expected.array_meta.items():
+            assert(merged.array_meta[name] == array_meta)
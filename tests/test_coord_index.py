@@ -0,0 +1,99 @@
+import datetime
+import pickle
+
+import cftime
+import numpy as np
+import pandas as pd
+import pytest
+
+from ndmeta import Catalog, NDimMeta, RegularIndex, SortedIndex
+from ndmeta import coord_index
+from ndmeta.serialize import dumps, loads
+from tests.helpers import make_dataset
+
+
+def test_regular_index_lookups():
+    index = coord_index.from_values(np.linspace(-90, 90, 181))
+    assert(isinstance(index, RegularIndex))
+    assert(index.get_indexer([-90, 0.2, 89.6, 90.4, 91]).tolist() == [0, 90, 180, 180, -1])
+    assert(index.slice_indexer(10, -10.5) == slice(80, 101))
+    assert(index.slice_indexer(100, 120) == slice(0, 0))
+
+    descending = coord_index.from_values(np.arange(10.0, 0.0, -1.0))
+    assert(descending.descending)
+    assert(descending.get_indexer([10, 1.2]).tolist() == [0, 9])
+    assert(descending.slice_indexer(3, 7) == slice(3, 8))
+
+
+def test_sorted_index_lookups():
+    values = np.array([1.0, 2.0, 4.0, 8.0, 16.0])
+    index = coord_index.from_values(values)
+    assert(isinstance(index, SortedIndex))
+    assert(index.get_indexer([0.5, 1.4, 3.1, 16.0, 17]).tolist() == [-1, 0, 2, 4, -1])
+    assert(index.slice_indexer(2, 9) == slice(1, 4))
+
+    descending = coord_index.from_values(values[::-1])
+    assert(descending.get_indexer([16.0, 3.1]).tolist() == [0, 2])
+    assert(descending.slice_indexer(9, 2) == slice(1, 4))
+
+    with pytest.raises(ValueError):
+        coord_index.from_values(np.array([1.0, 3.0, 2.0]))
+
+
+def test_datetime_and_cftime_indexes():
+    monthly = coord_index.from_values(pd.date_range('1850-01-01', periods=36, freq='MS').values)
+    assert(isinstance(monthly, SortedIndex))
+    assert(monthly.slice_indexer('1850-03', '1851-07') == slice(2, 19))
+
+    start = cftime.DatetimeNoLeap(1850, 1, 1)
+    daily = coord_index.from_values(np.array([start + datetime.timedelta(days=i) for i in range(730)]))
+    assert(isinstance(daily, RegularIndex) and daily.codec.calendar == 'noleap')
+    assert(daily.slice_indexer('1850-03', '1850-03-31') == slice(59, 90))
+    assert(daily.get_indexer([cftime.DatetimeNoLeap(1851, 1, 1)]).tolist() == [365])
+
+
+def test_concat_indexes_stays_regular():
+    indexes = [coord_index.from_values(np.arange(start, start + 5)) for start in range(0, 50, 5)]
+    merged = coord_index.concat_indexes(indexes)
+    assert(merged == RegularIndex(0.0, 1.0, 50, indexes[0].codec))
+
+    irregular = coord_index.concat_indexes(indexes[:2] + [coord_index.from_values(np.array([11.0, 15.0, 16.0]))])
+    assert(isinstance(irregular, SortedIndex))
+    assert(irregular.encoded_values().tolist() == list(range(10)) + [11, 15, 16])
+
+
+def test_concat_indexes_extends_sorted_index_in_place():
+    base = coord_index.from_values(np.array([10.0, 8.0, 5.0, 1.0]))
+    first = coord_index.concat_indexes([base, coord_index.from_values(np.array([0.0, -2.0]))])
+    second = coord_index.concat_indexes([first, coord_index.from_values(np.array([-3.0]))])
+    assert(second.encoded_values().tolist() == [10, 8, 5, 1, 0, -2, -3])
+    # The second append wrote into the first one's spare capacity
+    assert(np.shares_memory(first.keys, second.keys))
+
+    # Extending an older index again must not clobber the newer one
+    branch = coord_index.concat_indexes([first, coord_index.from_values(np.array([-5.0]))])
+    assert(branch.encoded_values().tolist() == [10, 8, 5, 1, 0, -2, -5])
+    assert(second.encoded_values().tolist() == [10, 8, 5, 1, 0, -2, -3])
+    assert(pickle.loads(pickle.dumps(second)) == second)
+
+    with pytest.raises(ValueError, match="strictly monotonic"):
+        coord_index.concat_indexes([second, coord_index.from_values(np.array([-3.0]))])
+
+
+def test_catalog_bounding_box_query():
+    metas = [NDimMeta.from_xarray(make_dataset(start, 5), index_coords=True) for start in (0, 5, 10)]
+    catalog = Catalog.from_metas(metas, 'time', sources=['a.nc', 'b.nc', 'c.nc'])
+    assert(isinstance(catalog.meta.coord_indexes['time'], RegularIndex))
+    assert(len(catalog.meta.coord_indexes['time']) == 15)
+
+    pieces = catalog.select_sources('pr', {'time': (3, 7), 'lat': (-30, 30)})
+    assert([(source, local['time']) for _, source, local in pieces] == [('a.nc', slice(3, 5)), ('b.nc', slice(0, 3))])
+    assert(pieces[0][2]['lat'] == slice(2, 4))
+
+    touched = catalog.select_chunks('pr', {'time': (3, 7), 'lon': (0, 40)}, {'time': 4, 'lat': 3, 'lon': 4})
+    assert([coords for coords, _ in touched] == [(0, 0, 0), (0, 1, 0), (1, 0, 0), (1, 1, 0)])
+    assert([source for _, source, _ in touched[2][1]] == ['a.nc', 'b.nc'])
+
+    with pytest.raises(ValueError):
+        NDimMeta.from_xarray(make_dataset(0, 5)).index_selection({'time': (0, 1)})
+    assert(loads(dumps(catalog.meta)) == catalog.meta)
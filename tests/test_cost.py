@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+import xarray as xr
+
+from ndmeta import NDimMeta
+from ndmeta.cost import QueryPattern, estimate_query_cost, summarize_costs
+
+
+def make_dataset(time_size, lat_size=6, lon_size=8):
+    return xr.Dataset(
+        {'pr': (('time', 'lat', 'lon'), np.zeros((time_size, lat_size, lon_size), dtype='float32'))},
+        coords={'time': np.arange(time_size), 'lat': np.arange(lat_size), 'lon': np.arange(lon_size)},
+    )
+
+
+def test_query_cost_counts_clipped_chunks():
+    meta = NDimMeta.from_xarray(make_dataset(10))
+    chunk_sizes = {'time': 4, 'lat': 3, 'lon': 8}
+
+    point = estimate_query_cost(meta, chunk_sizes, QueryPattern('point', {'lat': 4, 'lon': 1}), 'pr')
+    assert(point.chunks_touched == 3)
+    assert(point.bytes_read == 10 * 3 * 8 * 4)
+    assert(point.bytes_requested == 10 * 4)
+    assert(point.read_amplification == 24)
+
+    box = QueryPattern('box', {'time': slice(3, 9), 'lat': [0, 5], 'lon': slice(0, 2)})
+    cost = estimate_query_cost(meta, chunk_sizes, box, 'pr')
+    grid = meta.chunk_grid('pr', chunk_sizes)
+    assert(cost.chunks_touched == len(grid.chunk_ids(box.selection)) == 6)
+    assert(cost.bytes_read == 10 * 6 * 8 * 4)
+
+
+def test_estimate_access_costs_over_data_vars():
+    ds = make_dataset(10)
+    ds['tas'] = ds['pr'].astype('float64')
+    meta = NDimMeta.from_xarray(ds)
+    queries = [QueryPattern('map', {'time': 0}), QueryPattern('series', {'lat': 0, 'lon': 0})]
+    costs = meta.estimate_access_costs({'time': 5}, queries)
+
+    assert([(c.query, c.var_name) for c in costs] == [('map', 'pr'), ('map', 'tas'), ('series', 'pr'), ('series', 'tas')])
+    totals = summarize_costs(costs)
+    assert(totals['map'].bytes_read == 5 * 6 * 8 * (4 + 8))
+    assert(totals['series'].read_amplification == pytest.approx(48))
+
+
+def test_query_cost_wraps_negative_and_rejects_out_of_range_indices():
+    meta = NDimMeta.from_xarray(make_dataset(10))
+    chunk_sizes = {'time': 4, 'lat': 3}
+    last = estimate_query_cost(meta, chunk_sizes, QueryPattern('last', {'time': -1, 'lat': [-1, 0]}), 'pr')
+    assert(last == estimate_query_cost(meta, chunk_sizes, QueryPattern('last', {'time': 9, 'lat': [5, 0]}), 'pr'))
+    with pytest.raises(ValueError, match="out of range for 'lat'"):
+        estimate_query_cost(meta, chunk_sizes, QueryPattern('bad', {'lat': 6}), 'pr')
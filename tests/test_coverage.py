@@ -0,0 +1,85 @@
+from itertools import product
+
+import pytest
+
+from ndmeta import NDimMeta
+from ndmeta.coverage import compute_coverage
+from tests.helpers import make_dataset
+
+
+def reference_coverage(dims, shape, chunk_sizes, bounds):
+    full, partial = [], []
+    per_dim = []
+    for dim, size in zip(dims, shape):
+        chunk_size = chunk_sizes.get(dim, size)
+        per_dim.append([(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)])
+    for combination in product(*per_dim):
+        slices = {}
+        is_full = True
+        for dim, (start, stop) in zip(dims, combination):
+            if dim in bounds:
+                file_start, file_stop = bounds[dim]
+                lo, hi = max(start, file_start), min(stop, file_stop)
+                if lo >= hi:
+                    break
+                is_full = is_full and lo == start and hi == stop
+                slices[dim] = slice(lo - file_start, hi - file_start)
+            else:
+                slices[dim] = slice(start, stop)
+        else:
+            (full if is_full else partial).append(slices)
+    return full, partial
+
+
+def test_compute_coverage_matches_reference():
+    dims = ('time', 'lat', 'lon')
+    shape = (23, 7, 9)
+    chunk_sizes = {'time': 5, 'lat': 3, 'lon': 4}
+    for bounds in [{'time': (0, 12)}, {'time': (12, 23)}, {'time': (7, 8)}, {'time': (5, 10), 'lat': (3, 7)}]:
+        table = compute_coverage('pr', dims, shape, chunk_sizes, bounds)
+        expected_full, expected_partial = reference_coverage(dims, shape, chunk_sizes, bounds)
+        assert([s for _, s in table.iter_full()] == expected_full)
+        assert([s for _, s in table.iter_partial()] == expected_partial)
+
+
+def test_chunk_coverage_dict_and_compact():
+    meta1 = NDimMeta.from_xarray(make_dataset(0, 10))
+    meta2 = NDimMeta.from_xarray(make_dataset(10, 10))
+    merged = meta1.merge_with(meta2, concat_dim='time')
+    chunk_sizes = {'time': 4, 'lat': 3, 'lon': 4}
+
+    ds = make_dataset(10, 10)
+    covered = merged.chunk_coverage(ds, chunk_sizes, 1, file_start=10)
+    assert(('pr', {'time': slice(0, 2), 'lat': slice(0, 3), 'lon': slice(0, 4)}) in covered['partial_coverage'])
+    assert(('pr', {'time': slice(2, 6), 'lat': slice(3, 6), 'lon': slice(4, 8)}) in covered['full_coverage'])
+    assert(('time', {'time': slice(6, 10)}) in covered['full_coverage'])
+    assert(('lat', {'lat': slice(0, 3)}) in covered['full_coverage'])
+
+    compact = merged.chunk_coverage(ds, chunk_sizes, 1, compact=True, file_start=10)
+    assert(compact['pr'].chunk_coords.shape == (3 * 2 * 2, 3))
+    assert(compact['pr'].full.sum() == 2 * 2 * 2)
+    assert(list(compact['pr'].iter_partial()) == [c for c in covered['partial_coverage'] if c[0] == 'pr'])
+
+
+def test_chunk_coverage_of_unequal_files():
+    datasets = [make_dataset(0, 7), make_dataset(7, 10)]
+    merged = NDimMeta.concat([NDimMeta.from_xarray(ds, index_coords=True) for ds in datasets], 'time')
+    chunk_sizes = {'time': 4, 'lat': 6, 'lon': 8}
+
+    covered = merged.chunk_coverage(datasets[1], chunk_sizes, 1)
+    # The file holds global [7, 17): it ends chunk [4, 8) and fills [8, 12) and [12, 16)
+    assert(('time', {'time': slice(0, 1)}) in covered['partial_coverage'])
+    assert(('time', {'time': slice(1, 5)}) in covered['full_coverage'])
+    assert(('time', {'time': slice(5, 9)}) in covered['full_coverage'])
+    assert(covered == merged.chunk_coverage(datasets[1], chunk_sizes, file_start=7))
+
+    unindexed = NDimMeta.concat([NDimMeta.from_xarray(ds) for ds in datasets], 'time')
+    assert(unindexed.chunk_coverage(datasets[0], chunk_sizes, 0) == merged.chunk_coverage(datasets[0], chunk_sizes, 0))
+    with pytest.raises(ValueError, match="Catalog.chunk_coverage"):
+        unindexed.chunk_coverage(datasets[1], chunk_sizes, 1)
+
+
+def test_scalar_variable_is_fully_covered():
+    table = compute_coverage('crs', (), (), {}, {'time': (0, 10)})
+    assert(list(table.iter_full()) == [('crs', {})])
+    assert(list(table.iter_partial()) == [])
@@ -0,0 +1,96 @@
+import threading
+import time
+
+import numpy as np
+
+from ndmeta.executor import _count_file_tasks, _iter_file_tasks, stream_chunks
+from tests.helpers import FULL_PR, Opener, make_catalog
+
+
+def test_stream_chunks_stitches_across_files():
+    catalog = make_catalog(['0:5', '5:7', '12:5'])
+    chunk_sizes = {'time': 4, 'lat': 2, 'lon': 6}
+    opener = Opener()
+    results = list(stream_chunks(catalog, chunk_sizes, var_names=['pr', 'lat'], max_inflight_bytes=200, max_workers=2, open_dataset=opener))
+
+    pr_chunks = {(s['time'].start, s['lat'].start): data for v, s, data in results if v == 'pr'}
+    assert(len(pr_chunks) == len(catalog.meta.chunk_grid('pr', chunk_sizes)))
+    for var_name, slices, data in results:
+        if var_name == 'pr':
+            assert(np.array_equal(data, FULL_PR[slices['time'], slices['lat'], slices['lon']]))
+    assert([data.tolist() for v, _, data in results if v == 'lat'] == [[0.0, 1.0], [2.0, 3.0]])
+    assert(sorted(opener.opened) == ['0:5', '12:5', '5:7'])
+
+
+def test_stream_chunks_can_stop_early():
+    catalog = make_catalog(['0:5', '5:12'])
+    stream = stream_chunks(catalog, {'time': 5}, var_names=['pr'], open_dataset=Opener())
+    var_name, slices, data = next(stream)
+    stream.close()
+    assert(var_name == 'pr' and data.shape == (5, 4, 6))
+
+
+class SlowDataset:
+    """Dataset wrapper whose reads are slow and fail once it is closed."""
+
+    def __init__(self, ds, events):
+        self.ds = ds
+        self.events = events
+        self.closed = False
+
+    def __getitem__(self, name):
+        return SlowVariable(self, self.ds[name])
+
+    def close(self):
+        self.closed = True
+        self.events.append('close')
+
+
+class SlowVariable:
+    def __init__(self, owner, var):
+        self.owner = owner
+        self.var = var
+
+    def isel(self, indexers):
+        time.sleep(0.05)
+        if self.owner.closed:
+            self.owner.events.append('read after close')
+            raise ValueError("read from a closed dataset")
+        self.owner.events.append('read')
+        return self.var.isel(indexers)
+
+
+def test_stream_chunks_waits_for_running_reads_before_closing():
+    catalog = make_catalog(['0:17'])
+    events = []
+    lock = threading.Lock()
+    opener = Opener()
+
+    def open_slow(path):
+        with lock:
+            return SlowDataset(opener(path), events)
+
+    stream = stream_chunks(catalog, {'time': 1}, var_names=['pr'], max_workers=4, open_dataset=open_slow)
+    next(stream)
+    stream.close()
+    assert('read after close' not in events)
+    assert(events[-1] == 'close' and events.count('close') == 1)
+
+
+def test_file_tasks_are_lazy_and_match_coverage():
+    catalog = make_catalog(['0:5', '5:7', '12:5'])
+    chunk_sizes = {'time': 4, 'lat': 3}
+    var_names = ['pr', 'time', 'lat']
+    for position in range(len(catalog)):
+        tasks = _iter_file_tasks(catalog, position, chunk_sizes, var_names)
+        assert(not isinstance(tasks, list))
+        tasks = list(tasks)
+        assert(len(tasks) == _count_file_tasks(catalog, position, chunk_sizes, var_names))
+
+        tables = catalog.chunk_coverage(position, chunk_sizes, compact=True, var_names=var_names)
+        expected = [
+            (name, tuple(tables[name].chunk_coords[row].tolist()), tables[name].slices(row), bool(tables[name].full[row]))
+            for name in var_names if position == 0 or name != 'lat'
+            for row in range(len(tables[name]))
+        ]
+        assert([(t.var_name, t.chunk_coords, t.local_slices, t.full) for t in tasks] == expected)
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from ndmeta import NDimMeta
+from ndmeta.ndim_meta import ExtractionStats
+
+netCDF4 = pytest.importorskip('netCDF4')
+
+
+def write_file(path, time, pr_encoding=None):
+    ds = xr.Dataset(
+        {
+            'pr': (('time', 'lat', 'lon'), np.zeros((len(time), 4, 5), dtype='float32'), {'units': 'kg m-2 s-1'}),
+            'count': (('time', 'lat', 'lon'), np.ones((len(time), 4, 5), dtype='float64')),
+        },
+        coords={'time': time, 'lat': np.linspace(-60, 60, 4), 'lon': np.arange(5.0)},
+    )
+    ds['time_bnds'] = (('time', 'bnds'), np.stack([ds.time.values, ds.time.values], 1))
+    ds.time.attrs['bounds'] = 'time_bnds'
+    ds['label'] = ('lat', np.array(['a', 'bb', 'ccc', 'd'], dtype=object))
+    ds.to_netcdf(path, engine='netcdf4', encoding={
+        'time': {'units': 'days since 1850-01-01'},
+        'pr': pr_encoding or {'zlib': True, 'chunksizes': (2, 4, 5), '_FillValue': 1e20},
+        'count': {'dtype': 'int8', 'scale_factor': 0.5, 'add_offset': 1.0, '_FillValue': -1},
+    })
+    return path
+
+
+@pytest.mark.parametrize('engine', ['netcdf4', 'h5py'])
+@pytest.mark.parametrize('time', [
+    pd.date_range('2000-01-01', periods=6, freq='D'),
+    xr.date_range('1850-01-01', periods=6, freq='D', calendar='noleap', use_cftime=True),
+], ids=['standard', 'noleap'])
+def test_from_file_matches_from_xarray(tmp_path, engine, time):
+    if engine == 'h5py':
+        pytest.importorskip('h5py')
+    path = write_file(tmp_path / 'a.nc', time)
+    with xr.open_dataset(path) as ds:
+        expected = NDimMeta.from_xarray(ds)
+
+    stats = ExtractionStats()
+    meta = NDimMeta.from_file(path, engine=engine, stats=stats)
+    assert(meta == expected)
+    assert(meta.array_meta['count'].dtype == np.float64)
+    assert(not meta.array_meta['time'].is_data_var and meta.array_meta['time_bnds'].is_data_var)
+    assert(stats.coordinate_reads == 4)
+
+
+def test_from_file_storage_chunks_and_index(tmp_path):
+    path = write_file(tmp_path / 'a.nc', pd.date_range('2000-01-01', periods=6, freq='D'))
+    meta = NDimMeta.from_file(path, use_storage_chunks=True, index_coords=True)
+    assert(meta.array_meta['pr'].chunk_grid == (2, 4, 5))
+    assert(meta.array_meta['lat'].chunk_grid == (4,))
+    assert(meta.coord_indexes['time'].slice_indexer('2000-01-02', '2000-01-04') == slice(1, 4))
+
+
+def test_from_file_reads_only_coordinate_endpoints(tmp_path, monkeypatch):
+    from ndmeta import header
+    time = xr.date_range('1850-01-01', periods=1000, freq='D', calendar='noleap', use_cftime=True)
+    path = write_file(tmp_path / 'a.nc', time)
+    reads = []
+    getitem = header._HeaderArray._getitem
+
+    def record(self, key):
+        values = getitem(self, key)
+        reads.append((self.var.name, values.size))
+        return values
+
+    monkeypatch.setattr(header._HeaderArray, '_getitem', record)
+    meta = NDimMeta.from_file(path)
+    assert(meta.array_meta['pr'].dimension_ranges['time'][1] == time[-1])
+    # Endpoints plus at most ten object-size samples, never the whole axis
+    assert(('time', 2) in reads)
+    assert(max(size for name, size in reads if name in ('time', 'time_bnds')) <= 10)
+    assert(not any(name == 'pr' for name, _ in reads))
+
+
+def write_variety(path, calendar):
+    time = xr.date_range('1600-01-01', periods=4, freq='D', calendar=calendar, use_cftime=True)
+    ds = xr.Dataset(
+        {
+            'nan_fill': ('time', np.array([1.0, np.nan, 3.0, 4.0], dtype='float32')),
+            'int_fill': ('time', np.array([1, 2, -99, 4], dtype='int16')),
+            'missing': ('time', np.array([1.0, 2.0, 3.0, -1.0])),
+            'packed': ('time', np.array([0.5, 1.0, np.nan, 2.0])),
+            'unsigned': ('time', np.array([0, 200, 255, 1], dtype='uint8')),
+            'flag': ('time', np.array([True, False, True, True])),
+            'chars': (('time', 'nchar'), np.array([list(b'ab'), list(b'cd'), list(b'ef'), list(b'gh')], dtype='uint8').view('S1')),
+            'encoded': ('time', np.array(['é', 'b', 'cc', 'd'], dtype=object)),
+        },
+        coords={'time': time},
+    )
+    ds['missing'].attrs['missing_value'] = -1.0
+    ds.to_netcdf(path, engine='netcdf4', encoding={
+        'time': {'units': 'hours since 1600-01-01', 'calendar': calendar},
+        'nan_fill': {'_FillValue': np.nan},
+        'int_fill': {'_FillValue': -99},
+        'packed': {'dtype': 'int16', 'scale_factor': 0.5, 'add_offset': 10.0, '_FillValue': -32767},
+        'unsigned': {'_FillValue': 255},
+        'encoded': {'dtype': 'S1', '_Encoding': 'utf-8'},
+    })
+    return path
+
+
+@pytest.mark.parametrize('engine', ['netcdf4', 'h5py'])
+@pytest.mark.parametrize('calendar', ['standard', 'proleptic_gregorian', 'noleap', '360_day', 'julian'])
+def test_from_file_matches_from_xarray_across_encodings(tmp_path, engine, calendar):
+    if engine == 'h5py':
+        pytest.importorskip('h5py')
+    path = write_variety(tmp_path / 'a.nc', calendar)
+    with xr.open_dataset(path) as ds:
+        expected = NDimMeta.from_xarray(ds, index_coords=True)
+
+    meta = NDimMeta.from_file(path, engine=engine, index_coords=True)
+    assert(meta == expected)
+    assert(np.isnan(meta.array_meta['nan_fill'].fill_value))
+    assert(meta.array_meta['int_fill'].fill_value == -99)
+    assert(meta.array_meta['int_fill'].dtype == expected.array_meta['int_fill'].dtype)
+    assert(meta.coord_indexes['time'] == expected.coord_indexes['time'])
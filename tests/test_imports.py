@@ -0,0 +1,48 @@
+import subprocess
+import sys
+
+import pytest
+
+
+HEAVY_MODULES = ('xarray', 'pandas', 'cftime', 'objsize')
+
+CACHED_METADATA_SCRIPT = """
+import sys
+import numpy as np
+from ndmeta import ArrayMeta, NDimMeta
+from ndmeta.serialize import dumps, loads
+
+meta = NDimMeta(array_meta={'pr': ArrayMeta(
+    shape=(365, 96, 144), fill_value=np.nan, dtype=np.dtype('float32'), chunk_grid=(365, 96, 144),
+    attributes={'dimension_names': ['time', 'lat', 'lon']},
+    dimension_ranges={'lat': (-90.0, 90.0), 'lon': (0.0, 357.5)},
+    estimated_obj_size=4, is_data_var=True,
+)}, concat_dim=None)
+grid = loads(dumps(meta)).chunk_grid('pr', {'time': 100, 'lat': 96, 'lon': 144})
+assert grid.grid_shape == (4, 1, 1)
+print(' '.join(name for name in sys.argv[1:] if name in sys.modules))
+"""
+
+
+def loaded_modules(script):
+    result = subprocess.run([sys.executable, '-c', script, *HEAVY_MODULES], capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+@pytest.mark.parametrize('module', ['ndmeta', 'ndmeta.chunk_grid', 'ndmeta.serialize', 'ndmeta.catalog', 'ndmeta.schedule'])
+def test_import_does_not_load_heavy_dependencies(module):
+    script = f"import sys, {module}\nprint(' '.join(name for name in sys.argv[1:] if name in sys.modules))"
+    assert(loaded_modules(script) == [])
+
+
+def test_cached_metadata_path_does_not_load_xarray():
+    assert(loaded_modules(CACHED_METADATA_SCRIPT) == [])
+
+
+def test_public_names_resolve_lazily():
+    import ndmeta
+    for name in ndmeta.__all__:
+        assert(getattr(ndmeta, name).__name__ == name)
+    assert(set(ndmeta.__all__) <= set(dir(ndmeta)))
+    with pytest.raises(AttributeError):
+        ndmeta.missing_name
@@ -0,0 +1,91 @@
+from contextlib import contextmanager
+import threading
+
+from ndmeta import instrument
+from ndmeta.instrument import NullSink, ProfileSink, SpanSink, StatsSink
+from ndmeta.scan import scan_files
+from tests.helpers import open_synthetic
+
+
+def test_default_sink_is_a_no_op():
+    assert(isinstance(instrument.get_sink(), NullSink))
+    with instrument.timer('anything') as span:
+        instrument.count('anything')
+    assert(span is instrument.timer('other'))
+
+
+def test_stats_sink_counts_hot_paths():
+    with instrument.use_sink(StatsSink()) as sink:
+        result = scan_files(['0:10', '10:5'], concat_dim='time', max_workers=1, open_dataset=open_synthetic)
+        result.catalog.chunk_coverage(0, {'time': 4})
+    assert(isinstance(instrument.get_sink(), NullSink))
+
+    snapshot = sink.snapshot()
+    assert(snapshot['counters']['files.opened'] == 2)
+    assert(snapshot['counters']['coordinates.read'] == 6)
+    assert(snapshot['counters']['coverage.chunks_classified'] == 3 + 3 + 1 + 1)
+    assert(snapshot['timings']['scan.extract_metadata']['calls'] == 2)
+    assert(snapshot['timings']['metadata.coordinate_read']['total'] >= 0)
+
+
+def test_span_sink_nests_and_attributes_counts():
+    sink = SpanSink()
+    with instrument.use_sink(sink):
+        with instrument.timer('outer'):
+            instrument.count('items', 2)
+            with instrument.timer('inner'):
+                instrument.count('items')
+
+    inner, outer = sink.spans
+    assert(inner.parent is outer)
+    assert(outer.attributes == {'items': 2} and inner.attributes == {'items': 1})
+    assert(outer.duration >= inner.duration)
+
+
+def test_span_sink_forwards_to_tracer():
+    events = []
+
+    class FakeSpan:
+        def add_event(self, name, attributes):
+            events.append((name, attributes))
+
+    class FakeTracer:
+        @contextmanager
+        def start_as_current_span(self, name):
+            events.append(('start', name))
+            yield FakeSpan()
+
+    with instrument.use_sink(SpanSink(tracer=FakeTracer())):
+        with instrument.timer('scan'):
+            instrument.count('files.opened')
+    assert(events == [('start', 'scan'), ('files.opened', {'value': 1})])
+
+
+def test_profile_sink_captures_instrumented_blocks():
+    sink = ProfileSink()
+    with instrument.use_sink(sink):
+        scan_files(['0:4'], max_workers=1, executor='thread', open_dataset=open_synthetic)
+    stats = sink.stats()
+    assert(any(func[2] == 'from_xarray' for func in stats.stats))
+
+
+def test_profile_sink_spans_from_many_threads():
+    sink = ProfileSink()
+    barrier = threading.Barrier(8)
+
+    def work():
+        barrier.wait()
+        for _ in range(200):
+            with sink.span('outer'):
+                with sink.span('inner'):
+                    sum(range(100))
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert(sink._depth == 0)
+    assert(sink._thread is None)
+    assert(any('sum' in func[2] for func in sink.stats().stats))
@@ -0,0 +1,80 @@
+import json
+
+import numpy as np
+import pytest
+
+from ndmeta import Catalog
+from ndmeta.manifest import ChunkManifest, write_manifest, zarr_array_metadata
+from tests.helpers import make_metas
+
+
+def test_zarr_array_metadata():
+    catalog = Catalog.from_metas(make_metas([5, 7]), 'time')
+    document = zarr_array_metadata(catalog.meta.array_meta['pr'], {'time': 4, 'lat': 3})
+
+    assert(document['zarr_format'] == 3 and document['node_type'] == 'array')
+    assert(document['shape'] == [12, 6, 8])
+    assert(document['data_type'] == 'float32')
+    assert(document['chunk_grid']['configuration']['chunk_shape'] == [4, 3, 8])
+    assert(document['dimension_names'] == ['time', 'lat', 'lon'])
+    assert('dimension_names' not in document['attributes'])
+    json.dumps(document)
+
+
+def test_manifest_round_trip(tmp_path):
+    catalog = Catalog.from_metas(make_metas([5, 7, 3]), 'time', sources=['a.nc', 'b.nc', 'c.nc'])
+    chunk_sizes = {'time': 4, 'lat': 3}
+    written = write_manifest(catalog, tmp_path / 'store', chunk_sizes)
+    assert(written == ['pr', 'time', 'lat', 'lon'])
+
+    manifest = ChunkManifest(tmp_path / 'store')
+    assert(manifest.variables == ['lat', 'lon', 'pr', 'time'])
+    grid = catalog.meta.chunk_grid('pr', chunk_sizes)
+    for index in range(len(grid)):
+        coords = grid.coords(index)
+        expected = [(source, 'pr', local) for _, source, local in catalog.chunk_sources('pr', grid[index])]
+        assert(manifest.chunk_sources('pr', coords) == expected)
+    assert(manifest.chunk_sources('lat', (1,)) == [('a.nc', 'lat', {'lat': slice(3, 6)})])
+    assert(isinstance(manifest._variable('pr').chunk_id, np.memmap))
+
+
+def test_manifest_rejects_unsupported_dtype_when_explicit(tmp_path):
+    metas = make_metas([5])
+    metas[0].array_meta['time'].dtype = np.dtype('datetime64[ns]')
+    catalog = Catalog.from_metas(metas, 'time')
+    assert('time' not in write_manifest(catalog, tmp_path / 'a', {}))
+    with pytest.raises(ValueError):
+        write_manifest(catalog, tmp_path / 'b', {}, var_names=['time'])
+
+
+def test_manifest_rejects_unsafe_variable_names(tmp_path):
+    metas = make_metas([5])
+    metas[0].array_meta['../pr'] = metas[0].array_meta['pr']
+    catalog = Catalog.from_metas(metas, 'time')
+    assert('../pr' not in write_manifest(catalog, tmp_path / 'store', {}))
+    assert(not (tmp_path / 'pr').exists())
+    for name in ['../pr', 'a/b', '..', '__pr', '']:
+        with pytest.raises(ValueError, match="not a valid Zarr v3 node name"):
+            write_manifest(catalog, tmp_path / 'store', {}, var_names=[name])
+    with pytest.raises(ValueError, match="not a valid Zarr v3 node name"):
+        ChunkManifest(tmp_path / 'store').array_metadata('../store')
+
+
+def test_manifest_writes_strict_json_and_removes_stale_variables(tmp_path):
+    metas = make_metas([5])
+    metas[0].array_meta['pr'].attributes.update(valid_max=float('inf'), scale=[1.0, float('nan')])
+    catalog = Catalog.from_metas(metas, 'time')
+    write_manifest(catalog, tmp_path / 'store', {})
+
+    def reject(token):
+        raise ValueError(f"non-standard JSON token {token}")
+
+    with open(tmp_path / 'store' / 'pr' / 'zarr.json') as f:
+        attributes = json.load(f, parse_constant=reject)['attributes']
+    assert(attributes['valid_max'] == 'Infinity' and attributes['scale'] == [1.0, 'NaN'])
+
+    del catalog.meta.array_meta['lon']
+    write_manifest(catalog, tmp_path / 'store', {}, var_names=['pr'])
+    assert(ChunkManifest(tmp_path / 'store').variables == ['lat', 'pr', 'time'])
+    write_manifest(catalog, tmp_path / 'store', {})
+    assert(ChunkManifest(tmp_path / 'store').variables == ['lat', 'pr', 'time'])
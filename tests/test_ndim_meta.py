@@ -0,0 +1,53 @@
+import numpy as np
+
+from ndmeta import NDimMeta
+from ndmeta.ndim_meta import ExtractionStats
+from tests.helpers import make_dataset
+
+
+def test_from_xarray_reads_each_dimension_once():
+    ds = make_dataset(0, 10)
+    ds['tas'] = ds['pr'] + 1
+    ds['huss'] = ds['pr'] + 2
+    stats = ExtractionStats()
+    meta = NDimMeta.from_xarray(ds, stats=stats)
+
+    assert(stats.coordinate_reads == 3)
+    assert(stats.bytes_read == 2 * (ds['time'].dtype.itemsize + ds['lat'].dtype.itemsize + ds['lon'].dtype.itemsize))
+    assert(meta.array_meta['tas'].dimension_ranges == {'time': (0, 9), 'lat': (-90.0, 90.0), 'lon': (0.0, 315.0)})
+    assert(meta.array_meta['time'].dimension_ranges['time'] is meta.array_meta['pr'].dimension_ranges['time'])
+
+
+def test_from_xarray_samples_object_sizes():
+    ds = make_dataset(0, 30)
+    labels = np.empty(30, dtype=object)
+    labels[:] = ['x' * 40] * 30
+    ds['label'] = ('time', labels)
+    stats = ExtractionStats()
+    meta = NDimMeta.from_xarray(ds, stats=stats)
+
+    assert(stats.object_samples == 10)
+    assert(meta.array_meta['label'].estimated_obj_size > 40)
+
+
+def test_concat_weights_object_size_by_element_count():
+    metas = [NDimMeta.from_xarray(make_dataset(0, 30)), NDimMeta.from_xarray(make_dataset(30, 10))]
+    metas[0].array_meta['time'].estimated_obj_size = 10
+    metas[1].array_meta['time'].estimated_obj_size = 50
+    merged = NDimMeta.concat(metas, 'time')
+    assert(merged.array_meta['time'].estimated_obj_size == (30 * 10 + 10 * 50) / 40)
+    assert(merged.compact().array_meta['time'].estimated_obj_size == 20)
+    compact_merged = NDimMeta.concat([meta.compact() for meta in metas], 'time')
+    assert(compact_merged.array_meta['time'].estimated_obj_size == 20)
+
+
+def test_object_size_samples_single_elements_of_nd_variables():
+    ds = make_dataset(0, 30)
+    labels = np.empty((30, 6), dtype=object)
+    labels[:] = 'x' * 40
+    ds['label'] = (('time', 'lat'), labels)
+    stats = ExtractionStats()
+    meta = NDimMeta.from_xarray(ds, stats=stats)
+
+    assert(stats.object_samples == 10)
+    assert(40 < meta.array_meta['label'].estimated_obj_size < 200)
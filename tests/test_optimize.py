@@ -0,0 +1,66 @@
+import dataclasses
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from ndmeta import NDimMeta
+from ndmeta.optimize import candidate_sizes
+
+
+def make_meta(time_size=14600, lat_size=192, lon_size=288):
+    ds = xr.Dataset(
+        {'pr': (('time', 'lat', 'lon'), np.zeros((time_size, lat_size, lon_size), dtype='float32'))},
+        coords={'time': np.arange(time_size), 'lat': np.arange(lat_size), 'lon': np.arange(lon_size)},
+    )
+    return NDimMeta.from_xarray(ds)
+
+
+def test_candidate_sizes():
+    assert(candidate_sizes(12, 16).tolist() == [1, 2, 3, 4, 6, 8, 12])
+    thinned = candidate_sizes(10 ** 6, 16)
+    assert(len(thinned) <= 17 and thinned[-1] == 10 ** 6 and thinned[0] == 1)
+
+
+def test_optimize_chunks_respects_target_and_access_pattern():
+    meta = make_meta()
+    target = 8 * 1024 ** 2
+    time_series = meta.optimize_chunks(target, access_weights={'time': 1.0}, top=5)
+    maps = meta.optimize_chunks(target, access_weights={('lat', 'lon'): 1.0}, top=5)
+
+    assert(len(time_series) == 5)
+    assert([c.score for c in time_series] == sorted(c.score for c in time_series))
+    for candidate in time_series + maps:
+        assert(target / 4 <= candidate.chunk_bytes <= target * 4)
+    assert(time_series[0].chunk_sizes['time'] > maps[0].chunk_sizes['time'])
+    assert(maps[0].chunk_sizes['lat'] * maps[0].chunk_sizes['lon'] > time_series[0].chunk_sizes['lat'] * time_series[0].chunk_sizes['lon'])
+
+    best = time_series[0]
+    sizes = best.chunk_sizes
+    assert(best.num_chunks == -(-14600 // sizes['time']) * -(-192 // sizes['lat']) * -(-288 // sizes['lon']))
+    assert(best.chunk_bytes == 4 * sizes['time'] * sizes['lat'] * sizes['lon'])
+
+
+def test_optimize_chunks_with_fixed_dimension():
+    candidates = make_meta().optimize_chunks(1024 ** 2, fixed={'time': 1}, top=3)
+    assert(all(c.chunk_sizes['time'] == 1 for c in candidates))
+    assert(candidates[0].waste == 0.0)
+
+
+def test_optimize_chunks_rejects_bad_arguments():
+    meta = make_meta(time_size=100, lat_size=10, lon_size=10)
+    with pytest.raises(ValueError, match="must sum to a positive value"):
+        meta.optimize_chunks(1024 ** 2, access_weights={'time': 0.0})
+    with pytest.raises(ValueError, match="not found in data variables"):
+        meta.optimize_chunks(1024 ** 2, fixed={'height': 1})
+
+
+def test_optimize_chunks_handles_zero_sizes():
+    meta = make_meta(time_size=4, lat_size=10, lon_size=10)
+    meta.array_meta['pr'] = dataclasses.replace(meta.array_meta['pr'], shape=(0, 10, 10))
+    candidates = meta.optimize_chunks(1024, access_weights={'time': 1.0}, top=3)
+    assert(all(c.chunk_sizes['time'] == 1 and c.num_chunks == 0 and c.waste == 0.0 for c in candidates))
+    assert(all(np.isfinite(c.score) for c in candidates))
+
+    with pytest.raises(ValueError, match="must be positive"):
+        make_meta(time_size=100, lat_size=10, lon_size=10).optimize_chunks(1024, fixed={'time': 0})
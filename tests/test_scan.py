@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ndmeta import instrument
+from ndmeta.scan import _choose_executor, scan_files
+from tests.helpers import make_dataset, open_synthetic
+
+
+def test_scan_files_keeps_order_and_merges():
+    paths = ['10:5', '0:10', '15:3']
+    result = scan_files(paths, concat_dim='time', max_workers=3, open_dataset=open_synthetic)
+
+    assert(result.ok)
+    assert([meta.array_meta['time'].dimension_ranges['time'] for meta in result.metas] == [(10, 14), (0, 9), (15, 17)])
+    assert(result.catalog.sources == ['0:10', '10:5', '15:3'])
+    assert(result.catalog.meta.array_meta['pr'].shape == (18, 6, 8))
+
+
+def test_scan_files_reports_errors_without_aborting():
+    paths = ['0:10', 'broken:0', '10:0']
+    with ThreadPoolExecutor(2) as pool:
+        result = scan_files(paths, concat_dim='time', executor=pool, open_dataset=open_synthetic)
+
+    assert(not result.ok)
+    assert(set(result.errors) == {'broken:0', '10:0'})
+    assert(result.metas[1] is None and result.metas[2] is None)
+    assert(result.catalog.sources == ['0:10'])
+
+
+def test_scan_files_with_process_pool():
+    result = scan_files(['0:4', '4:4'], concat_dim='time', max_workers=2, executor='process', open_dataset=open_synthetic)
+    assert(result.ok)
+    assert(result.catalog.offsets.tolist() == [0, 4, 8])
+
+
+def test_scan_files_keeps_results_when_merge_fails():
+    result = scan_files(['0:10', '12:5'], concat_dim='time', executor='thread', open_dataset=open_synthetic)
+
+    assert(not result.ok and not result.errors)
+    assert(result.catalog is None)
+    assert('Gap' in str(result.catalog_error))
+    assert(all(meta is not None for meta in result.metas))
+
+
+def test_scan_files_rejects_duplicate_paths():
+    with pytest.raises(ValueError, match="more than once"):
+        scan_files(['0:10', '0:10'], open_dataset=open_synthetic)
+
+
+def test_scan_files_picks_processes_for_local_netcdf4(tmp_path):
+    netcdf4 = str(tmp_path / 'a.nc')
+    netcdf3 = str(tmp_path / 'b.nc')
+    make_dataset(0, 4).to_netcdf(netcdf4, engine='netcdf4')
+    make_dataset(4, 4).to_netcdf(netcdf3, engine='scipy')
+
+    assert(_choose_executor([netcdf4, netcdf3], None, 2) == 'process')
+    assert(_choose_executor([netcdf3, netcdf4], None, 2) == 'thread')
+    assert(_choose_executor([netcdf4], None, 1) == 'thread')
+    assert(_choose_executor([netcdf4], open_synthetic, 2) == 'thread')
+    with instrument.use_sink(instrument.StatsSink()):
+        assert(_choose_executor([netcdf4], None, 2) == 'thread')
+
+    result = scan_files([netcdf4], concat_dim='time', max_workers=2)
+    assert(result.ok and result.catalog.meta.array_meta['pr'].shape == (4, 6, 8))
@@ -0,0 +1,67 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import json
+
+import numpy as np
+
+from ndmeta.schedule import WorkTask, assign_tasks, plan_tasks, read_task, submit_tasks
+from tests.helpers import FULL_PR, Opener, make_catalog
+
+
+def test_plan_tasks_balances_bytes_and_groups_files():
+    catalog = make_catalog(['0:5', '5:7', '12:5'])
+    chunk_sizes = {'time': 4, 'lat': 2, 'lon': 6}
+    tasks = plan_tasks(catalog, chunk_sizes, var_names=['pr'], target_task_bytes=4 * 2 * 6 * 4 * 2)
+
+    chunks = [(chunk.var_name, chunk.chunk_coords) for task in tasks for chunk in task.chunks]
+    assert(sorted(chunks) == sorted(('pr', c) for c in np.ndindex(5, 2, 1)))
+    assert(all(task.estimated_bytes <= 4 * 2 * 6 * 4 * 2 for task in tasks))
+    assert(tasks[0].sources == ['0:5'])
+    assert(tasks[1].sources == ['0:5', '5:7'])
+    assert(max(len(task.sources) for task in tasks) == 2)
+
+
+def test_plan_tasks_by_count_and_assign():
+    catalog = make_catalog(['0:5', '5:7', '12:5'])
+    tasks = plan_tasks(catalog, {'time': 2, 'lat': 2, 'lon': 3}, num_tasks=4)
+    total = sum(task.estimated_bytes for task in tasks)
+    assert(total == sum(meta.estimated_obj_size * np.prod(meta.shape) for meta in catalog.meta.array_meta.values()))
+
+    loads = [sum(task.estimated_bytes for task in worker) for worker in assign_tasks(tasks, 3)]
+    assert(sum(loads) == total)
+    assert(max(loads) - min(loads) <= max(task.estimated_bytes for task in tasks))
+
+
+def test_tasks_round_trip_and_run_on_a_pool():
+    catalog = make_catalog(['0:5', '5:7', '12:5'])
+    tasks = plan_tasks(catalog, {'time': 4, 'lat': 4, 'lon': 6}, num_tasks=3, var_names=['pr'])
+    assert(WorkTask.from_dict(json.loads(json.dumps(tasks[1].to_dict()))) == tasks[1])
+
+    for pool_type in (ThreadPoolExecutor, ProcessPoolExecutor):
+        with pool_type(2) as pool:
+            futures = submit_tasks(tasks, pool, read_task, open_dataset=Opener())
+            results = [item for future in futures for item in future.result()]
+
+        assert(len(results) == 5)
+        for var_name, slices, data in results:
+            assert(var_name == 'pr')
+            assert(np.array_equal(data, FULL_PR[slices['time'], slices['lat'], slices['lon']]))
+
+
+def test_plan_tasks_pieces_match_chunk_sources():
+    catalog = make_catalog(['0:1', '1:5', '6:2', '8:9'])
+    chunk_sizes = {'time': 3, 'lat': 4, 'lon': 5}
+    var_names = ['lat', 'pr', 'time']
+    tasks = plan_tasks(catalog, chunk_sizes, target_task_bytes=500, var_names=var_names)
+
+    keys = []
+    for chunk in (chunk for task in tasks for chunk in task.chunks):
+        sources = catalog.chunk_sources(chunk.var_name, chunk.chunk_slices)
+        assert([(piece.source, piece.local_slices) for piece in chunk.pieces] == [(source, local) for _, source, local in sources])
+        for piece, (position, _, local) in zip(chunk.pieces, sources):
+            expected = {dim: 0 for dim in chunk.chunk_slices}
+            if 'time' in expected:
+                expected['time'] = catalog.file_extent(position)[0] + local['time'].start - chunk.chunk_slices['time'].start
+            assert(piece.chunk_offsets == expected)
+        keys.append((sources[0][0], var_names.index(chunk.var_name), chunk.chunk_coords))
+    assert(keys == sorted(keys))
+    assert(len(keys) == sum(len(catalog.meta.chunk_grid(var_name, chunk_sizes)) for var_name in var_names))
@@ -0,0 +1,50 @@
+import math
+
+import cftime
+import numpy as np
+import xarray as xr
+
+from ndmeta import NDimMeta
+from ndmeta.serialize import decode_value, dumps, encode_value, loads
+
+
+def test_value_round_trip():
+    values = [
+        None, True, 3, 2.5, 'x', (1, 2), [1, (2, 3)], {'a': (1,), 2: 'b'},
+        np.float32(1.5), np.int16(-3), np.datetime64('2000-01-01T00:00:00', 'ns'),
+        np.dtype('<f4'), np.dtype('O'), b'\x00\x01',
+        cftime.DatetimeNoLeap(1850, 1, 1, 1, 30),
+        cftime.datetime(1, 1, 1, calendar='360_day', has_year_zero=True),
+    ]
+    for value in values:
+        decoded = decode_value(encode_value(value))
+        assert(decoded == value)
+        assert(type(decoded) is type(value))
+
+    assert(math.isnan(decode_value(encode_value(float('nan')))))
+    nan32 = decode_value(encode_value(np.float32('nan')))
+    assert(nan32.dtype == np.float32 and np.isnan(nan32))
+    array = np.arange(6, dtype='>i2').reshape(2, 3)
+    decoded = decode_value(encode_value(array))
+    assert(decoded.dtype == array.dtype and np.array_equal(decoded, array))
+
+
+def test_ndim_meta_round_trip():
+    times = xr.date_range('1850-01-01', periods=4, freq='D', calendar='noleap', use_cftime=True)
+    ds = xr.Dataset(
+        {'pr': (('time', 'lat'), np.zeros((4, 3), dtype='float32'), {'_FillValue': np.float32(1e20), 'units': 'kg m-2 s-1'})},
+        coords={'time': times, 'lat': [-45.0, 0.0, 45.0]},
+    )
+    meta = NDimMeta.from_xarray(ds)
+    restored = loads(dumps(meta))
+
+    assert(restored == meta)
+    assert(list(restored.array_meta) == list(meta.array_meta))
+    assert(restored.array_meta['pr'].attributes['dimension_names'] == ('time', 'lat'))
+    assert(restored.array_meta['time'].dimension_ranges['time'][0] == cftime.DatetimeNoLeap(1850, 1, 1))
+    assert(restored.array_meta['pr'].fill_value.dtype == np.float32)
+
+    ds['pr'].attrs['_FillValue'] = np.float32('nan')
+    meta = NDimMeta.from_xarray(ds)
+    assert(loads(dumps(meta)) == meta)
+    assert(meta.compact() == loads(dumps(meta)).compact())
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+import xarray as xr
+
+from ndmeta import NDimMeta, TiledCatalog
+from ndmeta.serialize import dumps, loads
+
+
+def make_tile(lat_start, lon_start, lat_size=4, lon_size=5, time_size=3):
+    return NDimMeta.from_xarray(xr.Dataset(
+        {'pr': (('time', 'lat', 'lon'), np.zeros((time_size, lat_size, lon_size), dtype='float32'))},
+        coords={
+            'time': np.arange(time_size),
+            'lat': np.arange(lat_start, lat_start + lat_size),
+            'lon': np.arange(lon_start, lon_start + lon_size),
+        }
+    ))
+
+
+def make_tiles(lat_starts=(0, 4, 8), lon_starts=(0, 5)):
+    tiles = [(lat, lon) for lat in lat_starts for lon in lon_starts]
+    return [make_tile(lat, lon) for lat, lon in tiles], [f"{lat}_{lon}.nc" for lat, lon in tiles]
+
+
+def test_tiled_catalog_places_and_merges_tiles():
+    metas, sources = make_tiles()
+    order = [5, 0, 3, 1, 4, 2]
+    catalog = TiledCatalog.from_metas([metas[i] for i in order], ('lat', 'lon'), [sources[i] for i in order])
+
+    assert(catalog.grid_shape == (3, 2))
+    assert(catalog.sources.tolist() == [['0_0.nc', '0_5.nc'], ['4_0.nc', '4_5.nc'], ['8_0.nc', '8_5.nc']])
+    assert(catalog.offsets['lat'].tolist() == [0, 4, 8, 12] and catalog.offsets['lon'].tolist() == [0, 5, 10])
+    pr = catalog.meta.array_meta['pr']
+    assert(pr.shape == (3, 12, 10))
+    assert(pr.dimension_ranges == {'time': (0, 2), 'lat': (0, 11), 'lon': (0, 9)})
+    assert(catalog.meta.array_meta['time'] == metas[0].array_meta['time'])
+
+
+
+def test_tiled_catalog_meta_records_every_tiled_dim():
+    metas, sources = make_tiles()
+    catalog = TiledCatalog.from_metas(metas, ('lat', 'lon'), sources)
+    assert(catalog.meta.concat_dims == ('lat', 'lon'))
+    assert(catalog.meta.concat_dim is None and catalog.meta.is_merged)
+    assert(loads(dumps(catalog.meta)) == catalog.meta)
+    with pytest.raises(ValueError, match="TiledCatalog.chunk_coverage"):
+        catalog.meta.chunk_coverage(xr.Dataset(), {'lat': 4, 'lon': 5})
+
+    single = TiledCatalog.from_metas(make_tiles(lon_starts=(0,))[0], ('lat',))
+    assert(single.meta.concat_dim == 'lat' and single.meta.concat_dims == ('lat',))
+
+def test_tiled_catalog_chunk_sources_and_coverage():
+    metas, sources = make_tiles()
+    catalog = TiledCatalog.from_metas(metas, ('lat', 'lon'), sources)
+
+    pieces = catalog.chunk_sources('pr', {'time': slice(0, 3), 'lat': slice(3, 6), 'lon': slice(4, 8)})
+    assert([(tile, source, local['lat'], local['lon']) for tile, source, local in pieces] == [
+        ((0, 0), '0_0.nc', slice(3, 4), slice(4, 5)),
+        ((0, 1), '0_5.nc', slice(3, 4), slice(0, 3)),
+        ((1, 0), '4_0.nc', slice(0, 2), slice(4, 5)),
+        ((1, 1), '4_5.nc', slice(0, 2), slice(0, 3)),
+    ])
+    assert(catalog.chunk_sources('lat', {'lat': slice(6, 10)})[1][1] == '8_0.nc')
+
+    table = catalog.chunk_coverage((1, 1), {'lat': 4, 'lon': 5}, compact=True)['pr']
+    assert(table.chunk_coords.tolist() == [[0, 1, 1]])
+    assert(table.full.tolist() == [True])
+
+
+def test_tiled_catalog_rejects_gaps_and_overlaps():
+    metas, sources = make_tiles()
+    with pytest.raises(ValueError, match="no source for tile"):
+        TiledCatalog.from_metas(metas[:-1], ('lat', 'lon'), sources[:-1])
+    with pytest.raises(ValueError, match="same tile"):
+        TiledCatalog.from_metas(metas + metas[:1], ('lat', 'lon'), sources + ['copy.nc'])
+    gapped, gapped_sources = make_tiles(lat_starts=(0, 4, 9))
+    with pytest.raises(ValueError, match="Gap"):
+        TiledCatalog.from_metas(gapped, ('lat', 'lon'), gapped_sources)
+    with pytest.raises(ValueError, match="overlap"):
+        TiledCatalog.from_metas(metas + [make_tile(2, 0)], ('lat', 'lon'), sources + ['2_0.nc'])
@@ -1,4 +1,4 @@
-from ndmeta.util import format_mem_size, analyze_chunking_strategy
+from ndmeta.util import format_mem_size, analyze_chunking_strategy, divisors
 
 
 def test_format_mem_size():
@@ -18,3 +18,10 @@ def test_analyze_chunking_strategy():
     )
     assert(proposed_chunk_mem == 640)
 
+
+def test_divisors():
+    assert(divisors(1) == [1])
+    assert(divisors(12) == [1, 2, 3, 4, 6, 12])
+    assert(divisors(97) == [1, 97])
+    assert(divisors(14600) == [i for i in range(1, 14601) if 14600 % i == 0])
+    assert(len(divisors(2 ** 20 * 3 ** 5)) == 21 * 6)